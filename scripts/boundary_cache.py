@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+boundary_cache.py
+-----------------
+Cached dissolved boundaries built from the Vermont town polygons:
+
+  state   — all 256 towns unioned into one (Multi)Polygon
+  rpc     — one dissolve per RPC (11)
+  county  — one dissolve per County (14)
+
+Each boundary is stored as WKB in WGS84 and in UTM Zone 18N (EPSG:32618,
+projected from the WGS84 dissolve). The cache file is keyed by a hash of
+Vermont_Town_GEOID_RPC_County.geojson, so editing the towns file
+invalidates it automatically; stale cache files are removed on rebuild.
+
+Accessor API (crs is "wgs84" or "utm18n"):
+    from boundary_cache import state_boundary, rpc_boundary, county_boundaries
+    vt = state_boundary("utm18n")
+    ccrpc = rpc_boundary("CCRPC")
+    counties = county_boundaries("utm18n")   # {name: geometry}
+
+Run from repo root to (re)build and list the cache:
+    python scripts/boundary_cache.py [--rebuild]
+
+Input:   data/Vermont_Town_GEOID_RPC_County.geojson
+Output:  .cache/boundaries/boundaries_<hash>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import shapely
+from shapely.geometry import shape
+
+from projection import to_utm
+
+REPO = Path(__file__).resolve().parent.parent
+TOWNS_FILE = REPO / "data" / "Vermont_Town_GEOID_RPC_County.geojson"
+CACHE_DIR = REPO / ".cache" / "boundaries"
+
+CRS_NAMES = ("wgs84", "utm18n")
+LEVELS = {"rpc": "RPC", "county": "County"}  # level -> towns property
+
+
+def towns_hash(path: Path = TOWNS_FILE) -> str:
+    """Content hash of the towns file (hex, 16 bytes).
+
+    Memoized on the file's size and mtime, so the accessors below do not
+    re-read the file on every call.
+    """
+    st = path.stat()
+    return _file_hash(path, st.st_size, st.st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _file_hash(path: Path, size: int, mtime_ns: int) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_path(digest: str) -> Path:
+    return CACHE_DIR / f"boundaries_{digest}.json"
+
+
+def build_boundaries(path: Path = TOWNS_FILE) -> dict:
+    """Dissolve the towns at state, RPC, and county level.
+
+    Returns {"state": {None: geom}, "rpc": {name: geom}, "county": {name: geom}}
+    in WGS84.
+    """
+    with path.open() as f:
+        towns = [feat for feat in json.load(f).get("features", []) if feat.get("geometry")]
+    if not towns:
+        raise ValueError(f"No town polygons in {path.name}")
+
+    geoms = [shape(t["geometry"]) for t in towns]
+    boundaries = {"state": {None: shapely.union_all(geoms)}}
+    for level, prop in LEVELS.items():
+        groups: dict[str, list] = {}
+        for town, geom in zip(towns, geoms):
+            name = (town.get("properties") or {}).get(prop)
+            if name:
+                groups.setdefault(name, []).append(geom)
+        boundaries[level] = {name: shapely.union_all(parts) for name, parts in sorted(groups.items())}
+    return boundaries
+
+
+def write_cache(digest: str, boundaries: dict) -> Path:
+    """Serialize the boundaries (both CRSs) and drop cache files for other hashes."""
+    entries = []
+    for level, named in boundaries.items():
+        for name, geom in named.items():
+            entries.append((level, name, geom))
+    projected = to_utm(geom for _, _, geom in entries)
+
+    payload = {"towns_hash": digest, "boundaries": {level: {} for level in boundaries}}
+    for (level, name, geom), geom_utm in zip(entries, projected):
+        payload["boundaries"][level][name or ""] = {
+            "wgs84": shapely.to_wkb(geom, hex=True),
+            "utm18n": shapely.to_wkb(geom_utm, hex=True),
+        }
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    out = cache_path(digest)
+    tmp = out.with_suffix(".tmp")
+    with tmp.open("w") as f:
+        json.dump(payload, f)
+    os.replace(tmp, out)
+    for stale in CACHE_DIR.glob("boundaries_*.json"):
+        if stale != out:
+            stale.unlink()
+    return out
+
+
+@lru_cache(maxsize=None)
+def _load(digest: str) -> dict:
+    """Cached WKB entries for the given towns hash, building them if needed."""
+    path = cache_path(digest)
+    if not path.exists():
+        write_cache(digest, build_boundaries())
+    with path.open() as f:
+        return json.load(f)["boundaries"]
+
+
+@lru_cache(maxsize=None)
+def _geometry(digest: str, level: str, name: str, crs: str):
+    if crs not in CRS_NAMES:
+        raise ValueError(f"unknown crs {crs!r}; expected one of {', '.join(CRS_NAMES)}")
+    try:
+        entry = _load(digest)[level][name]
+    except KeyError:
+        raise KeyError(f"no {level} boundary named {name!r}") from None
+    geom = shapely.from_wkb(entry[crs])
+    shapely.prepare(geom)
+    return geom
+
+
+def boundary(level: str, name: str | None = None, crs: str = "wgs84"):
+    """Dissolved boundary for `level` ("state", "rpc", "county") and `name`."""
+    return _geometry(towns_hash(), level, name or "", crs)
+
+
+def boundary_names(level: str) -> list[str]:
+    return sorted(_load(towns_hash())[level])
+
+
+def state_boundary(crs: str = "wgs84"):
+    return boundary("state", crs=crs)
+
+
+def rpc_boundary(rpc: str, crs: str = "wgs84"):
+    return boundary("rpc", rpc, crs)
+
+
+def county_boundary(county: str, crs: str = "wgs84"):
+    return boundary("county", county, crs)
+
+
+def rpc_boundaries(crs: str = "wgs84") -> dict:
+    return {name: rpc_boundary(name, crs) for name in boundary_names("rpc")}
+
+
+def county_boundaries(crs: str = "wgs84") -> dict:
+    return {name: county_boundary(name, crs) for name in boundary_names("county")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build and list the dissolved boundary cache.")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild even if the cache is current")
+    args = parser.parse_args()
+
+    digest = towns_hash()
+    path = cache_path(digest)
+    if args.rebuild or not path.exists():
+        print(f"Dissolving {TOWNS_FILE.name}...")
+        write_cache(digest, build_boundaries())
+    print(f"Cache: {path.relative_to(REPO)} (towns hash {digest})")
+    for level in ("state", "rpc", "county"):
+        names = boundary_names(level)
+        area = sum(boundary(level, n, "utm18n").area for n in names) / 1609.34 ** 2
+        print(f"  {level:<7} {len(names):>3} boundaries, {area:,.1f} sq mi")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+build_linear_overview.py
+------------------------
+Build the lightweight statewide linear overview the mapping site draws when
+zoomed out, instead of the full-resolution per-RPC files.
+
+For every town and SystemType, the features the site shows (includeLinear,
+mirrored by update_static_charts.include_linear) are merged into one
+MultiLineString, joined where they touch (line_merge), and simplified with
+a tolerance of one screen pixel at --zoom. Properties are cut down to what
+the overview needs. The site switches to the full-detail RPC files from
+detail_zoom (--zoom + 1) in, loading only the RPCs whose bounds are in
+view; their bounds are stored in the overview file.
+
+Run from the repo root:
+    python scripts/build_linear_overview.py
+    python scripts/build_linear_overview.py --zoom 10
+
+Input:   data/linear_by_rpc/Vermont_Linear_<RPC>.geojson
+Output:  data/Vermont_Linear_Overview.geojson
+             features: one per (town, SystemType) with properties
+                 {"SystemType", "Municipal_Name", "GEOIDTXT", "count", "miles"}
+             top level: {"zoom", "detail_zoom", "tolerance",
+                         "rpcs": {rpc: [w, s, e, n]}}
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import shapely
+from shapely.geometry import mapping, shape
+
+from data_loader import load_json_files
+from update_static_charts import RPC_LIST, SW_ORDER, geom_length_m, include_linear
+
+REPO = Path(__file__).resolve().parent.parent
+LINEAR_DIR = REPO / "data" / "linear_by_rpc"
+OUTPUT = REPO / "data" / "Vermont_Linear_Overview.geojson"
+
+TILE_SIZE = 256   # Leaflet / web mercator tile size in pixels
+PRECISION = 5     # decimal places kept in the output (about 1 m)
+
+
+def pixel_degrees(zoom):
+    """Width of one screen pixel at `zoom`, in degrees of longitude."""
+    return 360.0 / (TILE_SIZE * 2 ** zoom)
+
+
+def line_parts(geom):
+    """The LineStrings of a LineString / MultiLineString shapely geometry."""
+    if geom.geom_type == "LineString":
+        return [geom]
+    if geom.geom_type == "MultiLineString":
+        return list(geom.geoms)
+    return []
+
+
+def extend_bbox(bbox, bounds):
+    if bbox is None:
+        return list(bounds)
+    return [min(bbox[0], bounds[0]), min(bbox[1], bounds[1]),
+            max(bbox[2], bounds[2]), max(bbox[3], bounds[3])]
+
+
+def round_coords(coords):
+    if coords and isinstance(coords[0], (int, float)):
+        return [round(c, PRECISION) for c in coords]
+    return [round_coords(c) for c in coords]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the simplified statewide linear overview layer.")
+    parser.add_argument("--zoom", type=int, default=10,
+                        help="zoom the overview is drawn at up to; simplify to one pixel there (default 10)")
+    args = parser.parse_args()
+    tolerance = pixel_degrees(args.zoom)
+
+    t0 = time.perf_counter()
+    paths = [LINEAR_DIR / f"Vermont_Linear_{rpc}.geojson" for rpc in RPC_LIST]
+    groups = {}   # (GEOIDTXT or town name, SystemType) -> {"name", "geoid", "parts", "count", "metres"}
+    rpc_bbox = {}
+    input_bytes = 0
+    for rpc, path, gj in zip(RPC_LIST, paths, load_json_files(paths)):
+        if gj is None:
+            print(f"  {path.name} not found — skipping")
+            continue
+        input_bytes += path.stat().st_size
+        for feat in gj.get("features", []):
+            props = feat.get("properties") or {}
+            if not include_linear(feat) or props.get("SystemType") not in SW_ORDER or not feat.get("geometry"):
+                continue
+            geom = shape(feat["geometry"])
+            parts = line_parts(geom)
+            if not parts:
+                continue
+            rpc_bbox[rpc] = extend_bbox(rpc_bbox.get(rpc), geom.bounds)
+            town = props.get("GEOIDTXT") or props.get("Municipal_Name") or "UNKNOWN"
+            g = groups.setdefault((town, props["SystemType"]), {
+                "name": props.get("Municipal_Name"), "geoid": props.get("GEOIDTXT"),
+                "parts": [], "count": 0, "metres": 0.0,
+            })
+            g["parts"].extend(parts)
+            g["count"] += 1
+            g["metres"] += geom_length_m(feat["geometry"])
+    print(f"Read {sum(g['count'] for g in groups.values()):,} features "
+          f"({input_bytes / 1e6:.1f} MB) in {time.perf_counter() - t0:.2f}s")
+
+    t1 = time.perf_counter()
+    features = []
+    vertices_in = vertices_out = 0
+    for (town, system), g in sorted(groups.items(), key=lambda kv: (SW_ORDER.index(kv[0][1]), kv[0][0])):
+        merged = shapely.line_merge(shapely.MultiLineString(g["parts"]))
+        simple = shapely.simplify(merged, tolerance, preserve_topology=False)
+        if simple.is_empty:
+            continue
+        vertices_in += sum(len(p.coords) for p in g["parts"])
+        vertices_out += shapely.get_num_coordinates(simple)
+        geometry = mapping(simple)
+        geometry["coordinates"] = round_coords(geometry["coordinates"])
+        features.append({
+            "type": "Feature",
+            "properties": {
+                "SystemType": system,
+                "Municipal_Name": g["name"],
+                "GEOIDTXT": g["geoid"],
+                "count": g["count"],
+                "miles": round(g["metres"] / 1609.344, 2),
+            },
+            "geometry": geometry,
+        })
+    print(f"Merged and simplified {len(features):,} town × SystemType groups in {time.perf_counter() - t1:.2f}s "
+          f"(tolerance {tolerance:.5f}°, {vertices_in:,} → {int(vertices_out):,} vertices)")
+
+    overview = {
+        "type": "FeatureCollection",
+        "zoom": args.zoom,
+        "detail_zoom": args.zoom + 1,
+        "tolerance": round(tolerance, 8),
+        "rpcs": {rpc: [round(v, PRECISION) for v in bbox] for rpc, bbox in sorted(rpc_bbox.items())},
+        "features": features,
+    }
+    with open(OUTPUT, "w") as f:
+        json.dump(overview, f, separators=(",", ":"))
+    size = OUTPUT.stat().st_size
+    print(f"Wrote {OUTPUT.relative_to(REPO)}: {size / 1e6:.2f} MB (RPC files: {input_bytes / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+build_sewer_network.py
+----------------------
+Build the connectivity network for wastewater and combined sewer lines and
+report connected components, dangling ends, and segments that are not
+connected to any treatment facility.
+
+Line endpoints are snapped together when they fall within a tolerance
+(default 1 m). Candidate endpoints are found through a grid hash with the
+tolerance as cell size, so each endpoint is only compared against the
+endpoints in its own and the 8 neighbouring cells instead of every other
+endpoint. The snapped nodes are stored in a compact CSR (compressed sparse
+row) adjacency and components are computed with union-find.
+
+A component counts as connected to a treatment facility when one of its
+nodes lies within --facility-distance (default 150 m) of a facility in
+Vermont_Treatment_Facilities.geojson.
+
+Run from repo root:
+    python scripts/build_sewer_network.py
+    python scripts/build_sewer_network.py --tolerance 2 --facility-distance 250
+
+Inputs:
+  - data/linear_by_rpc/Vermont_Linear_<RPC>.geojson
+  - data/Vermont_Treatment_Facilities.geojson
+
+Output:
+  - analysis/sewer_network_components.csv  (one row per segment GlobalID)
+  - analysis/sewer_network_by_town.csv     (per-town disconnected counts)
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+REPO = Path(__file__).resolve().parent.parent
+LINEAR_DIR = REPO / "data" / "linear_by_rpc"
+FACILITIES_FILE = REPO / "data" / "Vermont_Treatment_Facilities.geojson"
+COMPONENTS_CSV = REPO / "analysis" / "sewer_network_components.csv"
+TOWN_CSV = REPO / "analysis" / "sewer_network_by_town.csv"
+
+SEWER_SYSTEM_TYPES = ("Wastewater", "Combined")
+
+# Metres per degree of latitude (WGS-84 mean); longitude is scaled by cos(lat).
+M_PER_DEG = 111_320.0
+
+
+def load_sewer_segments() -> list[dict]:
+    """Load all wastewater and combined features from the RPC split files."""
+    segments = []
+    for path in sorted(LINEAR_DIR.glob("Vermont_Linear_*.geojson")):
+        with path.open() as f:
+            gj = json.load(f)
+        for feat in gj.get("features", []):
+            props = feat.get("properties") or {}
+            if props.get("SystemType") in SEWER_SYSTEM_TYPES and feat.get("geometry"):
+                segments.append(feat)
+    return segments
+
+
+def line_parts(geom: dict) -> list[list]:
+    """Return the coordinate lists of a LineString / MultiLineString."""
+    if geom["type"] == "LineString":
+        parts = [geom["coordinates"]]
+    elif geom["type"] == "MultiLineString":
+        parts = geom["coordinates"]
+    else:
+        parts = []
+    return [p for p in parts if len(p) >= 2]
+
+
+def to_local_metres(lonlat: np.ndarray) -> np.ndarray:
+    """Project lon/lat to a local equirectangular plane in metres.
+
+    Longitude is scaled by the cosine of each point's own latitude, which is
+    accurate to well under a millimetre over snapping distances.
+    """
+    lon = lonlat[:, 0]
+    lat = lonlat[:, 1]
+    x = lon * np.cos(np.radians(lat)) * M_PER_DEG
+    y = lat * M_PER_DEG
+    return np.column_stack([x, y])
+
+
+class UnionFind:
+    """Array-backed union-find with path halving and union by size."""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+
+    def labels(self) -> np.ndarray:
+        """Dense 0..k-1 label per element."""
+        roots = np.fromiter((self.find(i) for i in range(len(self.parent))), dtype=np.int64)
+        _, dense = np.unique(roots, return_inverse=True)
+        return dense
+
+
+def grid_cells(xy: np.ndarray, cell: float) -> dict[tuple[int, int], list[int]]:
+    """Bucket points into a grid hash keyed by integer cell coordinates."""
+    keys = np.floor(xy / cell).astype(np.int64)
+    cells: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for i, (cx, cy) in enumerate(keys.tolist()):
+        cells[(cx, cy)].append(i)
+    return cells
+
+
+def snap_endpoints(xy: np.ndarray, tolerance: float) -> np.ndarray:
+    """Merge endpoints within `tolerance` metres; return a node id per endpoint."""
+    cells = grid_cells(xy, tolerance)
+    uf = UnionFind(len(xy))
+    tol2 = tolerance * tolerance
+    pts = xy.tolist()
+
+    for (cx, cy), members in cells.items():
+        # Only look at the "forward" half of the neighbourhood so every
+        # pair of cells is compared exactly once.
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            other = members if (dx, dy) == (0, 0) else cells.get((cx + dx, cy + dy))
+            if not other:
+                continue
+            for a_pos, a in enumerate(members):
+                ax, ay = pts[a]
+                candidates = other[a_pos + 1:] if other is members else other
+                for b in candidates:
+                    bx, by = pts[b]
+                    if (ax - bx) ** 2 + (ay - by) ** 2 <= tol2:
+                        uf.union(a, b)
+    return uf.labels()
+
+
+def build_csr(n_nodes: int, edge_u: np.ndarray, edge_v: np.ndarray):
+    """Build a CSR adjacency (indptr, neighbour node, edge id) for an undirected graph."""
+    ends = np.concatenate([edge_u, edge_v])
+    other = np.concatenate([edge_v, edge_u])
+    edge_ids = np.concatenate([np.arange(len(edge_u))] * 2)
+    order = np.argsort(ends, kind="stable")
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ends, minlength=n_nodes), out=indptr[1:])
+    return indptr, other[order].astype(np.int32), edge_ids[order].astype(np.int32)
+
+
+def build_network(segments: list[dict], tolerance: float) -> dict:
+    """Snap endpoints, build the CSR adjacency, and label components."""
+    endpoint_lonlat = []
+    edge_segment = []  # segment index for each line part (edge)
+    for seg_idx, feat in enumerate(segments):
+        for part in line_parts(feat["geometry"]):
+            endpoint_lonlat.append(part[0][:2])
+            endpoint_lonlat.append(part[-1][:2])
+            edge_segment.append(seg_idx)
+
+    lonlat = np.asarray(endpoint_lonlat, dtype=np.float64).reshape(-1, 2)
+    xy = to_local_metres(lonlat)
+    node_of_endpoint = snap_endpoints(xy, tolerance)
+    n_nodes = int(node_of_endpoint.max()) + 1 if len(node_of_endpoint) else 0
+
+    edge_u = node_of_endpoint[0::2]
+    edge_v = node_of_endpoint[1::2]
+    edge_segment = np.asarray(edge_segment, dtype=np.int64)
+    indptr, neighbours, edge_ids = build_csr(n_nodes, edge_u, edge_v)
+
+    # Components over nodes: every edge joins its two nodes, and all parts of
+    # a MultiLineString belong to the same segment.
+    uf = UnionFind(n_nodes)
+    first_node_of_segment: dict[int, int] = {}
+    for u, v, s in zip(edge_u.tolist(), edge_v.tolist(), edge_segment.tolist()):
+        uf.union(u, v)
+        if s in first_node_of_segment:
+            uf.union(first_node_of_segment[s], u)
+        else:
+            first_node_of_segment[s] = u
+    node_component = uf.labels()
+
+    # Node coordinates: mean of the snapped endpoints.
+    counts = np.bincount(node_of_endpoint, minlength=n_nodes)
+    node_xy = np.column_stack([
+        np.bincount(node_of_endpoint, weights=xy[:, 0], minlength=n_nodes) / counts,
+        np.bincount(node_of_endpoint, weights=xy[:, 1], minlength=n_nodes) / counts,
+    ])
+
+    segment_component = np.full(len(segments), -1, dtype=np.int64)
+    for s, u in first_node_of_segment.items():
+        segment_component[s] = node_component[u]
+
+    return {
+        "indptr": indptr,
+        "neighbours": neighbours,
+        "edge_ids": edge_ids,
+        "edge_u": edge_u,
+        "edge_segment": edge_segment,
+        "node_xy": node_xy,
+        "node_component": node_component,
+        "segment_component": segment_component,
+    }
+
+
+def load_facility_points() -> np.ndarray:
+    """Return treatment facility locations in local metres."""
+    with FACILITIES_FILE.open() as f:
+        gj = json.load(f)
+    coords = [
+        feat["geometry"]["coordinates"][:2]
+        for feat in gj.get("features", [])
+        if (feat.get("geometry") or {}).get("type") == "Point"
+    ]
+    return to_local_metres(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+
+
+def components_near_facilities(network: dict, facility_xy: np.ndarray, distance: float) -> set[int]:
+    """Component ids with at least one node within `distance` of a facility."""
+    node_xy = network["node_xy"]
+    # Cell size equals the search distance, so the 3x3 block around a
+    # facility holds every node that can be within range.
+    cells = grid_cells(node_xy, distance)
+    d2 = distance * distance
+    reached: set[int] = set()
+    for fx, fy in facility_xy.tolist():
+        cx, cy = math.floor(fx / distance), math.floor(fy / distance)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for n in cells.get((cx + dx, cy + dy), ()):
+                    nx, ny = node_xy[n]
+                    if (nx - fx) ** 2 + (ny - fy) ** 2 <= d2:
+                        reached.add(int(network["node_component"][n]))
+    return reached
+
+
+def write_outputs(segments: list[dict], network: dict, reached: set[int]) -> dict:
+    """Write the per-segment and per-town CSVs; return summary counts."""
+    segment_component = network["segment_component"]
+    component_sizes = np.bincount(segment_component[segment_component >= 0])
+
+    degree = np.diff(network["indptr"])
+    dangling_nodes = np.flatnonzero(degree == 1)
+    # Attribute each dangling end to the segment whose edge ends there.
+    dangling_by_segment = np.zeros(len(segments), dtype=np.int64)
+    indptr, edge_ids = network["indptr"], network["edge_ids"]
+    for n in dangling_nodes.tolist():
+        dangling_by_segment[network["edge_segment"][edge_ids[indptr[n]]]] += 1
+
+    towns: dict[tuple, dict] = {}
+    COMPONENTS_CSV.parent.mkdir(parents=True, exist_ok=True)
+    with COMPONENTS_CSV.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "GlobalID", "RPC", "GEOIDTXT", "Municipal_Name", "SystemType",
+            "component_id", "component_segments", "connected_to_facility",
+        ])
+        for i, feat in enumerate(segments):
+            p = feat.get("properties") or {}
+            comp = int(segment_component[i])
+            connected = comp in reached
+            # Segments with no valid line part belong to no component.
+            writer.writerow([
+                p.get("GlobalID"), p.get("RPC"), p.get("GEOIDTXT"),
+                p.get("Municipal_Name"), p.get("SystemType"),
+                *((comp, int(component_sizes[comp])) if comp >= 0 else ("", "")),
+                "yes" if connected else "no",
+            ])
+
+            # GEOIDTXT is nullable while Municipal_Name/RPC are not, so key on
+            # the names and fill the GEOID from whichever segment carries it.
+            key = (p.get("RPC"), p.get("Municipal_Name"))
+            town = towns.setdefault(key, {
+                "GEOIDTXT": None,
+                "Municipal_Name": p.get("Municipal_Name"),
+                "RPC": p.get("RPC"),
+                "segments": 0,
+                "components": set(),
+                "disconnected_segments": 0,
+                "dangling_ends": 0,
+            })
+            town["GEOIDTXT"] = town["GEOIDTXT"] or p.get("GEOIDTXT")
+            town["segments"] += 1
+            if comp >= 0:
+                town["components"].add(comp)
+            town["disconnected_segments"] += int(not connected)
+            town["dangling_ends"] += int(dangling_by_segment[i])
+
+    with TOWN_CSV.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "GEOIDTXT", "Municipal_Name", "RPC", "segments", "components",
+            "disconnected_segments", "dangling_ends",
+        ])
+        for town in sorted(towns.values(), key=lambda t: (-t["disconnected_segments"], str(t["RPC"]), str(t["Municipal_Name"]))):
+            writer.writerow([
+                town["GEOIDTXT"], town["Municipal_Name"], town["RPC"], town["segments"],
+                len(town["components"]), town["disconnected_segments"], town["dangling_ends"],
+            ])
+
+    return {
+        "components": len(component_sizes),
+        "components_with_facility": len(reached),
+        "disconnected_segments": int(sum(t["disconnected_segments"] for t in towns.values())),
+        "dangling_ends": len(dangling_nodes),
+        "towns": len(towns),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tolerance", type=float, default=1.0,
+                        help="endpoint snapping tolerance in metres (default 1)")
+    parser.add_argument("--facility-distance", type=float, default=150.0,
+                        help="max distance in metres from a node to a treatment facility (default 150)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    segments = load_sewer_segments()
+    print(f"Wastewater + Combined segments: {len(segments):,}")
+    if not segments:
+        print("No wastewater/combined features found")
+        return
+    t_load = time.perf_counter()
+
+    network = build_network(segments, args.tolerance)
+    n_nodes = len(network["indptr"]) - 1
+    print(f"Snapped {len(network['edge_u']) * 2:,} endpoints into {n_nodes:,} nodes "
+          f"(tolerance {args.tolerance:g} m)")
+    t_build = time.perf_counter()
+
+    facility_xy = load_facility_points()
+    reached = components_near_facilities(network, facility_xy, args.facility_distance)
+    summary = write_outputs(segments, network, reached)
+    t_done = time.perf_counter()
+
+    print(f"Connected components: {summary['components']:,}")
+    print(f"  within {args.facility_distance:g} m of a treatment facility: "
+          f"{summary['components_with_facility']:,}")
+    print(f"Segments disconnected from any facility: {summary['disconnected_segments']:,}")
+    print(f"Dangling ends: {summary['dangling_ends']:,}")
+    print(f"Towns with sewer segments: {summary['towns']:,}")
+    print(f"\nWrote {COMPONENTS_CSV.relative_to(REPO)}")
+    print(f"Wrote {TOWN_CSV.relative_to(REPO)}")
+    print(f"\nTiming: load {t_load - t0:.2f}s, network {t_build - t_load:.2f}s, "
+          f"outputs {t_done - t_build:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
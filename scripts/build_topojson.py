@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+build_topojson.py
+-----------------
+Encode the zoning districts (one topology per RPC) and the town boundaries
+(one statewide topology) as TopoJSON, where a boundary shared by two
+districts or towns is stored once as an arc both polygons reference.
+
+Coordinates are quantized to a --quantization × --quantization grid over
+each file's bounds, consecutive points that quantize to the same grid
+point are dropped, and the rings are cut into arcs at junctions: points
+where rings with different neighbours meet, plus each ring's first point
+(so decoded rings start where the original rings did). Identical arcs,
+including ones traversed in the other direction (~index), are stored once;
+arc positions are delta-encoded.
+
+Every topology is decoded again and checked point for point against the
+quantized input (exit status 1 on a mismatch), then the sizes (raw and
+gzipped) and the time to parse the GeoJSON vs. parse and decode the
+TopoJSON are reported.
+
+Run from the repo root:
+    python scripts/build_topojson.py
+    python scripts/build_topojson.py --quantization 1e5
+
+Input:   data/Zoning Data/<RPC>.geojson
+         data/Vermont_Town_GEOID_RPC_County.geojson
+Output:  data/topojson/Zoning_<RPC>.topojson   (object "zoning")
+         data/topojson/Vermont_Towns.topojson  (object "towns")
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+from data_loader import load_json, parse_json
+
+REPO = Path(__file__).resolve().parent.parent
+ZONING_DIR = REPO / "data" / "Zoning Data"
+TOWNS_FILE = REPO / "data" / "Vermont_Town_GEOID_RPC_County.geojson"
+OUTPUT_DIR = REPO / "data" / "topojson"
+
+
+# ── Encoding ──────────────────────────────────────────────────────────
+
+
+def bounds(features):
+    xs, ys = [], []
+
+    def walk(coords):
+        if coords and isinstance(coords[0], (int, float)):
+            xs.append(coords[0])
+            ys.append(coords[1])
+        else:
+            for c in coords:
+                walk(c)
+
+    for feat in features:
+        if feat.get("geometry"):
+            walk(feat["geometry"]["coordinates"])
+    return (min(xs), min(ys), max(xs), max(ys)) if xs else (0.0, 0.0, 0.0, 0.0)
+
+
+def make_transform(bbox, quantization):
+    x0, y0, x1, y1 = bbox
+    kx = (x1 - x0) / (quantization - 1) if x1 > x0 else 1.0
+    ky = (y1 - y0) / (quantization - 1) if y1 > y0 else 1.0
+    return {"scale": [kx, ky], "translate": [x0, y0]}
+
+
+def quantize_line(coords, transform):
+    """Quantized points of a position list, without consecutive duplicates."""
+    (kx, ky), (x0, y0) = transform["scale"], transform["translate"]
+    out = []
+    for c in coords:
+        p = (round((c[0] - x0) / kx), round((c[1] - y0) / ky))
+        if not out or out[-1] != p:
+            out.append(p)
+    return out
+
+
+def quantize_open(coords, transform):
+    line = quantize_line(coords, transform)
+    return line * 2 if len(line) == 1 else line
+
+
+def quantize_ring(coords, transform):
+    ring = quantize_line(coords, transform)
+    if len(ring) < 2:        # collapsed to a single grid point
+        ring = ring * 2
+    elif ring[0] != ring[-1]:
+        ring.append(ring[0])
+    return ring
+
+
+def quantize_geometry(geom, transform):
+    """(type, nested quantized lines) of a GeoJSON geometry; lines of polygons are closed rings."""
+    if not geom:
+        return None, None
+    kind, coords = geom["type"], geom["coordinates"]
+    if kind == "Polygon":
+        return kind, [quantize_ring(r, transform) for r in coords]
+    if kind == "MultiPolygon":
+        return kind, [[quantize_ring(r, transform) for r in poly] for poly in coords]
+    if kind == "LineString":
+        return kind, quantize_open(coords, transform)
+    if kind == "MultiLineString":
+        return kind, [quantize_open(line, transform) for line in coords]
+    raise ValueError(f"unsupported geometry type: {kind}")
+
+
+def geometry_lines(kind, lines):
+    """Flat list of (points, is_ring) of a quantized geometry."""
+    if kind == "Polygon":
+        return [(r, True) for r in lines]
+    if kind == "MultiPolygon":
+        return [(r, True) for poly in lines for r in poly]
+    if kind == "LineString":
+        return [(lines, False)]
+    if kind == "MultiLineString":
+        return [(line, False) for line in lines]
+    return []
+
+
+def find_junctions(lines):
+    """Points where lines with different neighbours meet, plus every line's first and last point."""
+    neighbours = {}
+    junctions = set()
+    for points, is_ring in lines:
+        junctions.add(points[0])
+        junctions.add(points[-1])
+        body = points[:-1] if is_ring else points
+        n = len(body)
+        for i, p in enumerate(body):
+            if is_ring:
+                around = (body[i - 1], body[(i + 1) % n])
+            else:
+                around = (body[i - 1] if i else None, body[i + 1] if i + 1 < n else None)
+            seen = neighbours.get(p)
+            if seen is None:
+                neighbours[p] = around
+            elif seen != around and seen != around[::-1]:
+                junctions.add(p)
+    return junctions
+
+
+class ArcTable:
+    """Deduplicated arcs; a reversed duplicate is referenced as ~index."""
+
+    def __init__(self):
+        self.arcs = []
+        self._index = {}
+
+    def add(self, points):
+        key = tuple(points)
+        i = self._index.get(key)
+        if i is not None:
+            return i
+        i = self._index.get(key[::-1])
+        if i is not None:
+            return ~i
+        i = self._index[key] = len(self.arcs)
+        self.arcs.append(points)
+        return i
+
+    def cut(self, points, junctions):
+        """Arc references of one line, split at every junction."""
+        refs, start = [], 0
+        for i in range(1, len(points)):
+            if points[i] in junctions or i == len(points) - 1:
+                refs.append(self.add(points[start:i + 1]))
+                start = i
+        return refs
+
+    def delta_encoded(self):
+        out = []
+        for arc in self.arcs:
+            x, y = arc[0]
+            enc = [[x, y]]
+            for px, py in arc[1:]:
+                enc.append([px - x, py - y])
+                x, y = px, py
+            out.append(enc)
+        return out
+
+
+def encode_topology(collection, name, quantization):
+    """TopoJSON Topology of a GeoJSON FeatureCollection, plus the quantized geometries for verification."""
+    features = collection.get("features", [])
+    bbox = bounds(features)
+    transform = make_transform(bbox, quantization)
+    quantized = [quantize_geometry(f.get("geometry"), transform) for f in features]
+    junctions = find_junctions([line for kind, lines in quantized for line in geometry_lines(kind, lines)])
+
+    table = ArcTable()
+    geometries = []
+    for feat, (kind, lines) in zip(features, quantized):
+        if kind is None:
+            obj = {"type": None}
+        elif kind == "Polygon":
+            obj = {"type": kind, "arcs": [table.cut(r, junctions) for r in lines]}
+        elif kind == "MultiPolygon":
+            obj = {"type": kind, "arcs": [[table.cut(r, junctions) for r in poly] for poly in lines]}
+        elif kind == "LineString":
+            obj = {"type": kind, "arcs": table.cut(lines, junctions)}
+        else:
+            obj = {"type": kind, "arcs": [table.cut(line, junctions) for line in lines]}
+        if "id" in feat:
+            obj["id"] = feat["id"]
+        obj["properties"] = feat.get("properties") or {}
+        geometries.append(obj)
+
+    topology = {
+        "type": "Topology",
+        "bbox": list(bbox),
+        "transform": transform,
+        "objects": {name: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": table.delta_encoded(),
+    }
+    return topology, quantized
+
+
+# ── Decoding ──────────────────────────────────────────────────────────
+
+
+def decode_arcs(topology):
+    """Absolute quantized positions of every arc."""
+    out = []
+    for arc in topology["arcs"]:
+        x = y = 0
+        points = []
+        for dx, dy in arc:
+            x += dx
+            y += dy
+            points.append((x, y))
+        out.append(points)
+    return out
+
+
+def join_arcs(refs, arcs):
+    points = []
+    for ref in refs:
+        arc = arcs[ref] if ref >= 0 else arcs[~ref][::-1]
+        points.extend(arc[1:] if points else arc)
+    return points
+
+
+def decode_quantized(obj, arcs):
+    """(type, nested quantized lines) of a topology geometry object."""
+    kind = obj["type"]
+    if kind is None:
+        return None, None
+    if kind in ("Polygon", "MultiLineString"):
+        return kind, [join_arcs(refs, arcs) for refs in obj["arcs"]]
+    if kind == "MultiPolygon":
+        return kind, [[join_arcs(refs, arcs) for refs in poly] for poly in obj["arcs"]]
+    return kind, join_arcs(obj["arcs"], arcs)
+
+
+def decode_topology(topology, name):
+    """GeoJSON FeatureCollection of one topology object (what a client would rebuild)."""
+    arcs = decode_arcs(topology)
+    (kx, ky), (x0, y0) = topology["transform"]["scale"], topology["transform"]["translate"]
+
+    def positions(points):
+        return [[x * kx + x0, y * ky + y0] for x, y in points]
+
+    features = []
+    for obj in topology["objects"][name]["geometries"]:
+        kind, lines = decode_quantized(obj, arcs)
+        if kind is None:
+            geometry = None
+        elif kind in ("Polygon", "MultiLineString"):
+            geometry = {"type": kind, "coordinates": [positions(r) for r in lines]}
+        elif kind == "MultiPolygon":
+            geometry = {"type": kind, "coordinates": [[positions(r) for r in poly] for poly in lines]}
+        else:
+            geometry = {"type": kind, "coordinates": positions(lines)}
+        feat = {"type": "Feature", "properties": obj.get("properties", {}), "geometry": geometry}
+        if "id" in obj:
+            feat["id"] = obj["id"]
+        features.append(feat)
+    return {"type": "FeatureCollection", "features": features}
+
+
+def verify(topology, name, quantized):
+    """Number of geometries whose decoded positions differ from the quantized input."""
+    arcs = decode_arcs(topology)
+    geometries = topology["objects"][name]["geometries"]
+    return sum(decode_quantized(obj, arcs) != q for obj, q in zip(geometries, quantized))
+
+
+# ── Measurement ───────────────────────────────────────────────────────
+
+
+def best_time(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def encode_file(source, output, name, quantization):
+    collection = load_json(source)
+    t0 = time.perf_counter()
+    topology, quantized = encode_topology(collection, name, quantization)
+    encode_s = time.perf_counter() - t0
+    mismatches = verify(topology, name, quantized)
+
+    data = json.dumps(topology, separators=(",", ":")).encode()
+    output.write_bytes(data)
+    original = source.read_bytes()
+    points_in = sum(len(line) for kind, lines in quantized for line, _ in geometry_lines(kind, lines))
+    points_out = sum(len(arc) for arc in topology["arcs"])
+    return {
+        "source": source.name,
+        "output": output.name,
+        "features": len(collection.get("features", [])),
+        "arcs": len(topology["arcs"]),
+        "points_in": points_in,
+        "points_out": points_out,
+        "bytes_in": len(original),
+        "bytes_out": len(data),
+        "gzip_in": len(gzip.compress(original, 6)),
+        "gzip_out": len(gzip.compress(data, 6)),
+        "parse_in_s": best_time(lambda: parse_json(original)),
+        "parse_out_s": best_time(lambda: parse_json(data)),
+        "decode_out_s": best_time(lambda: decode_topology(parse_json(data), name)),
+        "encode_s": encode_s,
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode zoning districts and town boundaries as TopoJSON.")
+    parser.add_argument("--quantization", type=float, default=1e6,
+                        help="grid points per axis over each file's bounds (default 1e6)")
+    args = parser.parse_args()
+    quantization = int(args.quantization)
+    if quantization < 2:
+        parser.error("--quantization must be at least 2")
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    jobs = [(path, OUTPUT_DIR / f"Zoning_{path.stem}.topojson", "zoning") for path in sorted(ZONING_DIR.glob("*.geojson"))]
+    if TOWNS_FILE.exists():
+        jobs.append((TOWNS_FILE, OUTPUT_DIR / "Vermont_Towns.topojson", "towns"))
+    if not jobs:
+        raise SystemExit("No zoning or town files found")
+
+    print(f"Quantization {quantization:,}")
+    print(f"{'file':<24} {'points':<15} {'MB':<13}  {'gzip MB':<11}  {'parse ms':<9} {'+decode':>7}  check")
+    results = []
+    for source, output, name in jobs:
+        r = encode_file(source, output, name, quantization)
+        results.append(r)
+        print(f"{r['output']:<24} {r['points_in']:>7,}→{r['points_out']:<7,} "
+              f"{r['bytes_in'] / 1e6:>6.2f}→{r['bytes_out'] / 1e6:<6.2f}  "
+              f"{r['gzip_in'] / 1e6:>5.2f}→{r['gzip_out'] / 1e6:<5.2f}  "
+              f"{r['parse_in_s'] * 1e3:>4.0f}→{r['parse_out_s'] * 1e3:<4.0f} {r['decode_out_s'] * 1e3:>7.0f}  "
+              + ("ok" if not r["mismatches"] else f"{r['mismatches']} MISMATCHED"))
+
+    total = {k: sum(r[k] for r in results) for k in ("bytes_in", "bytes_out", "gzip_in", "gzip_out",
+                                                     "parse_in_s", "parse_out_s", "decode_out_s", "mismatches")}
+    print(f"\nTotal: {total['bytes_in'] / 1e6:.2f} MB → {total['bytes_out'] / 1e6:.2f} MB "
+          f"({total['gzip_in'] / 1e6:.2f} → {total['gzip_out'] / 1e6:.2f} MB gzipped); "
+          f"parse {total['parse_in_s'] * 1e3:.0f} ms → {total['parse_out_s'] * 1e3:.0f} ms "
+          f"({total['decode_out_s'] * 1e3:.0f} ms with decoding to GeoJSON)")
+    print(f"Wrote {len(results)} topologies to {OUTPUT_DIR.relative_to(REPO)}/")
+    if total["mismatches"]:
+        print("Decoded topology does not match the quantized input", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
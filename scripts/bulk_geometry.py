@@ -0,0 +1,111 @@
+"""
+bulk_geometry.py
+----------------
+Build shapely geometry arrays for a whole list of GeoJSON geometries at
+once, instead of one shape() call per feature.
+
+The features are grouped by geometry type. For each type the nested
+coordinate lists are flattened into one (n, 2) coordinate array plus the
+offsets of every nesting level, and shapely.from_ragged_array builds all
+geometries of that type in one call. Types from_ragged_array does not
+cover (GeometryCollection) and empty geometries go through
+shapely.from_geojson. Missing or null geometries come back as None, so the
+result lines up with the input.
+
+One bad geometry (say a single-vertex LineString) makes the bulk call fail
+for its whole group. That group is then built again one feature at a time
+with shape(): the bad features print a warning naming their label (the
+index unless labels are given) and come back as None, as the per-feature
+loops did.
+
+Geometries are 2D: a Z coordinate, if present, is dropped (projection.py
+and all the area, buffer and point-in-polygon work here are 2D anyway).
+
+    from bulk_geometry import feature_geometries
+    geoms = feature_geometries(features)          # NumPy object array
+    pts = shapely.point_on_surface(geoms)
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import shapely
+from shapely import GeometryType
+from shapely.geometry import shape
+
+# Nesting depth of "coordinates" above the positions, and the ragged-array type.
+RAGGED = {
+    "Point": (0, GeometryType.POINT),
+    "LineString": (1, GeometryType.LINESTRING),
+    "MultiPoint": (1, GeometryType.MULTIPOINT),
+    "Polygon": (2, GeometryType.POLYGON),
+    "MultiLineString": (2, GeometryType.MULTILINESTRING),
+    "MultiPolygon": (3, GeometryType.MULTIPOLYGON),
+}
+
+
+def _positions_array(positions: list) -> np.ndarray:
+    if not positions:
+        return np.empty((0, 2))
+    try:
+        xy = np.asarray(positions, dtype=np.float64)
+    except ValueError:  # mixed 2D / 3D positions
+        xy = np.array([(p[0], p[1]) for p in positions], dtype=np.float64)
+    return xy[:, :2]
+
+
+def _flatten(items: list, depth: int):
+    """Positions under `depth` levels of lists, and the offsets of each level (innermost first)."""
+    offsets = []
+    for _ in range(depth):
+        counts = np.fromiter((len(x) for x in items), dtype=np.int64, count=len(items))
+        offsets.append(np.concatenate([[0], np.cumsum(counts)]))
+        items = [y for x in items for y in x]
+    return _positions_array(items), offsets[::-1]
+
+
+def _one_by_one(geometries: list, idx, labels) -> np.ndarray:
+    """shape() per feature, with None and a warning for the ones that fail."""
+    out = np.full(len(idx), None, dtype=object)
+    for n, i in enumerate(idx):
+        try:
+            out[n] = shapely.force_2d(shape(geometries[i]))
+        except Exception as e:
+            label = labels[i] if labels is not None else f"feature {i}"
+            print(f"  Warning: Could not parse geometry for {label}: {e}")
+    return out
+
+
+def geometry_array(geometries, labels=None) -> np.ndarray:
+    """Shapely geometries (None for a missing or unparseable geometry) for a list of GeoJSON geometry dicts.
+
+    `labels`, one per geometry, name the features in parse warnings.
+    """
+    geometries = list(geometries)
+    out = np.full(len(geometries), None, dtype=object)
+    by_type: dict[str, list[int]] = {}
+    for i, geom in enumerate(geometries):
+        if geom:
+            kind = geom.get("type") if geom.get("coordinates") else None
+            by_type.setdefault(kind, []).append(i)
+    for kind, idx in by_type.items():
+        idx = np.asarray(idx)
+        try:
+            if kind in RAGGED:
+                depth, ragged_type = RAGGED[kind]
+                coords, offsets = _flatten([geometries[i]["coordinates"] for i in idx], depth)
+                out[idx] = shapely.from_ragged_array(ragged_type, coords, tuple(offsets) or None)
+            else:
+                out[idx] = shapely.from_geojson([json.dumps(geometries[i]) for i in idx])
+        except Exception:
+            out[idx] = _one_by_one(geometries, idx, labels)
+    return out
+
+
+def feature_geometries(features, labels=None) -> np.ndarray:
+    """geometry_array of the features' "geometry" members."""
+    return geometry_array((f.get("geometry") for f in features), labels)
@@ -6,10 +6,10 @@ Comprehensive data quality cleanup for linear features.
 
 Operations:
   1. Populate missing GEOIDTXT via spatial join with town boundaries
-  2. Standardize Status 'E' → 'Existing'
-  3. Convert PermitNo null/empty → 'Unknown'
-  4. Investigate & document SystemType nulls
-  5. Generate Owner & Source code documentation
+  2. Apply attribute normalization rules from scripts/cleanup_rules.json
+     (Status 'E' → 'Existing', PermitNo null/empty → 'Unknown', ...)
+  3. Investigate & document SystemType nulls
+  4. Generate Owner & Source code documentation
 
 Run from repo root:
     python scripts/cleanup_linear_data.py
@@ -23,13 +23,18 @@ Output:
 import json
 from pathlib import Path
 from collections import Counter, defaultdict
-from shapely.geometry import shape, Point
+
+from normalization_rules import apply_rules, load_rules
+from bulk_geometry import feature_geometries
+from data_loader import load_json, load_json_files
+from town_grid import TownGrid
 
 REPO = Path(__file__).resolve().parent.parent
 LINEAR_DIR = REPO / "data" / "linear_by_rpc"
 TOWNS_FILE = REPO / "data" / "Vermont_Town_GEOID_RPC_County.geojson"
 REPORT_FILE = REPO / "cleanup_report.txt"
 CODEBOOK_FILE = REPO / "analysis" / "Owner_Source_Codebook.md"
+RULES_FILE = REPO / "scripts" / "cleanup_rules.json"
 
 RPC_LIST = [
     "ACRPC", "BCRC", "CCRPC", "CVRPC", "LCPC",
@@ -66,61 +71,59 @@ SOURCE_CODES = {
 
 
 def load_town_index():
-    """Load towns and build spatial index for point-in-polygon lookup."""
+    """Load towns and build the grid index for point-in-polygon lookup."""
     print("Loading town boundaries...")
-    with open(TOWNS_FILE) as f:
-        gj = json.load(f)
+    gj = load_json(TOWNS_FILE)
     
-    town_geoms = []
-    town_geoids = {}
+    town_features = []
+    town_geoids = []
     
     for feat in gj["features"]:
         props = feat.get("properties", {})
-        geoid = props.get("GEOIDTXT")
-        geom = feat.get("geometry")
-        
-        if geoid and geom:
-            try:
-                shp = shape(geom)
-                town_geoms.append((shp, geoid))
-                town_geoids[geoid] = props
-            except Exception as e:
-                print(f"  Warning: Could not parse geometry for {geoid}: {e}")
+        # The towns file names the GEOID TOWNGEOID; GEOIDTXT is the linear-feature field.
+        geoid = props.get("TOWNGEOID") or props.get("GEOIDTXT")
+        if geoid and feat.get("geometry"):
+            town_features.append(feat)
+            town_geoids.append(geoid)
     
-    print(f"  Loaded {len(town_geoms)} town boundaries")
-    return town_geoms
+    town_geoms = feature_geometries(town_features, labels=town_geoids)
+    parsed = [i for i, geom in enumerate(town_geoms) if geom is not None]
+    town_geoms = town_geoms[parsed]
+    town_index = TownGrid(town_geoms, [town_geoids[i] for i in parsed], predicate="contains")
+    coverage = town_index.coverage()
+    print(f"  Loaded {len(town_geoms)} town boundaries "
+          f"(grid cells: {coverage['inside']:.0%} inside a town, {coverage['boundary']:.0%} on a boundary)")
+    return town_index
 
 
-def get_geoid_for_linestring(geom_dict, town_geoms):
-    """Try to find GEOID by testing line endpoints against town polygons."""
-    if not geom_dict:
-        return None
-    
-    geom_type = geom_dict.get("type")
-    coords = geom_dict.get("coordinates", [])
-    
-    if not coords:
-        return None
-    
-    # Get endpoints
-    test_points = []
-    if geom_type == "LineString":
-        if len(coords) >= 2:
-            test_points = [coords[0], coords[-1]]
-    elif geom_type == "MultiLineString":
-        for line in coords:
+def get_geoids_for_linestrings(geom_dicts, town_index):
+    """Try to find each line's GEOID by testing its endpoints against town polygons.
+
+    All endpoints are looked up in one call; a line gets the town of its
+    first endpoint (in coordinate order) that lies in one.
+    """
+    xs, ys, owner = [], [], []
+    for i, geom_dict in enumerate(geom_dicts):
+        if not geom_dict:
+            continue
+        geom_type = geom_dict.get("type")
+        coords = geom_dict.get("coordinates", [])
+        if geom_type == "LineString":
+            lines = [coords]
+        elif geom_type == "MultiLineString":
+            lines = coords
+        else:
+            lines = []
+        for line in lines:
             if len(line) >= 2:
-                test_points.append(line[0])
-                test_points.append(line[-1])
+                for lon, lat in (line[0], line[-1]):
+                    xs.append(lon)
+                    ys.append(lat)
+                    owner.append(i)
     
-    # Test each endpoint against town polygons
-    for lon, lat in test_points:
-        pt = Point(lon, lat)
-        for town_shp, geoid in town_geoms:
-            if town_shp.contains(pt):
-                return geoid
-    
-    return None
+    # Interior grid cells answer directly, boundary cells fall back to the
+    # exact contains test
+    return town_index.lookup_first(xs, ys, owner, len(geom_dicts))
 
 
 def cleanup_linear_data():
@@ -129,8 +132,10 @@ def cleanup_linear_data():
     print("STARTING LINEAR DATA CLEANUP")
     print("=" * 80 + "\n")
     
-    # Load town index
-    town_geoms = load_town_index()
+    # Load town index and normalization rules
+    town_index = load_town_index()
+    rules = load_rules(RULES_FILE)
+    print(f"Loaded {len(rules)} normalization rules from {RULES_FILE.name}")
     
     # Track cleanup stats
     stats = {
@@ -138,58 +143,39 @@ def cleanup_linear_data():
         "features_total": 0,
         "geoidtxt_filled": 0,
         "geoidtxt_still_missing": 0,
-        "status_standardized": 0,
-        "permitno_set_unknown": 0,
+        "rule_counts": Counter({rule["counter"]: 0 for rule in rules}),
         "systemtype_missing": [],
     }
     
-    # Process each RPC file
-    for rpc in RPC_LIST:
-        filepath = LINEAR_DIR / f"Vermont_Linear_{rpc}.geojson"
-        if not filepath.exists():
+    # Read every RPC file up front (concurrently), then process in order
+    filepaths = [LINEAR_DIR / f"Vermont_Linear_{rpc}.geojson" for rpc in RPC_LIST]
+    for rpc, filepath, gj in zip(RPC_LIST, filepaths, load_json_files(filepaths)):
+        if gj is None:
             print(f"Warning: {filepath.name} not found")
             continue
         
         print(f"Processing {filepath.name}...")
         
-        with open(filepath) as f:
-            gj = json.load(f)
-        
         features = gj.get("features", [])
         stats["files_processed"] += 1
         stats["features_total"] += len(features)
         
+        # 2. Attribute normalization, applied column-wise in one pass per field
+        stats["rule_counts"].update(apply_rules(features, rules))
+        
+        # 1. Populate GEOIDTXT via spatial join, for the whole file at once
+        missing = [feat for feat in features if not feat.get("properties", {}).get("GEOIDTXT")]
+        for feat, geoid in zip(missing, get_geoids_for_linestrings([f.get("geometry") for f in missing], town_index)):
+            if geoid:
+                feat["properties"]["GEOIDTXT"] = geoid
+                stats["geoidtxt_filled"] += 1
+            else:
+                stats["geoidtxt_still_missing"] += 1
+        
         for feat in features:
             props = feat.get("properties", {})
             
-            # 1. Populate GEOIDTXT via spatial join
-            if not props.get("GEOIDTXT"):
-                geom = feat.get("geometry")
-                if geom:
-                    geoid = get_geoid_for_linestring(geom, town_geoms)
-                    if geoid:
-                        props["GEOIDTXT"] = geoid
-                        stats["geoidtxt_filled"] += 1
-                    else:
-                        stats["geoidtxt_still_missing"] += 1
-                else:
-                    stats["geoidtxt_still_missing"] += 1
-            
-            # 2. Standardize Status 'E' → 'Existing'
-            if props.get("Status") == "E":
-                props["Status"] = "Existing"
-                stats["status_standardized"] += 1
-            
-            # 3. Convert PermitNo null/empty → 'Unknown'
-            permit = props.get("PermitNo")
-            if permit is None or permit == "" or permit.strip() == "":
-                props["PermitNo"] = "Unknown"
-                stats["permitno_set_unknown"] += 1
-            elif permit in ("N/A", " "):
-                props["PermitNo"] = "Unknown"
-                stats["permitno_set_unknown"] += 1
-            
-            # 4. Track missing SystemType
+            # 3. Track missing SystemType
             if not props.get("SystemType"):
                 stats["systemtype_missing"].append({
                     "rpc": rpc,
@@ -225,13 +211,16 @@ def cleanup_linear_data():
         f"Still missing: {stats['geoidtxt_still_missing']:,}",
         f"Coverage after cleanup: {(stats['features_total'] - stats['geoidtxt_still_missing']) / stats['features_total'] * 100:.1f}%",
         f"",
-        f"STATUS STANDARDIZATION",
+        f"NORMALIZATION RULES ({RULES_FILE.name})",
         f"-" * 80,
-        f"'E' values converted to 'Existing': {stats['status_standardized']}",
-        f"",
-        f"PERMITNO STANDARDIZATION",
-        f"-" * 80,
-        f"Null/empty/'N/A' converted to 'Unknown': {stats['permitno_set_unknown']:,}",
+    ]
+    for rule in rules:
+        report_lines.append(
+            f"{rule['field']}: {rule.get('description', rule['counter'])}: "
+            f"{stats['rule_counts'][rule['counter']]:,}"
+        )
+    
+    report_lines += [
         f"",
         f"SYSTEMTYPE NULL INVESTIGATION",
         f"-" * 80,
@@ -340,8 +329,8 @@ def cleanup_linear_data():
     print(f"\nCLEANUP STATISTICS:")
     print(f"  GEOIDTXT filled: {stats['geoidtxt_filled']:,}")
     print(f"  GEOIDTXT still missing: {stats['geoidtxt_still_missing']:,}")
-    print(f"  Status values standardized: {stats['status_standardized']}")
-    print(f"  PermitNo set to 'Unknown': {stats['permitno_set_unknown']:,}")
+    for rule in rules:
+        print(f"  {rule['counter']}: {stats['rule_counts'][rule['counter']]:,}")
     print(f"  SystemType missing (investigate): {len(stats['systemtype_missing'])}")
 
 
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+cluster_points.py
+-----------------
+Precompute a cluster pyramid of Vermont_Point_Features.geojson for the
+mapping site, so zoomed-out views draw a few hundred cluster markers
+instead of tens of thousands of circleMarkers.
+
+Clustering is grid based (the same idea as supercluster, on a fixed
+grid): at zoom z the map is cut into cells of --radius screen pixels, and
+every cluster of zoom z + 1 falls into the cell containing its centroid.
+Cells at zoom z are exactly four cells of zoom z + 1, so the levels nest —
+every cluster is the union of its children one zoom in, and each carries
+the id of its parent one zoom out. Each level is built from the one below
+with NumPy grouping (np.unique + reduceat), so the whole pyramid costs
+about as much as reading the points.
+
+Each cluster carries its member count, the counts by Type and by
+SystemType, the bounding box of its members (so the site can zoom to it),
+and sits at the mean position of its members.
+
+Run from the repo root:
+    python scripts/cluster_points.py
+    python scripts/cluster_points.py --min-zoom 7 --max-zoom 11 --radius 50
+
+Input:   data/Vermont_Point_Features.geojson
+Output:  data/point_clusters/clusters_z<z>.geojson  (one per zoom)
+             Point features with properties
+             {"id", "parent", "count", "types": {Type: n},
+              "systems": {SystemType: n}, "bbox": [w, s, e, n]}
+         data/point_clusters/index.json
+             {"source", "total", "radius", "min_zoom", "max_zoom",
+              "detail_zoom", "zooms": {z: {"file", "clusters"}},
+              "types", "systems"}
+         Above max_zoom (detail_zoom and in) the site shows the points
+         themselves.
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from data_loader import load_json
+
+REPO = Path(__file__).resolve().parent.parent
+INPUT = REPO / "data" / "Vermont_Point_Features.geojson"
+OUTPUT_DIR = REPO / "data" / "point_clusters"
+MANIFEST = OUTPUT_DIR / "index.json"
+
+TILE_SIZE = 256  # Leaflet / web mercator tile size in pixels
+
+
+def point_xy(geom):
+    """Coordinates of a Point (first point of a MultiPoint), or None."""
+    if not geom or not geom.get("coordinates"):
+        return None
+    if geom["type"] == "Point":
+        return geom["coordinates"][:2]
+    if geom["type"] == "MultiPoint":
+        return geom["coordinates"][0][:2]
+    return None
+
+
+def read_points(path):
+    """Positions and Type / SystemType codes of every point feature.
+
+    Returns (lon, lat, type_idx, sys_idx, type_names, sys_names); features
+    without a point geometry are dropped.
+    """
+    gj = load_json(path)
+    lon, lat, type_keys, sys_keys = [], [], [], []
+    for feat in gj["features"]:
+        xy = point_xy(feat.get("geometry"))
+        if xy is None:
+            continue
+        props = feat.get("properties") or {}
+        ptype = props.get("Type")
+        lon.append(xy[0])
+        lat.append(xy[1])
+        type_keys.append("none" if ptype in (None, "") else str(ptype))
+        sys_keys.append(props.get("SystemType") or "none")
+
+    type_names = sorted(set(type_keys), key=lambda t: (len(t), t))
+    sys_names = sorted(set(sys_keys))
+    type_code = {t: i for i, t in enumerate(type_names)}
+    sys_code = {s: i for i, s in enumerate(sys_names)}
+    return (
+        np.array(lon, dtype=np.float64),
+        np.array(lat, dtype=np.float64),
+        np.array([type_code[t] for t in type_keys], dtype=np.int32),
+        np.array([sys_code[s] for s in sys_keys], dtype=np.int32),
+        type_names,
+        sys_names,
+    )
+
+
+def mercator(lon, lat):
+    """Web mercator coordinates scaled to [0, 1] (x east, y south)."""
+    x = lon / 360.0 + 0.5
+    sin = np.sin(np.radians(lat))
+    y = 0.5 - np.log((1 + sin) / (1 - sin)) / (4 * math.pi)
+    return x, y
+
+
+def one_hot_counts(idx, n):
+    counts = np.zeros((len(idx), n), dtype=np.int32)
+    counts[np.arange(len(idx)), idx] = 1
+    return counts
+
+
+def cluster_level(level, zoom, radius):
+    """Group the clusters of zoom + 1 into grid cells of `radius` px at `zoom`.
+
+    Returns (clusters at zoom, parent index of each input cluster).
+    """
+    cell = radius / (TILE_SIZE * 2 ** zoom)
+    cx = np.floor(level["x"] / cell).astype(np.int64)
+    cy = np.floor(level["y"] / cell).astype(np.int64)
+    key = cx * (int(1 / cell) + 2) + cy
+    _, parent = np.unique(key, return_inverse=True)
+    parent = parent.ravel()
+
+    order = np.argsort(parent, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(parent[order]) != 0])
+    count = np.add.reduceat(level["count"][order], starts)
+    weights = level["count"][order]
+    return {
+        "x": np.add.reduceat(level["x"][order] * weights, starts) / count,
+        "y": np.add.reduceat(level["y"][order] * weights, starts) / count,
+        "lon": np.add.reduceat(level["lon"][order] * weights, starts) / count,
+        "lat": np.add.reduceat(level["lat"][order] * weights, starts) / count,
+        "count": count,
+        "types": np.add.reduceat(level["types"][order], starts, axis=0),
+        "systems": np.add.reduceat(level["systems"][order], starts, axis=0),
+        "bbox": np.column_stack([
+            np.minimum.reduceat(level["bbox"][order, 0], starts),
+            np.minimum.reduceat(level["bbox"][order, 1], starts),
+            np.maximum.reduceat(level["bbox"][order, 2], starts),
+            np.maximum.reduceat(level["bbox"][order, 3], starts),
+        ]),
+    }, parent
+
+
+def build_pyramid(lon, lat, type_idx, sys_idx, n_types, n_sys, min_zoom, max_zoom, radius):
+    """Cluster levels keyed by zoom, and each level's parent ids one zoom out."""
+    x, y = mercator(lon, lat)
+    level = {
+        "x": x, "y": y, "lon": lon, "lat": lat,
+        "count": np.ones(len(lon), dtype=np.int64),
+        "types": one_hot_counts(type_idx, n_types),
+        "systems": one_hot_counts(sys_idx, n_sys),
+        "bbox": np.column_stack([lon, lat, lon, lat]),
+    }
+    levels, parents = {}, {}
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        level, parent = cluster_level(level, zoom, radius)
+        levels[zoom] = level
+        if zoom < max_zoom:
+            parents[zoom + 1] = parent
+    return levels, parents
+
+
+def level_features(level, parent, type_names, sys_names):
+    features = []
+    for i in range(len(level["count"])):
+        types = {type_names[t]: int(n) for t, n in enumerate(level["types"][i]) if n}
+        systems = {sys_names[s]: int(n) for s, n in enumerate(level["systems"][i]) if n}
+        features.append({
+            "type": "Feature",
+            "properties": {
+                "id": i,
+                "parent": int(parent[i]) if parent is not None else None,
+                "count": int(level["count"][i]),
+                "types": types,
+                "systems": systems,
+                "bbox": [round(float(v), 6) for v in level["bbox"][i]],
+            },
+            "geometry": {
+                "type": "Point",
+                "coordinates": [round(float(level["lon"][i]), 6), round(float(level["lat"][i]), 6)],
+            },
+        })
+    return features
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute point clusters per zoom level for the map.")
+    parser.add_argument("--min-zoom", type=int, default=7, help="lowest zoom level (default 7, the map's minZoom)")
+    parser.add_argument("--max-zoom", type=int, default=11,
+                        help="highest clustered zoom; points are shown individually beyond it (default 11)")
+    parser.add_argument("--radius", type=float, default=50, help="cluster cell size in screen pixels (default 50)")
+    args = parser.parse_args()
+    if args.min_zoom > args.max_zoom:
+        parser.error("--min-zoom must not be greater than --max-zoom")
+
+    t0 = time.perf_counter()
+    print(f"Reading {INPUT.relative_to(REPO)}...")
+    lon, lat, type_idx, sys_idx, type_names, sys_names = read_points(INPUT)
+    print(f"  {len(lon):,} points in {time.perf_counter() - t0:.2f}s")
+
+    t1 = time.perf_counter()
+    levels, parents = build_pyramid(lon, lat, type_idx, sys_idx, len(type_names), len(sys_names),
+                                    args.min_zoom, args.max_zoom, args.radius)
+    print(f"  clustered {args.max_zoom - args.min_zoom + 1} zoom levels in {time.perf_counter() - t1:.2f}s")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    zooms = {}
+    for zoom in range(args.min_zoom, args.max_zoom + 1):
+        path = OUTPUT_DIR / f"clusters_z{zoom}.geojson"
+        features = level_features(levels[zoom], parents.get(zoom), type_names, sys_names)
+        with open(path, "w") as f:
+            json.dump({"type": "FeatureCollection", "features": features}, f, separators=(",", ":"))
+        zooms[str(zoom)] = {"file": path.name, "clusters": len(features)}
+        print(f"  z{zoom}: {len(features):,} clusters → {path.name} ({path.stat().st_size / 1024:,.0f} KB)")
+
+    # Remove levels from an earlier run with a wider zoom range.
+    for old in OUTPUT_DIR.glob("clusters_z*.geojson"):
+        if old.name not in {z["file"] for z in zooms.values()}:
+            old.unlink()
+
+    manifest = {
+        "source": INPUT.name,
+        "total": int(len(lon)),
+        "radius": args.radius,
+        "min_zoom": args.min_zoom,
+        "max_zoom": args.max_zoom,
+        "detail_zoom": args.max_zoom + 1,
+        "zooms": zooms,
+        "types": type_names,
+        "systems": sys_names,
+    }
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    print(f"\nDone in {time.perf_counter() - t0:.2f}s")
+    print(f"Manifest: {MANIFEST.relative_to(REPO)}")
+
+
+if __name__ == "__main__":
+    main()
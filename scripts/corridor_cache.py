@@ -0,0 +1,133 @@
+"""
+corridor_cache.py
+-----------------
+Incremental, tiled cache of the buffered-and-unioned sewer corridor.
+
+The projected plane is cut into square tiles (TILE_M metres). A segment
+belongs to every tile its buffer can reach: its envelope grown by the
+buffer distance (the halo) is tested against the tiles. The corridor inside
+a tile is then the union of its segments' buffers clipped to the tile box,
+and depends on nothing else. So:
+
+  key(tile)  = hash(tile index, tile size, buffer distance, quad_segs, CRS,
+                    sorted hashes of the WKB of the tile's segments)
+
+and the clipped corridor is stored as WKB under that key. On a rerun only
+tiles whose key has no cache file are buffered and unioned. That includes
+tiles next to changed segments, since the halo puts those segments in
+their key. Tile pieces do not overlap, so the total area is the sum of the
+pieces' areas after clipping each to the Vermont boundary. Tiles entirely
+inside the boundary are kept whole; tiles entirely outside are dropped.
+
+Files live in .cache/corridor_tiles/<params hash>/<tile key>.wkb. Files for
+tiles no longer in use are removed after each run, like the stale files in
+boundary_cache.py.
+
+    from corridor_cache import tiled_corridor
+    result = tiled_corridor(lines_utm, 91.4432, boundary=vt_utm)
+    result["area_m2"], result["pieces"], result["recomputed"]
+
+Used by verify_sewer_corridor.py; not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+import shapely
+
+from projection import UTM_18N
+
+REPO = Path(__file__).resolve().parent.parent
+CACHE_DIR = REPO / ".cache" / "corridor_tiles"
+FORMAT_VERSION = 1
+TILE_M = 5000.0
+
+
+def _params_dir(distance: float, quad_segs: int, crs: str, tile: float) -> Path:
+    h = hashlib.blake2b(digest_size=8)
+    h.update(f"{FORMAT_VERSION}:{distance!r}:{quad_segs}:{crs}:{tile!r}".encode())
+    return CACHE_DIR / h.hexdigest()
+
+
+def assign_tiles(lines, distance: float, tile: float):
+    """(tile_x, tile_y, segment index) for every tile each segment's buffer reaches."""
+    bounds = shapely.bounds(lines)
+    tx0 = np.floor((bounds[:, 0] - distance) / tile).astype(np.int64)
+    ty0 = np.floor((bounds[:, 1] - distance) / tile).astype(np.int64)
+    nx = np.floor((bounds[:, 2] + distance) / tile).astype(np.int64) - tx0 + 1
+    ny = np.floor((bounds[:, 3] + distance) / tile).astype(np.int64) - ty0 + 1
+
+    count = nx * ny
+    seg = np.repeat(np.arange(len(lines)), count)
+    k = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    return tx0[seg] + k % nx[seg], ty0[seg] + k // nx[seg], seg
+
+
+def tiled_corridor(lines, distance: float, boundary=None, crs: str = UTM_18N,
+                   tile: float = TILE_M, quad_segs: int = 16) -> dict:
+    """Corridor of `lines` (projected, metres) buffered by `distance`, from the tile cache.
+
+    Returns {"pieces": clipped tile pieces, "area_m2", "tiles", "recomputed"}.
+    """
+    lines = np.asarray(lines, dtype=object)
+    lines = lines[~shapely.is_missing(lines) & ~shapely.is_empty(lines)]
+    if not len(lines):
+        return {"pieces": np.empty(0, dtype=object), "area_m2": 0.0, "tiles": 0, "recomputed": 0}
+    seg_keys = [hashlib.blake2b(wkb, digest_size=16).digest() for wkb in shapely.to_wkb(lines)]
+
+    tx, ty, seg = assign_tiles(lines, distance, tile)
+    order = np.lexsort((seg, tx, ty))
+    tx, ty, seg = tx[order], ty[order], seg[order]
+    starts = np.flatnonzero((np.diff(tx) != 0) | (np.diff(ty) != 0)) + 1
+    members = np.split(seg, starts)
+    tiles = list(zip(tx[np.r_[0, starts]].tolist(), ty[np.r_[0, starts]].tolist()))
+
+    params_dir = _params_dir(distance, quad_segs, crs, tile)
+    params_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for (i, j), idx in zip(tiles, members):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{i}:{j}:".encode())
+        for key in sorted(seg_keys[s] for s in idx):
+            h.update(key)
+        paths.append(params_dir / f"{h.hexdigest()}.wkb")
+
+    corner = np.array(tiles, dtype=np.float64) * tile
+    boxes = shapely.box(corner[:, 0], corner[:, 1], corner[:, 0] + tile, corner[:, 1] + tile)
+    dirty = [n for n, path in enumerate(paths) if not path.exists()]
+    if dirty:
+        need = np.unique(np.concatenate([members[n] for n in dirty]))
+        buffers = np.full(len(lines), None, dtype=object)
+        buffers[need] = shapely.buffer(lines[need], distance, quad_segs=quad_segs)
+        for n in dirty:
+            piece = shapely.intersection(shapely.union_all(buffers[members[n]]), boxes[n])
+            tmp = paths[n].with_name(f"{paths[n].stem}.{os.getpid()}.tmp")
+            tmp.write_bytes(shapely.to_wkb(piece))
+            os.replace(tmp, paths[n])
+
+    pieces = shapely.from_wkb([path.read_bytes() for path in paths])
+    if boundary is not None:
+        shapely.prepare(boundary)
+        inside = shapely.contains_properly(boundary, boxes)
+        crossing = ~inside & shapely.intersects(boundary, boxes)
+        pieces[crossing] = shapely.intersection(pieces[crossing], boundary)
+        pieces = pieces[inside | crossing]
+    # Tile-border slivers of a clip can come back as collections; keep the polygons.
+    pieces = shapely.get_parts(pieces)
+    pieces = pieces[shapely.get_type_id(pieces) == shapely.GeometryType.POLYGON]
+
+    in_use = set(paths)
+    for stale in params_dir.glob("*.wkb"):
+        if stale not in in_use:
+            stale.unlink()
+
+    return {
+        "pieces": pieces,
+        "area_m2": float(shapely.area(pieces).sum()),
+        "tiles": len(paths),
+        "recomputed": len(dirty),
+    }
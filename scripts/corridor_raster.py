@@ -0,0 +1,161 @@
+"""
+corridor_raster.py
+------------------
+Raster approximation of the sewer service corridor, used by
+verify_sewer_corridor.py --mode raster.
+
+The projected lines are densified and burned into a grid (default 10 m
+cells). For each cell the Euclidean distance to the nearest line cell is
+computed with a separable distance transform truncated at the buffer
+radius: a vertical pass gives the distance to the nearest line cell in the
+same column, and a horizontal pass takes the minimum of dx² + dy² over the
+2R + 1 columns within reach. Cells within the radius form the corridor.
+
+The grid is processed in square tiles with a halo of R cells, so memory is
+bounded by the tile size no matter how large the state is, and tiles with
+no lines nearby are skipped. Corridor cells are then masked with the
+Vermont boundary: tiles entirely inside the boundary are kept whole, tiles
+entirely outside are dropped, and only tiles crossing it test individual
+cell centres.
+
+Only NumPy and shapely are needed. Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import shapely
+
+
+def burn_lines(lines, cell: float, origin: tuple[float, float]) -> np.ndarray:
+    """Return the unique (row, col) grid cells touched by the lines."""
+    # Vertices at most half a cell apart hit every cell the line crosses
+    # except for corner clips, which the error bound covers.
+    dense = shapely.segmentize(lines, cell / 2)
+    xy = shapely.get_coordinates(dense)
+    cols = np.floor((xy[:, 0] - origin[0]) / cell).astype(np.int64)
+    rows = np.floor((xy[:, 1] - origin[1]) / cell).astype(np.int64)
+    # Dedupe on a single int64 key; far cheaper than np.unique(axis=0).
+    width = int(cols.max()) + 1
+    flat = np.unique(rows * width + cols)
+    return np.column_stack([flat // width, flat % width])
+
+
+def truncated_edt_within(mask: np.ndarray, radius_cells: float) -> np.ndarray:
+    """Boolean array: cells whose Euclidean distance to a True cell <= radius."""
+    h, w = mask.shape
+    reach = int(math.floor(radius_cells))
+    big = reach + 1  # anything beyond the radius is "far"
+
+    # Vertical pass: distance to the nearest line cell in the same column.
+    idx = np.arange(h, dtype=np.int32)[:, None]
+    above = np.where(mask, idx, -(big + h))
+    np.maximum.accumulate(above, axis=0, out=above)
+    below = np.where(mask, idx, 2 * h + big)
+    below = np.minimum.accumulate(below[::-1], axis=0)[::-1]
+    g = np.minimum(idx - above, below - idx)
+    np.minimum(g, big, out=g)
+    # g² and dx² are each at most big², so sums stay below 2 * big². int16
+    # halves the memory traffic of the horizontal pass while that fits.
+    dtype = np.int16 if 2 * big * big <= np.iinfo(np.int16).max else np.int32
+    g2 = (g * g).astype(dtype)
+
+    # Horizontal pass: min over dx of dx² + g²(x + dx), limited to the radius.
+    # Rows with no line cell within reach stay outside the corridor.
+    r2 = radius_cells * radius_cells
+    within = np.zeros(mask.shape, dtype=bool)
+    active = np.flatnonzero(g.min(axis=1) < big)
+    if not len(active):
+        return within
+    g2 = g2[active]
+    best = g2.copy()
+    shifted = np.empty_like(g2)
+    for dx in range(1, reach + 1):
+        d = dx * dx
+        np.add(g2[:, :-dx], d, out=shifted[:, dx:])
+        np.minimum(best[:, dx:], shifted[:, dx:], out=best[:, dx:])
+        np.add(g2[:, dx:], d, out=shifted[:, :-dx])
+        np.minimum(best[:, :-dx], shifted[:, :-dx], out=best[:, :-dx])
+    within[active] = best <= r2
+    return within
+
+
+def raster_corridor_area(lines, boundary, radius: float, cell: float = 10.0, tile: int = 128) -> dict:
+    """Approximate corridor area (m²) of `lines` buffered by `radius`, clipped to `boundary`.
+
+    Returns the area, the number of corridor and edge cells, and an error
+    bound estimate: every edge cell can be misclassified, and burning the
+    lines into cells shifts the corridor edge by up to half a cell diagonal.
+    """
+    minx, miny, maxx, maxy = shapely.total_bounds(lines)
+    origin = (minx - radius - cell, miny - radius - cell)
+    radius_cells = radius / cell
+    halo = int(math.ceil(radius_cells)) + 1
+
+    line_cells = burn_lines(lines, cell, origin)
+    shapely.prepare(boundary)
+
+    # Assign each line cell to every tile whose haloed extent contains it:
+    # all tiles from (r - halo) // tile to (r + halo) // tile on each axis,
+    # which is up to 2 * halo // tile + 2 tiles. Tile indices are shifted by
+    # one so the (row, col, cell) key stays non-negative for the leftmost tiles.
+    tile = max(tile, halo)
+    rows, cols = line_cells[:, 0], line_cells[:, 1]
+    n = len(line_cells)
+    n_tx = int(cols.max() + halo) // tile + 2
+    ids = np.arange(n, dtype=np.int64)
+    ty0, ty1 = (rows - halo) // tile, (rows + halo) // tile
+    tx0, tx1 = (cols - halo) // tile, (cols + halo) // tile
+    span = 2 * halo // tile + 2
+    parts = []
+    for dy in range(span):
+        for dx in range(span):
+            ok = (ty0 + dy <= ty1) & (tx0 + dx <= tx1)
+            parts.append(((ty0[ok] + dy + 1) * n_tx + tx0[ok] + dx + 1) * n + ids[ok])
+    keys = np.unique(np.concatenate(parts))
+    tile_key, cell_id = np.divmod(keys, n)
+    starts = np.flatnonzero(np.diff(tile_key)) + 1
+    tile_of = {}
+    for group_keys, group_ids in zip(np.split(tile_key, starts), np.split(cell_id, starts)):
+        ty, tx = divmod(int(group_keys[0]), n_tx)
+        tile_of[(ty - 1, tx - 1)] = line_cells[group_ids]
+
+    corridor_cells = 0
+    edge_cells = 0
+    for (ty, tx), cells in tile_of.items():
+        r0, c0 = ty * tile - halo, tx * tile - halo
+        size = tile + 2 * halo
+        mask = np.zeros((size, size), dtype=bool)
+        mask[cells[:, 0] - r0, cells[:, 1] - c0] = True
+        inside = truncated_edt_within(mask, radius_cells)
+
+        # Edge cells: corridor cells with a 4-neighbour outside the corridor.
+        core = inside[1:-1, 1:-1]
+        edge = core & ~(inside[:-2, 1:-1] & inside[2:, 1:-1] & inside[1:-1, :-2] & inside[1:-1, 2:])
+        core = core[halo - 1:halo - 1 + tile, halo - 1:halo - 1 + tile]
+        edge = edge[halo - 1:halo - 1 + tile, halo - 1:halo - 1 + tile]
+
+        x0 = origin[0] + tx * tile * cell
+        y0 = origin[1] + ty * tile * cell
+        tile_box = shapely.box(x0, y0, x0 + tile * cell, y0 + tile * cell)
+        if not boundary.intersects(tile_box):
+            continue
+        if not boundary.contains_properly(tile_box):
+            rr, cc = np.nonzero(core)
+            keep = shapely.contains_xy(boundary, x0 + (cc + 0.5) * cell, y0 + (rr + 0.5) * cell)
+            core = np.zeros_like(core)
+            core[rr[keep], cc[keep]] = True
+            edge &= core
+        corridor_cells += int(core.sum())
+        edge_cells += int(edge.sum())
+
+    cell_area = cell * cell
+    return {
+        "area_m2": corridor_cells * cell_area,
+        "cells": corridor_cells,
+        "edge_cells": edge_cells,
+        "tiles": len(tile_of),
+        "error_bound_m2": edge_cells * cell_area * (1 + math.sqrt(2) / 2),
+    }
@@ -0,0 +1,78 @@
+"""
+data_loader.py
+--------------
+Concurrent GeoJSON/JSON loader shared by the scripts.
+
+    from data_loader import load_json_files
+    towns_gj, *rpc_gjs = load_json_files([TOWNS_FILE, *rpc_paths])
+
+Files are read on a thread pool, so disk reads overlap each other and the
+parsing of files that have already arrived. Parsing uses orjson when it is
+installed (a C parser several times faster than json).
+
+load_json_files(..., processes=True) reads and parses in a process pool
+instead, when orjson is missing, there is more than one CPU and the start
+method is fork. That keeps the stdlib parser from being serialized by the
+GIL, but every parsed dict is pickled back to the parent, and forking a
+process that already runs threads (watch.py --serve) can deadlock. It is
+off by default until a multi-core measurement shows a gain.
+
+Results always come back in the order of the paths given, whatever order
+the reads finish in. A missing file yields None so callers can keep their
+own "not found — skipping" handling.
+
+Only the standard library is required. Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def parse_json(data: bytes):
+    """Parse JSON bytes with orjson if available, else the stdlib."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _read_and_parse(path: Path):
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    return parse_json(data)
+
+
+def load_json_files(paths, workers: int | None = None, processes: bool = False) -> list:
+    """Load several JSON files concurrently; results follow the order of `paths`.
+
+    processes=True opts in to the process pool described above.
+    """
+    paths = [Path(p) for p in paths]
+    if not paths:
+        return []
+    cpus = os.cpu_count() or 1
+    # Only fork: a spawned worker starts a fresh interpreter and re-imports
+    # the calling script with its numpy/shapely imports, which costs more
+    # than parsing the files in parallel saves.
+    if (processes and orjson is None and cpus > 1 and len(paths) > 1
+            and multiprocessing.get_start_method() == "fork"):
+        with ProcessPoolExecutor(max_workers=min(workers or cpus, len(paths))) as pool:
+            return list(pool.map(_read_and_parse, paths))
+    with ThreadPoolExecutor(max_workers=min(workers or 8, len(paths))) as pool:
+        return list(pool.map(_read_and_parse, paths))
+
+
+def load_json(path):
+    """Load a single JSON file (orjson when available)."""
+    return parse_json(Path(path).read_bytes())
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+dedupe_linear_features.py
+-------------------------
+Find (and optionally drop) duplicate and overlapping linear features across
+the per-RPC files. transform_investment_to_linear_by_rpc.py writes
+investment-derived features into the same files as the original inventory,
+so the same pipe can end up in the dataset twice and inflate the length
+totals in update_static_charts.py.
+
+Two passes:
+  1. Exact duplicates — every geometry gets a normalized hash. Coordinates
+     are quantized (default 1e-6 degrees, ~0.1 m), each part is oriented
+     so that the hash does not depend on digitizing direction, and the parts
+     of a MultiLineString are sorted.
+  2. Near duplicates — the remaining geometries are projected to local
+     metres and put in an STRtree. Candidate pairs within --tolerance are
+     confirmed with a Hausdorff-distance check, so a short stub lying next to
+     a long pipe is not reported.
+
+Repeated GlobalIDs are reported (globalid_repeat column), but a shared
+GlobalID alone does not make a duplicate: two different pipes can carry
+the same ID by mistake. A repeat that neither pass confirms is reported
+with kind "globalid" and is never dropped; --drop removes only features
+confirmed by pass 1 or 2.
+
+By default only features with the same SystemType are compared. The first
+occurrence (in RPC file order, then feature order) is kept, and later copies
+are reported against it.
+
+Run from repo root:
+    python scripts/dedupe_linear_features.py            # report only
+    python scripts/dedupe_linear_features.py --drop     # rewrite RPC files
+
+Input:   data/linear_by_rpc/Vermont_Linear_<RPC>.geojson
+Output:  analysis/duplicate_linear_features.csv
+         (with --drop) updated data/linear_by_rpc/Vermont_Linear_<RPC>.geojson
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import shapely
+from shapely.geometry import shape
+
+REPO = Path(__file__).resolve().parent.parent
+LINEAR_DIR = REPO / "data" / "linear_by_rpc"
+REPORT_CSV = REPO / "analysis" / "duplicate_linear_features.csv"
+
+# Metres per degree of latitude; longitude is scaled by cos(lat).
+M_PER_DEG = 111_320.0
+
+
+def load_linear_files() -> list[tuple[Path, dict]]:
+    """Load every RPC split file, keeping the path for write-back."""
+    files = []
+    for path in sorted(LINEAR_DIR.glob("Vermont_Linear_*.geojson")):
+        with path.open() as f:
+            files.append((path, json.load(f)))
+    return files
+
+
+def geometry_hash(geom: dict, precision: int) -> str | None:
+    """Quantized, direction-independent hash of a LineString / MultiLineString."""
+    if not geom:
+        return None
+    if geom["type"] == "LineString":
+        parts = [geom["coordinates"]]
+    elif geom["type"] == "MultiLineString":
+        parts = geom["coordinates"]
+    else:
+        return None
+
+    scale = 10 ** precision
+    canonical = []
+    for part in parts:
+        q = [(round(pt[0] * scale), round(pt[1] * scale)) for pt in part]
+        # Drop repeated vertices introduced by quantization.
+        q = [pt for i, pt in enumerate(q) if i == 0 or pt != q[i - 1]]
+        if len(q) < 2:
+            continue
+        canonical.append(tuple(min(q, q[::-1])))
+    if not canonical:
+        return None
+    canonical.sort()
+    return hashlib.blake2b(repr(canonical).encode(), digest_size=16).hexdigest()
+
+
+def to_local_metres(coords: np.ndarray) -> np.ndarray:
+    """Equirectangular projection with longitude scaled by each point's latitude."""
+    x = coords[:, 0] * np.cos(np.radians(coords[:, 1])) * M_PER_DEG
+    y = coords[:, 1] * M_PER_DEG
+    return np.column_stack([x, y])
+
+
+def find_duplicates(records: list[dict], tolerance: float, precision: int, any_system: bool) -> list[dict]:
+    """Return one report row per duplicate feature."""
+    duplicates: dict[int, dict] = {}
+
+    def group_key(rec):
+        return None if any_system else rec["props"].get("SystemType")
+
+    # Repeated GlobalIDs: noted here, confirmed (or not) by the geometry passes.
+    seen_ids: dict[str, int] = {}
+    repeats: dict[int, int] = {}
+    for i, rec in enumerate(records):
+        gid = rec["props"].get("GlobalID")
+        if not gid:
+            continue
+        if gid in seen_ids:
+            repeats[i] = seen_ids[gid]
+        else:
+            seen_ids[gid] = i
+
+    # Pass 1: exact geometry duplicates via normalized hashes.
+    seen_hashes: dict[tuple, int] = {}
+    for i, rec in enumerate(records):
+        h = geometry_hash(rec["geometry"], precision)
+        if h is None:
+            continue
+        key = (group_key(rec), h)
+        if key in seen_hashes:
+            duplicates.setdefault(i, {"kind": "exact", "keep": seen_hashes[key], "hausdorff_m": 0.0})
+        else:
+            seen_hashes[key] = i
+
+    # Pass 2: near duplicates among the features still kept.
+    candidates = [
+        i for i, rec in enumerate(records)
+        if i not in duplicates and rec["geometry"] and rec["geometry"]["type"] in ("LineString", "MultiLineString")
+    ]
+    if candidates:
+        geoms = np.array([shape(records[i]["geometry"]) for i in candidates])
+        geoms = shapely.transform(geoms, to_local_metres)
+        tree = shapely.STRtree(geoms)
+        left, right = tree.query(geoms, predicate="dwithin", distance=tolerance)
+        forward = left < right
+        left, right = left[forward], right[forward]
+        if not any_system:
+            same = np.array([
+                group_key(records[candidates[a]]) == group_key(records[candidates[b]])
+                for a, b in zip(left.tolist(), right.tolist())
+            ], dtype=bool)
+            left, right = left[same], right[same]
+        hausdorff = shapely.hausdorff_distance(geoms[left], geoms[right])
+        close = hausdorff <= tolerance
+        # Pairs come back sorted by the left index, so a feature is only
+        # kept as the reference while it has not been dropped itself.
+        for a, b, d in zip(left[close].tolist(), right[close].tolist(), hausdorff[close].tolist()):
+            ia, ib = candidates[a], candidates[b]
+            if ia in duplicates or ib in duplicates:
+                continue
+            duplicates[ib] = {"kind": "near", "keep": ia, "hausdorff_m": d}
+
+    # Repeats with a different geometry are only reported.
+    for i, first in repeats.items():
+        if i not in duplicates:
+            duplicates[i] = {"kind": "globalid", "keep": first, "hausdorff_m": None}
+
+    rows = []
+    for i in sorted(duplicates):
+        dup = duplicates[i]
+        rec, keep = records[i], records[dup["keep"]]
+        rows.append({
+            "index": i,
+            "GlobalID": rec["props"].get("GlobalID"),
+            "RPC": rec["rpc"],
+            "SystemType": rec["props"].get("SystemType"),
+            "kind": dup["kind"],
+            "duplicate_of": keep["props"].get("GlobalID"),
+            "duplicate_of_RPC": keep["rpc"],
+            "hausdorff_m": "" if dup["hausdorff_m"] is None else round(dup["hausdorff_m"], 3),
+            "globalid_repeat": "yes" if i in repeats else "",
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Detect duplicate and overlapping linear features.")
+    parser.add_argument("--tolerance", type=float, default=1.0,
+                        help="Hausdorff distance in metres for near duplicates (default 1)")
+    parser.add_argument("--precision", type=int, default=6,
+                        help="decimal places of lon/lat kept for exact-duplicate hashing (default 6)")
+    parser.add_argument("--any-system-type", action="store_true",
+                        help="also match features whose SystemType differs")
+    parser.add_argument("--drop", action="store_true",
+                        help="remove duplicates from the RPC files (first occurrence is kept)")
+    args = parser.parse_args()
+
+    files = load_linear_files()
+    records = []
+    for path, gj in files:
+        rpc = path.stem.replace("Vermont_Linear_", "")
+        for pos, feat in enumerate(gj.get("features", [])):
+            records.append({
+                "path": path,
+                "pos": pos,
+                "rpc": rpc,
+                "props": feat.get("properties") or {},
+                "geometry": feat.get("geometry"),
+            })
+    print(f"Loaded {len(records):,} features from {len(files)} files")
+
+    rows = find_duplicates(records, args.tolerance, args.precision, args.any_system_type)
+
+    REPORT_CSV.parent.mkdir(parents=True, exist_ok=True)
+    fields = ["GlobalID", "RPC", "SystemType", "kind", "duplicate_of", "duplicate_of_RPC", "hausdorff_m",
+              "globalid_repeat"]
+    with REPORT_CSV.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+    by_kind = {k: sum(1 for r in rows if r["kind"] == k) for k in ("globalid", "exact", "near")}
+    confirmed = [r for r in rows if r["kind"] != "globalid"]
+    print(f"Exact geometry duplicates: {by_kind['exact']:,}")
+    print(f"Near duplicates (Hausdorff <= {args.tolerance:g} m): {by_kind['near']:,}")
+    print(f"Repeated GlobalIDs: {sum(1 for r in rows if r['globalid_repeat']):,} "
+          f"({by_kind['globalid']:,} with a different geometry, reported only)")
+    by_system: dict[str, int] = {}
+    for r in confirmed:
+        by_system[r["SystemType"]] = by_system.get(r["SystemType"], 0) + 1
+    for st, n in sorted(by_system.items(), key=lambda kv: -kv[1]):
+        print(f"  {st}: {n:,}")
+    print(f"Report written: {REPORT_CSV.relative_to(REPO)}")
+
+    if not args.drop or not confirmed:
+        return
+
+    drop_by_path: dict[Path, set[int]] = {}
+    for r in confirmed:
+        rec = records[r["index"]]
+        drop_by_path.setdefault(rec["path"], set()).add(rec["pos"])
+
+    for path, gj in files:
+        drop = drop_by_path.get(path)
+        if not drop:
+            continue
+        features = [f for pos, f in enumerate(gj["features"]) if pos not in drop]
+        out = {**{k: v for k, v in gj.items() if k != "features"}, "features": features}
+        with path.open("w") as f:
+            json.dump(out, f)
+        print(f"  {path.name}: dropped {len(drop):,} → {len(features):,} features")
+
+
+if __name__ == "__main__":
+    main()
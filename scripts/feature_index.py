@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+feature_index.py
+----------------
+Persistent GlobalID → (RPC file, byte offset, length) index for the
+per-RPC linear files, so one feature can be read by seeking straight to it
+instead of loading all the RPC files.
+
+    from feature_index import FeatureIndex
+    index = FeatureIndex()
+    for feature in index.get("ae2eb154-7f15-0524-34b9-b5df9e7769b1"):
+        ...
+
+Layout (in .cache/feature_index/):
+  <file>.idx.npy  one sidecar per RPC file: the key, byte offset and length
+                  of every feature, in file order
+  table.bin       open-addressing hash table (linear probing) over all
+                  sidecars, read through mmap; a lookup hashes the GlobalID
+                  and reads one or two 30-byte slots
+  index.json      the RPC files indexed, with the size and mtime each
+                  sidecar was built from
+
+Keys are the 16 bytes of the GlobalID as a UUID (braces and case ignored);
+a GlobalID that is not a UUID is keyed by its BLAKE2b hash. Duplicate
+GlobalIDs are all kept, so a lookup can return several features.
+
+split_linear_by_rpc.py writes the sidecars as it writes the files. When a
+file changes afterwards (cleanup, transform, linear_changeset.py patch),
+only that file is rescanned: update() runs automatically when get() finds
+a file whose size or mtime differs from the index.
+
+Run from the repo root:
+    python scripts/feature_index.py <GlobalID> [<GlobalID> ...]
+    python scripts/feature_index.py --update     # refresh changed files
+    python scripts/feature_index.py --rebuild    # rescan everything
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from geojson_stream import FeatureReader
+
+REPO = Path(__file__).resolve().parent.parent
+LINEAR_DIR = REPO / "data" / "linear_by_rpc"
+INDEX_DIR = REPO / ".cache" / "feature_index"
+FORMAT_VERSION = 1
+
+RECORD = np.dtype([("key", "V16"), ("offset", "<u8"), ("length", "<u4")])
+SLOT = np.dtype([("key", "V16"), ("file", "<u2"), ("length", "<u4"), ("offset", "<u8")])
+SLOT_STRUCT = struct.Struct("<16sHIQ")
+EMPTY = 0xFFFF  # file number of an empty slot
+
+
+class Location(NamedTuple):
+    path: Path
+    offset: int
+    length: int
+
+
+def gid_key(gid) -> bytes:
+    """16-byte index key of a GlobalID."""
+    text = str(gid).strip().strip("{}").lower()
+    try:
+        return uuid.UUID(text).bytes
+    except ValueError:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def file_signature(path: Path) -> dict:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def sidecar_path(index_dir: Path, data_file: Path) -> Path:
+    return index_dir / f"{data_file.name}.idx.npy"
+
+
+def records_from_spans(gids, spans) -> np.ndarray:
+    """Sidecar records from parallel GlobalIDs and (offset, length) spans."""
+    records = np.zeros(len(spans), dtype=RECORD)
+    keep = np.ones(len(spans), dtype=bool)
+    for i, (gid, (offset, length)) in enumerate(zip(gids, spans)):
+        if gid in (None, ""):
+            keep[i] = False
+            continue
+        records[i] = (gid_key(gid), offset, length)
+    return records[keep]
+
+
+def scan_file(path: Path) -> np.ndarray:
+    """Records of every feature with a GlobalID in one GeoJSON file."""
+    gids, spans = [], []
+    with FeatureReader(path) as reader:
+        for feat, offset, length in reader.spans():
+            gids.append((feat.get("properties") or {}).get("GlobalID"))
+            spans.append((offset, length))
+    return records_from_spans(gids, spans)
+
+
+def build_table(parts: list[np.ndarray]) -> np.ndarray:
+    """Linear-probing hash table over the records of every file.
+
+    Insertion is vectorized: in each round every record not yet placed
+    tries its current slot, the first claimant of each free slot gets it,
+    and the rest move one slot on. A record is only ever placed after all
+    slots between its home slot and its final one are taken, so a lookup
+    can stop at the first empty slot.
+    """
+    n = sum(len(p) for p in parts)
+    capacity = 1 << max(4, int(2 * n - 1).bit_length())  # load factor <= 0.5
+    mask = capacity - 1
+    table = np.zeros(capacity, dtype=SLOT)
+    table["file"] = EMPTY
+    if not n:
+        return table
+    records = np.concatenate(parts)
+    file_no = np.concatenate([np.full(len(p), i, dtype=np.uint16) for i, p in enumerate(parts)])
+    home = np.frombuffer(records["key"].tobytes(), dtype="<u8")[::2] & np.uint64(mask)
+
+    owner = np.full(capacity, -1, dtype=np.int64)
+    pending = np.arange(n)
+    slot = home.astype(np.int64)
+    while pending.size:
+        cand = slot[pending]
+        free = owner[cand] == -1
+        free_slots, first = np.unique(cand[free], return_index=True)
+        winners = np.flatnonzero(free)[first]
+        owner[free_slots] = pending[winners]
+        placed = np.zeros(len(pending), dtype=bool)
+        placed[winners] = True
+        pending = pending[~placed]
+        slot[pending] = (slot[pending] + 1) & mask
+
+    used = owner >= 0
+    src = owner[used]
+    table["key"][used] = records["key"][src]
+    table["file"][used] = file_no[src]
+    table["length"][used] = records["length"][src]
+    table["offset"][used] = records["offset"][src]
+    return table
+
+
+class FeatureIndex:
+    """GlobalID lookups over the per-RPC files."""
+
+    def __init__(self, linear_dir: Path = LINEAR_DIR, index_dir: Path = INDEX_DIR):
+        self.linear_dir = Path(linear_dir)
+        self.index_dir = Path(index_dir)
+        self.manifest: dict = {}
+        self._files: list[Path] = []
+        self._mm = None
+        self._mask = 0
+
+    # ── building ──────────────────────────────────────────────────────
+
+    def _load_manifest(self) -> dict:
+        try:
+            manifest = json.loads((self.index_dir / "index.json").read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if manifest.get("version") != FORMAT_VERSION or manifest.get("linear_dir") != str(self.linear_dir):
+            return {}
+        return manifest
+
+    def record_file(self, data_file: Path, records: np.ndarray) -> None:
+        """Store the sidecar of a file that was just written (e.g. by split)."""
+        os.makedirs(self.index_dir, exist_ok=True)
+        np.save(sidecar_path(self.index_dir, data_file), records)
+        manifest = self._load_manifest() or {"version": FORMAT_VERSION, "linear_dir": str(self.linear_dir),
+                                             "files": {}}
+        manifest["files"][data_file.name] = {**file_signature(data_file), "count": int(len(records))}
+        manifest.pop("table", None)  # the table is rebuilt by update()
+        self._write_manifest(manifest)
+
+    def _write_manifest(self, manifest: dict) -> None:
+        tmp = self.index_dir / "index.json.tmp"
+        tmp.write_text(json.dumps(manifest, indent=1))
+        os.replace(tmp, self.index_dir / "index.json")
+
+    def update(self, force: bool = False) -> dict:
+        """Rescan the RPC files that changed and rebuild the table if needed.
+
+        Returns {"scanned": [...], "removed": [...], "table_rebuilt": bool}.
+        """
+        self.close()
+        os.makedirs(self.index_dir, exist_ok=True)
+        manifest = ({} if force else self._load_manifest()) or {
+            "version": FORMAT_VERSION, "linear_dir": str(self.linear_dir), "files": {}}
+        data_files = sorted(self.linear_dir.glob("Vermont_Linear_*.geojson"))
+        names = {p.name for p in data_files}
+
+        scanned = []
+        for path in data_files:
+            entry = manifest["files"].get(path.name)
+            sidecar = sidecar_path(self.index_dir, path)
+            signature = file_signature(path)
+            if entry and sidecar.exists() and {k: entry[k] for k in signature} == signature:
+                continue
+            records = scan_file(path)
+            np.save(sidecar, records)
+            manifest["files"][path.name] = {**signature, "count": int(len(records))}
+            scanned.append(path.name)
+
+        removed = sorted(set(manifest["files"]) - names)
+        for name in removed:
+            del manifest["files"][name]
+            sidecar_path(self.index_dir, Path(name)).unlink(missing_ok=True)
+
+        table_path = self.index_dir / "table.bin"
+        rebuild = bool(scanned or removed) or not table_path.exists() or "table" not in manifest
+        if rebuild:
+            files = sorted(manifest["files"])
+            parts = [np.load(sidecar_path(self.index_dir, Path(name))) for name in files]
+            table = build_table(parts)
+            tmp = self.index_dir / "table.bin.tmp"
+            table.tofile(tmp)
+            os.replace(tmp, table_path)
+            manifest["table"] = {"files": files, "capacity": len(table),
+                                 "count": int(sum(len(p) for p in parts))}
+        self._write_manifest(manifest)
+        self.manifest = manifest
+        return {"scanned": scanned, "removed": removed, "table_rebuilt": rebuild}
+
+    # ── lookup ────────────────────────────────────────────────────────
+
+    def open(self) -> None:
+        """Map the table; builds the index first if there is none."""
+        if self._mm is not None:
+            return
+        manifest = self._load_manifest()
+        if "table" not in manifest or not (self.index_dir / "table.bin").exists():
+            self.update()
+            manifest = self.manifest
+        self.manifest = manifest
+        self._files = [self.linear_dir / name for name in manifest["table"]["files"]]
+        self._mask = manifest["table"]["capacity"] - 1
+        with open(self.index_dir / "table.bin", "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def lookup(self, gid) -> list[Location]:
+        """Where the features with this GlobalID are (no file access)."""
+        self.open()
+        key = gid_key(gid)
+        slot = int.from_bytes(key[:8], "little") & self._mask
+        found = []
+        while True:
+            k, file_no, length, offset = SLOT_STRUCT.unpack_from(self._mm, slot * SLOT.itemsize)
+            if file_no == EMPTY:
+                return found
+            if k == key:
+                found.append(Location(self._files[file_no], offset, length))
+            slot = (slot + 1) & self._mask
+
+    def stale(self) -> list[str]:
+        """RPC files whose size or mtime no longer match the index."""
+        self.open()
+        out = []
+        for path in self.linear_dir.glob("Vermont_Linear_*.geojson"):
+            entry = self.manifest["files"].get(path.name)
+            if not entry or {k: entry[k] for k in ("size", "mtime_ns")} != file_signature(path):
+                out.append(path.name)
+        out.extend(n for n in self.manifest["files"] if not (self.linear_dir / n).exists())
+        return sorted(out)
+
+    @staticmethod
+    def read(location: Location) -> dict:
+        with open(location.path, "rb") as f:
+            f.seek(location.offset)
+            return json.loads(f.read(location.length))
+
+    def get(self, gid) -> list[dict]:
+        """The features with this GlobalID, refreshing the index if the files changed."""
+        locations = self.lookup(gid)
+        if any(self._changed(loc.path) for loc in locations) or (not locations and self.stale()):
+            self.update()
+            locations = self.lookup(gid)
+        return [self.read(loc) for loc in locations]
+
+    def _changed(self, path: Path) -> bool:
+        entry = self.manifest["files"].get(path.name)
+        try:
+            return not entry or {k: entry[k] for k in ("size", "mtime_ns")} != file_signature(path)
+        except FileNotFoundError:
+            return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Look up linear features by GlobalID.")
+    parser.add_argument("gids", nargs="*", metavar="GlobalID")
+    parser.add_argument("--update", action="store_true", help="rescan RPC files that changed")
+    parser.add_argument("--rebuild", action="store_true", help="rescan every RPC file")
+    parser.add_argument("--locate", action="store_true", help="print file/offset/length instead of the feature")
+    args = parser.parse_args()
+    if not (args.gids or args.update or args.rebuild):
+        parser.error("give GlobalIDs to look up, or --update / --rebuild")
+
+    index = FeatureIndex()
+    if args.update or args.rebuild:
+        t0 = time.perf_counter()
+        result = index.update(force=args.rebuild)
+        count = index.manifest["table"]["count"]
+        print(f"Index: {count:,} features in {len(index.manifest['files'])} files "
+              f"({len(result['scanned'])} scanned, {len(result['removed'])} removed, "
+              f"table {'rebuilt' if result['table_rebuilt'] else 'unchanged'}) "
+              f"in {time.perf_counter() - t0:.2f}s")
+
+    missing = 0
+    for gid in args.gids:
+        if args.locate:
+            t0 = time.perf_counter()
+            locations = index.lookup(gid)
+            us = (time.perf_counter() - t0) * 1e6
+            for loc in locations:
+                print(f"{gid}\t{loc.path.relative_to(REPO)}\t{loc.offset}\t{loc.length}\t({us:.0f} µs)")
+            found = bool(locations)
+        else:
+            features = index.get(gid)
+            for feat in features:
+                print(json.dumps(feat, indent=1))
+            found = bool(features)
+        if not found:
+            missing += 1
+            print(f"{gid}: not found", file=sys.stderr)
+    sys.exit(1 if missing else 0)
+
+
+if __name__ == "__main__":
+    main()
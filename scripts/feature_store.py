@@ -0,0 +1,267 @@
+"""
+feature_store.py
+----------------
+Columnar cache of the linear and point features for ad-hoc queries
+(query_features.py), so a question about the statewide data is answered
+from NumPy arrays instead of by parsing GeoJSON.
+
+Each source file becomes one chunk directory under .cache/feature_store/:
+
+  meta.json           source file, its size and mtime, feature count, and
+                      the dictionary (distinct values, in code order) of
+                      each attribute column
+  <Field>.npy         int32 codes of RPC, County, Municipal_Name, GEOIDTXT,
+                      SystemType, Type, Status, Owner, Source
+  length_m.npy        geodesic length per feature (haversine, as
+                      update_static_charts measures it; 0 for points)
+  bbox.npy            (n, 4) min lon, min lat, max lon, max lat (NaN when
+                      there is no geometry)
+  coords.npy          (v, 2) every vertex, with part_offsets.npy (start of
+  part_offsets.npy    each part in coords, plus the end) and
+  part_feature.npy    part_feature.npy (feature of each part), enough to
+                      rebuild the geometries in bulk with shapely
+
+The town polygons are cached the same way (towns/: names, GEOIDs and WKB).
+A chunk is rebuilt when its source file's size or mtime changes; chunks of
+files that no longer exist are removed. Arrays are opened with mmap, so a
+query only pages in the columns it reads.
+
+    from feature_store import load_layer, load_towns
+    for chunk in load_layer("linear"):
+        codes = chunk.column("SystemType")
+        ...
+
+Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+
+from data_loader import load_json
+from hex_density import haversine_m
+
+REPO = Path(__file__).resolve().parent.parent
+LINEAR_DIR = REPO / "data" / "linear_by_rpc"
+POINTS_FILE = REPO / "data" / "Vermont_Point_Features.geojson"
+TOWNS_FILE = REPO / "data" / "Vermont_Town_GEOID_RPC_County.geojson"
+STORE_DIR = REPO / ".cache" / "feature_store"
+FORMAT_VERSION = 1
+
+CATEGORICAL = ["RPC", "County", "Municipal_Name", "GEOIDTXT", "SystemType", "Type", "Status", "Owner", "Source"]
+LAYERS = ("linear", "points")
+
+
+def layer_sources(layer: str) -> list[Path]:
+    if layer == "linear":
+        return sorted(LINEAR_DIR.glob("Vermont_Linear_*.geojson"))
+    if layer == "points":
+        return [POINTS_FILE] if POINTS_FILE.exists() else []
+    raise ValueError(f"unknown layer: {layer}")
+
+
+def signature(path: Path) -> dict:
+    st = path.stat()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _value_key(value):
+    """Hashable stand-in for a property value (lists/dicts are JSON-encoded)."""
+    return json.dumps(value, sort_keys=True) if isinstance(value, (list, dict)) else value
+
+
+def geometry_parts(geom) -> list:
+    """Vertex lists of a (Multi)LineString or (Multi)Point geometry."""
+    if not geom or not geom.get("coordinates"):
+        return []
+    kind, coords = geom["type"], geom["coordinates"]
+    if kind == "LineString":
+        return [coords]
+    if kind == "MultiLineString":
+        return coords
+    if kind == "Point":
+        return [[coords]]
+    if kind == "MultiPoint":
+        return [[c] for c in coords]
+    return []
+
+
+# ── Building ──────────────────────────────────────────────────────────
+
+
+def build_chunk(source: Path, out_dir: Path) -> None:
+    """Parse one GeoJSON file into a chunk directory."""
+    features = load_json(source).get("features", [])
+    n = len(features)
+
+    dictionaries = {}
+    columns = {}
+    for field in CATEGORICAL:
+        values, index = [], {}
+        codes = np.empty(n, dtype=np.int32)
+        for i, feat in enumerate(features):
+            value = (feat.get("properties") or {}).get(field)
+            key = _value_key(value)
+            code = index.get(key)
+            if code is None:
+                code = index[key] = len(values)
+                values.append(value)
+            codes[i] = code
+        dictionaries[field] = values
+        columns[field] = codes
+
+    parts = [(i, part) for i, feat in enumerate(features) for part in geometry_parts(feat.get("geometry"))]
+    counts = np.fromiter((len(p) for _, p in parts), dtype=np.int64, count=len(parts))
+    part_feature = np.fromiter((i for i, _ in parts), dtype=np.int64, count=len(parts))
+    part_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    coords = np.array([(c[0], c[1]) for _, part in parts for c in part], dtype=np.float64).reshape(-1, 2)
+
+    # Length: haversine over consecutive vertices of each part, summed per feature.
+    seg_start = np.ones(len(coords), dtype=bool)
+    seg_start[part_offsets[1:][counts > 0] - 1] = False  # last vertex of a part starts no segment
+    start = np.flatnonzero(seg_start)
+    seg_len = haversine_m(coords[start, 0], coords[start, 1], coords[start + 1, 0], coords[start + 1, 1])
+    vertex_feature = np.repeat(part_feature, counts)
+    length_m = np.bincount(vertex_feature[start], weights=seg_len, minlength=n)
+
+    bbox = np.full((n, 4), np.nan)
+    if len(coords):
+        for col, (ufunc, axis) in enumerate([(np.fmin, 0), (np.fmin, 1), (np.fmax, 0), (np.fmax, 1)]):
+            ufunc.at(bbox[:, col], vertex_feature, coords[:, axis])
+
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for field, codes in columns.items():
+        np.save(tmp / f"{field}.npy", codes)
+    np.save(tmp / "length_m.npy", length_m)
+    np.save(tmp / "bbox.npy", bbox)
+    np.save(tmp / "coords.npy", coords)
+    np.save(tmp / "part_offsets.npy", part_offsets)
+    np.save(tmp / "part_feature.npy", part_feature)
+    meta = {"version": FORMAT_VERSION, "source": str(source.relative_to(REPO)), **signature(source),
+            "count": n, "dictionaries": dictionaries}
+    (tmp / "meta.json").write_text(json.dumps(meta))
+    shutil.rmtree(out_dir, ignore_errors=True)
+    tmp.rename(out_dir)
+
+
+def _fresh(meta_path: Path, source: Path) -> bool:
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return meta.get("version") == FORMAT_VERSION and {k: meta.get(k) for k in ("size", "mtime_ns")} == signature(source)
+
+
+def refresh_layer(layer: str, rebuild: bool = False) -> list[str]:
+    """Rebuild the chunks of `layer` whose source changed; returns their names."""
+    layer_dir = STORE_DIR / layer
+    layer_dir.mkdir(parents=True, exist_ok=True)
+    sources = layer_sources(layer)
+    built = []
+    for source in sources:
+        out_dir = layer_dir / source.stem
+        if rebuild or not _fresh(out_dir / "meta.json", source):
+            build_chunk(source, out_dir)
+            built.append(source.name)
+    names = {s.stem for s in sources}
+    for old in layer_dir.iterdir():
+        if old.is_dir() and old.name not in names:
+            shutil.rmtree(old)
+    return built
+
+
+# ── Reading ───────────────────────────────────────────────────────────
+
+
+class Chunk:
+    """One cached source file; columns are memory-mapped on first use."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta = json.loads((path / "meta.json").read_text())
+        self.count = self.meta["count"]
+        self.dictionaries = self.meta["dictionaries"]
+        self._columns = {}
+
+    def column(self, name: str) -> np.ndarray:
+        if name not in self._columns:
+            self._columns[name] = np.load(self.path / f"{name}.npy", mmap_mode="r")
+        return self._columns[name]
+
+    def codes_for(self, field: str, predicate) -> np.ndarray:
+        """Codes of `field` whose dictionary value satisfies `predicate`."""
+        return np.array([i for i, v in enumerate(self.dictionaries[field]) if predicate(v)], dtype=np.int32)
+
+
+def load_layer(layer: str, refresh: bool = True) -> list[Chunk]:
+    """Chunks of a layer, rebuilding stale ones first unless refresh is False."""
+    if refresh:
+        refresh_layer(layer)
+    layer_dir = STORE_DIR / layer
+    return [Chunk(p) for p in sorted(layer_dir.iterdir()) if (p / "meta.json").exists()] if layer_dir.exists() else []
+
+
+# ── Towns ─────────────────────────────────────────────────────────────
+
+
+def refresh_towns(rebuild: bool = False) -> bool:
+    """Cache the town polygons as WKB; returns True if rebuilt."""
+    import shapely
+    from shapely.geometry import shape
+
+    out_dir = STORE_DIR / "towns"
+    if not rebuild and _fresh(out_dir / "meta.json", TOWNS_FILE):
+        return False
+    towns = [t for t in load_json(TOWNS_FILE).get("features", []) if t.get("geometry")]
+    wkb = [shapely.to_wkb(shape(t["geometry"])) for t in towns]
+    offsets = np.concatenate([[0], np.cumsum([len(b) for b in wkb])]).astype(np.int64)
+    props = [t.get("properties") or {} for t in towns]
+    meta = {"version": FORMAT_VERSION, "source": str(TOWNS_FILE.relative_to(REPO)), **signature(TOWNS_FILE),
+            "count": len(towns),
+            "names": [p.get("Municipal_Name") or p.get("TOWNNAMEMC") for p in props],
+            "geoids": [p.get("TOWNGEOID") or p.get("GEOIDTXT") for p in props]}
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "wkb.bin").write_bytes(b"".join(wkb))
+    np.save(out_dir / "wkb_offsets.npy", offsets)
+    (out_dir / "meta.json").write_text(json.dumps(meta))
+    return True
+
+
+class Towns:
+    """Town names, GEOIDs and polygons from the cache."""
+
+    def __init__(self):
+        refresh_towns()
+        path = STORE_DIR / "towns"
+        meta = json.loads((path / "meta.json").read_text())
+        self.names = meta["names"]
+        self.geoids = meta["geoids"]
+        self._wkb = (path / "wkb.bin").read_bytes()
+        self._offsets = np.load(path / "wkb_offsets.npy")
+
+    def find(self, name_or_geoid: str) -> int | None:
+        wanted = str(name_or_geoid).strip().casefold()
+        for i, (name, geoid) in enumerate(zip(self.names, self.geoids)):
+            if wanted in ((name or "").casefold(), str(geoid or "").casefold()):
+                return i
+        return None
+
+    @cached_property
+    def _shapely(self):
+        import shapely
+
+        return shapely
+
+    def geometry(self, i: int):
+        return self._shapely.from_wkb(self._wkb[self._offsets[i]:self._offsets[i + 1]])
+
+
+def load_towns() -> Towns:
+    return Towns()
@@ -0,0 +1,218 @@
+"""
+geojson_stream.py
+-----------------
+Stream features out of, and into, large GeoJSON FeatureCollections without
+holding the whole collection in memory.
+
+    with FeatureReader(path) as reader:
+        template = reader.header          # every top-level key but "features"
+        for feature in reader:
+            ...
+
+    with FeatureWriter(out_path, template) as writer:
+        writer.write(feature)
+
+FeatureReader reads the file in blocks and decodes one feature at a time
+with json.JSONDecoder.raw_decode, so memory is bounded by the block size
+plus the largest single feature. Top-level keys that come after the
+features array are available as reader.footer once iteration finishes.
+
+FeatureWriter produces exactly the bytes json.dump({**template,
+"features": features}) would, so streamed output can be compared with (and
+replaces) files written in one go. It writes to a temporary file next to
+the target and swaps it in on close(); abort(), or leaving the with block
+on an exception, deletes it and leaves any existing file untouched.
+
+Both sides can report where each feature sits in the file, as a byte
+offset and length (used by feature_index.py): reader.spans() yields
+(feature, offset, length), and FeatureWriter(..., record_spans=True)
+collects writer.spans as features are written.
+
+Only the standard library is required. Not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+
+FEATURES_KEY = re.compile(r'"features"\s*:\s*\[')
+_decoder = json.JSONDecoder()
+
+
+class FeatureReader:
+    """Iterate over the features of a GeoJSON FeatureCollection file."""
+
+    def __init__(self, path: Path, block_size: int = 1 << 20):
+        self.path = Path(path)
+        self.block_size = block_size
+        self.header: dict = {}
+        self.footer: dict = {}
+        self._f = None
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        # Byte offset of _buf[0] in the file, and a (char, byte) mark inside
+        # _buf so offsets of non-ASCII text are computed incrementally.
+        self._buf_bytes = 0
+        self._mark = (0, 0)
+
+    def __enter__(self):
+        # newline="" keeps \r\n as two characters, so character counts
+        # match bytes for ASCII text.
+        self._f = self.path.open(encoding="utf-8", newline="")
+        self._read_header()
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+    def _fill(self) -> bool:
+        """Append the next block, dropping what has been consumed; False at EOF."""
+        chunk = self._f.read(self.block_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf_bytes = self._byte_offset(self._pos)
+        self._mark = (0, 0)
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _byte_offset(self, pos: int) -> int:
+        """File byte offset of _buf[pos] (pos at or after the last call's)."""
+        char, byte = self._mark
+        text = self._buf[char:pos]
+        byte += len(text) if text.isascii() else len(text.encode("utf-8"))
+        self._mark = (pos, byte)
+        return self._buf_bytes + byte
+
+    def _read_header(self) -> None:
+        while True:
+            match = FEATURES_KEY.search(self._buf)
+            if match:
+                break
+            if not self._fill():
+                # No features array: the whole file is the header.
+                self.header = {k: v for k, v in json.loads(self._buf).items() if k != "features"}
+                self._buf, self._pos = "", 0
+                return
+        prefix = self._buf[:match.start()].rstrip().rstrip(",")
+        self.header = json.loads(prefix + "}")
+        self._pos = match.end()
+
+    def _skip_ws(self) -> str:
+        """Next non-whitespace character (reading more as needed), or '' at EOF."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def __iter__(self):
+        for feature, _, _ in self._decode(track=False):
+            yield feature
+
+    def spans(self):
+        """Yield (feature, byte offset, byte length) for every feature."""
+        return self._decode(track=True)
+
+    def _decode(self, track: bool):
+        if not self._buf and self._eof:
+            return
+        while True:
+            ch = self._skip_ws()
+            if ch == "]":
+                self._pos += 1
+                self._read_footer()
+                return
+            if ch == ",":
+                self._pos += 1
+                continue
+            if ch == "":
+                raise ValueError(f"{self.path.name}: unexpected end of file inside features")
+            while True:
+                try:
+                    feature, end = _decoder.raw_decode(self._buf, self._pos)
+                    break
+                except json.JSONDecodeError:
+                    # Feature cut off at the block boundary: read more.
+                    if not self._fill():
+                        raise
+            if track:
+                start = self._byte_offset(self._pos)
+                span = (start, self._byte_offset(end) - start)
+            else:
+                span = (None, None)
+            self._pos = end
+            yield feature, *span
+
+    def _read_footer(self) -> None:
+        while self._fill():
+            pass
+        tail = self._buf[self._pos:].strip()
+        # Whatever follows the array is '}' or ', "key": value, ... }'.
+        if tail.startswith(","):
+            self.footer = json.loads("{" + tail[1:])
+
+
+class FeatureWriter:
+    """Write a FeatureCollection one feature at a time."""
+
+    def __init__(self, path: Path, template: dict, record_spans: bool = False):
+        self.path = Path(path)
+        self.template = {k: v for k, v in template.items() if k != "features"}
+        self.count = 0
+        # (offset, length) in bytes of each feature written; json.dumps
+        # escapes non-ASCII, so characters and bytes are the same.
+        self.spans: list[tuple[int, int]] | None = [] if record_spans else None
+        self._offset = 0
+        self._f = None
+        self._tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def open(self) -> None:
+        self._f = self._tmp.open("w")
+        # Same layout as json.dump({**template, "features": [...]}).
+        head = json.dumps({**self.template, "features": []})
+        self._f.write(head[:-2])
+        self._offset = len(head) - 2
+
+    def write(self, feature: dict) -> None:
+        if self.count:
+            self._f.write(", ")
+            self._offset += 2
+        text = json.dumps(feature)
+        self._f.write(text)
+        if self.spans is not None:
+            self.spans.append((self._offset, len(text)))
+        self._offset += len(text)
+        self.count += 1
+
+    def close(self) -> None:
+        """Finish the collection and move it into place."""
+        if self._f:
+            self._f.write("]}")
+            self._f.close()
+            self._f = None
+            os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        """Drop what has been written; the target file is not touched."""
+        if self._f:
+            self._f.close()
+            self._f = None
+            self._tmp.unlink(missing_ok=True)
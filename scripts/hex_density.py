@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+hex_density.py
+--------------
+Bin linear infrastructure length and point feature counts into hexagonal
+grids at several resolutions, broken down by SystemType, for statewide
+heatmaps and coverage-gap analysis.
+
+Coordinates are flattened into NumPy arrays in one pass; segment lengths,
+projection, subdivision and cell assignment then run as whole-array
+operations, with no Python loop over features or segments.
+
+  Lengths   Each segment is measured with the haversine formula of
+            update_static_charts.haversine_m (vectorized, same Earth
+            radius) and the site's includeLinear filter is applied, so the
+            per-SystemType totals reconcile with the statewide chart
+            (--check compares them).
+  Long      Segments longer than half the hex size are split into equal
+  segments  pieces; each piece's midpoint picks its cell and carries its
+            share of the length. A segment crossing a cell boundary is
+            therefore split between the cells it passes through, to within
+            half a cell.
+  Grid      Pointy-top hexagons in UTM Zone 18N metres (EPSG:32618),
+            axial coordinates (q, r) with the origin at the UTM origin.
+            --sizes sets the hexagon circumradius (centre to corner) of
+            each resolution.
+
+Run from the repo root:
+    python scripts/hex_density.py
+    python scripts/hex_density.py --sizes 1000,5000 --check
+
+Input:   data/linear_by_rpc/Vermont_Linear_<RPC>.geojson
+         data/Vermont_Point_Features.geojson (optional)
+Output:  data/hex_density/hex_<size>m.json, one per resolution, column
+         oriented (one entry per non-empty cell):
+             {"size_m", "crs", "orientation", "systems",
+              "q", "r", "lon", "lat",
+              "length_m": {SystemType: [...]}, "points": {SystemType: [...]},
+              "totals": {"length_m": {...}, "points": {...}}}
+         lon / lat are the cell centres.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from data_loader import load_json_files
+from projection import UTM_18N, WGS84, get_transformer
+from update_static_charts import EARTH_RADIUS_M, RPC_LIST, SW_ORDER, aggregate_rpc, include_linear
+
+REPO = Path(__file__).resolve().parent.parent
+LINEAR_DIR = REPO / "data" / "linear_by_rpc"
+POINTS_FILE = REPO / "data" / "Vermont_Point_Features.geojson"
+OUTPUT_DIR = REPO / "data" / "hex_density"
+
+DEFAULT_SIZES = [500, 2000, 8000]
+SQRT3 = math.sqrt(3)
+
+
+def haversine_m(lon1, lat1, lon2, lat2):
+    """update_static_charts.haversine_m for NumPy arrays (same formula and radius)."""
+    to_r = math.pi / 180
+    phi1, phi2 = lat1 * to_r, lat2 * to_r
+    dphi = (lat2 - lat1) * to_r
+    dlam = (lon2 - lon1) * to_r
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+# ── Hex grid ──────────────────────────────────────────────────────────
+
+
+def hex_cells(x, y, size):
+    """Axial (q, r) of the pointy-top hexagons of circumradius `size` containing (x, y)."""
+    qf = (SQRT3 / 3 * x - y / 3) / size
+    rf = (2 / 3 * y) / size
+    sf = -qf - rf
+    q, r, s = np.round(qf), np.round(rf), np.round(sf)
+    dq, dr, ds = np.abs(q - qf), np.abs(r - rf), np.abs(s - sf)
+    # Cube rounding: fix the coordinate with the largest rounding error.
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    q = np.where(fix_q, -r - s, q)
+    r = np.where(fix_r, -q - s, r)
+    return q.astype(np.int64), r.astype(np.int64)
+
+
+def hex_centres(q, r, size):
+    """Projected centres of axial cells (q, r)."""
+    return size * SQRT3 * (q + r / 2), size * 1.5 * r
+
+
+def cell_keys(q, r):
+    return (q << 32) + (r & 0xFFFFFFFF)
+
+
+# ── Input ─────────────────────────────────────────────────────────────
+
+
+def line_parts(geom):
+    if not geom:
+        return []
+    if geom["type"] == "LineString":
+        return [geom["coordinates"]]
+    if geom["type"] == "MultiLineString":
+        return geom["coordinates"]
+    return []
+
+
+def read_segments(rpc_gjs):
+    """Segments of every included linear feature as flat arrays.
+
+    Returns (lon1, lat1, lon2, lat2, system index) with one entry per
+    segment (consecutive vertex pair within a part).
+    """
+    features = [f for gj in rpc_gjs for f in gj["features"]
+                if include_linear(f) and (f["properties"].get("SystemType") in SW_ORDER)]
+    parts = [(SW_ORDER.index(f["properties"]["SystemType"]), pts)
+             for f in features for pts in line_parts(f.get("geometry"))]
+    lengths = np.fromiter((len(pts) for _, pts in parts), dtype=np.int64, count=len(parts))
+    systems = np.fromiter((s for s, _ in parts), dtype=np.int64, count=len(parts))
+    flat = list(itertools.chain.from_iterable(pts for _, pts in parts))
+    xy = np.array([(c[0], c[1]) for c in flat], dtype=np.float64).reshape(-1, 2)
+
+    # A segment starts at every vertex except the last one of each part.
+    last = np.cumsum(lengths) - 1
+    is_start = np.ones(len(xy), dtype=bool)
+    is_start[last[lengths > 0]] = False
+    start = np.flatnonzero(is_start)
+    seg_system = np.repeat(systems, np.maximum(lengths - 1, 0))
+    return xy[start, 0], xy[start, 1], xy[start + 1, 0], xy[start + 1, 1], seg_system
+
+
+def read_points(points_gj):
+    """(lon, lat, system index) of the point features; unknown SystemType gets len(SW_ORDER)."""
+    if points_gj is None:
+        empty = np.zeros(0)
+        return empty, empty, np.zeros(0, dtype=np.int64)
+    coords, systems = [], []
+    for f in points_gj["features"]:
+        geom = f.get("geometry")
+        if not geom or geom["type"] != "Point" or not geom.get("coordinates"):
+            continue
+        st = (f.get("properties") or {}).get("SystemType")
+        coords.append(geom["coordinates"][:2])
+        systems.append(SW_ORDER.index(st) if st in SW_ORDER else len(SW_ORDER))
+    xy = np.array(coords, dtype=np.float64).reshape(-1, 2)
+    return xy[:, 0], xy[:, 1], np.array(systems, dtype=np.int64)
+
+
+# ── Aggregation ───────────────────────────────────────────────────────
+
+
+def subdivide(x1, y1, x2, y2, length, system, max_piece):
+    """Split segments into equal pieces no longer than `max_piece`.
+
+    Returns the piece midpoints, their lengths and their SystemType index.
+    """
+    n = np.maximum(np.ceil(length / max_piece), 1).astype(np.int64)
+    seg = np.repeat(np.arange(len(n)), n)
+    k = np.arange(len(seg)) - np.repeat(np.cumsum(n) - n, n)
+    t = (k + 0.5) / n[seg]
+    mx = x1[seg] + t * (x2[seg] - x1[seg])
+    my = y1[seg] + t * (y2[seg] - y1[seg])
+    return mx, my, (length / n)[seg], system[seg]
+
+
+def aggregate(size, seg_xy, seg_length, seg_system, pt_xy, pt_system):
+    """Length and point count per hex cell and SystemType at one resolution."""
+    n_sys = len(SW_ORDER) + 1  # last column: points with no known SystemType
+    mx, my, piece_len, piece_sys = subdivide(*seg_xy, seg_length, seg_system, size / 2)
+    lq, lr = hex_cells(mx, my, size)
+    pq, pr = hex_cells(pt_xy[0], pt_xy[1], size)
+
+    keys, inverse = np.unique(np.concatenate([cell_keys(lq, lr), cell_keys(pq, pr)]), return_inverse=True)
+    inverse = inverse.ravel()
+    line_cell, point_cell = inverse[:len(lq)], inverse[len(lq):]
+    n_cells = len(keys)
+    length = np.bincount(line_cell * n_sys + piece_sys, weights=piece_len,
+                         minlength=n_cells * n_sys).reshape(n_cells, n_sys)
+    points = np.bincount(point_cell * n_sys + pt_system,
+                         minlength=n_cells * n_sys).reshape(n_cells, n_sys)
+    q = keys >> 32
+    r = (keys & 0xFFFFFFFF).astype(np.int64)
+    r = np.where(r >= 1 << 31, r - (1 << 32), r)
+    return q, r, length, points
+
+
+def write_resolution(path, size, q, r, length, points):
+    cx, cy = hex_centres(q, r, size)
+    lon, lat = get_transformer(UTM_18N, WGS84).transform(cx, cy)
+    systems = SW_ORDER + ["Unknown"]
+    out = {
+        "size_m": size,
+        "crs": UTM_18N,
+        "orientation": "pointy",
+        "systems": systems,
+        "q": q.tolist(),
+        "r": r.tolist(),
+        "lon": np.round(lon, 5).tolist(),
+        "lat": np.round(lat, 5).tolist(),
+        "length_m": {st: np.round(length[:, i], 1).tolist() for i, st in enumerate(SW_ORDER)},
+        "points": {st: points[:, i].tolist() for i, st in enumerate(systems)},
+        "totals": {
+            "length_m": {st: round(float(length[:, i].sum()), 1) for i, st in enumerate(SW_ORDER)},
+            "points": {st: int(points[:, i].sum()) for i, st in enumerate(systems)},
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(out, f, separators=(",", ":"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bin linear length and point counts into hex grids.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated hexagon circumradii in metres (default %(default)s)")
+    parser.add_argument("--check", action="store_true",
+                        help="compare the length totals with update_static_charts' per-feature totals")
+    args = parser.parse_args()
+    try:
+        sizes = sorted({int(s) for s in args.sizes.split(",") if s.strip()})
+    except ValueError:
+        parser.error("--sizes must be comma-separated integers")
+    if not sizes or min(sizes) <= 0:
+        parser.error("--sizes must be positive")
+
+    t0 = time.perf_counter()
+    rpc_paths = [LINEAR_DIR / f"Vermont_Linear_{rpc}.geojson" for rpc in RPC_LIST]
+    points_gj, *rpc_gjs = load_json_files([POINTS_FILE, *rpc_paths])
+    for path, gj in zip(rpc_paths, rpc_gjs):
+        if gj is None:
+            print(f"  {path.name} not found — skipping")
+    rpc_gjs = [gj for gj in rpc_gjs if gj is not None]
+    if points_gj is None:
+        print(f"  {POINTS_FILE.name} not found — point counts will be empty")
+
+    lon1, lat1, lon2, lat2, seg_system = read_segments(rpc_gjs)
+    pt_lon, pt_lat, pt_system = read_points(points_gj)
+    print(f"Loaded {len(lon1):,} segments and {len(pt_lon):,} points in {time.perf_counter() - t0:.2f}s")
+
+    t1 = time.perf_counter()
+    seg_length = haversine_m(lon1, lat1, lon2, lat2)
+    to_utm = get_transformer(WGS84, UTM_18N)
+    x1, y1 = to_utm.transform(lon1, lat1)
+    x2, y2 = to_utm.transform(lon2, lat2)
+    pt_xy = to_utm.transform(pt_lon, pt_lat)
+    seg_xy = (np.asarray(x1), np.asarray(y1), np.asarray(x2), np.asarray(y2))
+    pt_xy = (np.asarray(pt_xy[0]), np.asarray(pt_xy[1]))
+    print(f"Measured and projected in {time.perf_counter() - t1:.2f}s")
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    for size in sizes:
+        t2 = time.perf_counter()
+        q, r, length, points = aggregate(size, seg_xy, seg_length, seg_system, pt_xy, pt_system)
+        path = OUTPUT_DIR / f"hex_{size}m.json"
+        write_resolution(path, size, q, r, length, points)
+        print(f"  {size:>6,} m: {len(q):,} cells in {time.perf_counter() - t2:.2f}s "
+              f"→ {path.name} ({path.stat().st_size / 1024:,.0f} KB)")
+
+    print("\nLength by SystemType (mi):")
+    totals = np.bincount(seg_system, weights=seg_length, minlength=len(SW_ORDER))
+    reference = None
+    if args.check:
+        reference = {st: 0.0 for st in SW_ORDER}
+        for gj in rpc_gjs:
+            for st, metres in aggregate_rpc(gj)["by_type"].items():
+                reference[st] += metres
+    for i, st in enumerate(SW_ORDER):
+        line = f"  {st:<12} {totals[i] / 1609.344:>12,.1f}"
+        if reference is not None:
+            line += f"   update_static_charts: {reference[st] / 1609.344:,.1f} (diff {totals[i] - reference[st]:+.3f} m)"
+        print(line)
+    print(f"\nDone in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+linear_changeset.py
+-------------------
+Compare two versions of the linear dataset by GlobalID and apply the
+differences to the per-RPC files, instead of replacing the whole
+linear_by_rpc set when ANR sends an updated extract.
+
+  diff   Streams each version once and hashes every feature's properties
+         and geometry (canonical JSON, BLAKE2b; orjson is used to serialize
+         when installed). Features are matched by GlobalID (features
+         without one are matched by content only), and the changeset lists
+         the added, removed and modified features, the latter with
+         field-level changes ({field: [old, new]}) and whether the geometry
+         changed.
+  patch  Applies a changeset to data/linear_by_rpc. Only the RPC files the
+         changeset touches are rewritten (streamed, then swapped in when
+         every file is written); modified features keep their position,
+         added ones are appended, and a feature whose RPC changed moves to
+         its new file. Each removed or modified feature must still match
+         the hash it had in the old version; otherwise nothing is written
+         unless --force is given.
+
+A version is either a statewide GeoJSON file or a directory of
+Vermont_Linear_<RPC>.geojson files. Geometry is never held in memory for
+unchanged features: diff keeps the hashes and the properties of the old
+version, plus the changed features themselves.
+
+Run from the repo root:
+    python scripts/linear_changeset.py diff data/linear_by_rpc new_extract.geojson -o changes.json
+    python scripts/linear_changeset.py patch changes.json --dry-run
+    python scripts/linear_changeset.py patch changes.json
+
+Changeset:
+    {"format": "linear-changeset", "version": 1, "hash_scheme", "old", "new",
+     "summary": {"added", "removed", "modified", "unchanged", "rpcs": {rpc: n}},
+     "template": top-level keys of the new version,
+     "added":    [feature, ...],
+     "removed":  [{"GlobalID", "rpc", "hash", "properties"}, ...],
+     "modified": [{"GlobalID", "rpc", "old_rpc", "old_hash", "hash",
+                   "fields": {name: [old, new]}, "geometry_changed",
+                   "feature"}, ...]}
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from geojson_stream import FeatureReader, FeatureWriter
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+REPO = Path(__file__).resolve().parent.parent
+LINEAR_DIR = REPO / "data" / "linear_by_rpc"
+FORMAT = "linear-changeset"
+VERSION = 1
+
+
+# ── Hashing ───────────────────────────────────────────────────────────
+
+
+def _canonical_json(value) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _canonical_orjson(value) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+
+
+# The two serializers agree except on exponent floats (1e-05 vs 0.00001),
+# so a changeset records which one its hashes were made with.
+CANONICAL = {"json": _canonical_json, "orjson": _canonical_orjson}
+
+
+def default_scheme() -> str:
+    return "orjson" if orjson is not None else "json"
+
+
+class Hasher:
+    """Content hashes of features under one canonical-JSON scheme."""
+
+    def __init__(self, scheme: str):
+        if scheme == "orjson" and orjson is None:
+            raise RuntimeError("orjson is not installed")
+        self.scheme = scheme
+        self.canonical = CANONICAL[scheme]
+
+    def parts(self, feat: dict) -> tuple[bytes, bytes]:
+        """Canonical JSON of the properties and of the geometry."""
+        return self.canonical(feat.get("properties")), self.canonical(feat.get("geometry"))
+
+    @staticmethod
+    def combine(props: bytes, geom: bytes) -> str:
+        return hashlib.blake2b(props + b"\n" + geom, digest_size=16).hexdigest()
+
+    def feature(self, feat: dict) -> str:
+        return self.combine(*self.parts(feat))
+
+
+def feature_gid(feat: dict) -> str | None:
+    gid = (feat.get("properties") or {}).get("GlobalID")
+    return str(gid) if gid not in (None, "") else None
+
+
+def content_key(digest: str) -> str:
+    """Key of a feature without a GlobalID: matched by content only."""
+    return f"hash:{digest}"
+
+
+def feature_rpc(feat: dict) -> str:
+    """File an RPC feature belongs in (split_linear_by_rpc.py: null RPC → UNKNOWN)."""
+    return (feat.get("properties") or {}).get("RPC") or "UNKNOWN"
+
+
+def rpc_path(directory: Path, rpc: str) -> Path:
+    return directory / f"Vermont_Linear_{rpc}.geojson"
+
+
+# ── Reading a version ─────────────────────────────────────────────────
+
+
+class Version:
+    """A statewide file or a directory of per-RPC files, read as one stream."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if self.path.is_dir():
+            self.files = sorted(self.path.glob("Vermont_Linear_*.geojson"))
+            if not self.files:
+                raise FileNotFoundError(f"no Vermont_Linear_*.geojson files in {self.path}")
+        elif self.path.exists():
+            self.files = [self.path]
+        else:
+            raise FileNotFoundError(self.path)
+        self.header: dict = {}
+
+    def features(self):
+        """Yield (feature, rpc of the file it is in, or None for a statewide file)."""
+        for path in self.files:
+            rpc = path.stem[len("Vermont_Linear_"):] if self.path.is_dir() else None
+            with FeatureReader(path) as reader:
+                if not self.header:
+                    self.header = reader.header
+                for feat in reader:
+                    yield feat, rpc
+
+
+# ── diff ──────────────────────────────────────────────────────────────
+
+
+def field_changes(old_props: dict, new_props: dict) -> dict:
+    old_props, new_props = old_props or {}, new_props or {}
+    return {
+        k: [old_props.get(k), new_props.get(k)]
+        for k in sorted(old_props.keys() | new_props.keys())
+        if old_props.get(k) != new_props.get(k)
+    }
+
+
+def diff(old_path, new_path, scheme: str | None = None) -> dict:
+    """Changeset from `old_path` to `new_path` (one streaming pass over each)."""
+    old, new = Version(old_path), Version(new_path)
+    hasher = Hasher(scheme or default_scheme())
+
+    # Pass 1: the old version. Only hashes and the canonical properties are
+    # kept (for field-level changes); geometry is reduced to a short hash.
+    old_index = {}  # key -> (hash, rpc, geometry hash, canonical properties)
+    duplicates = 0
+    for feat, file_rpc in old.features():
+        props, geom = hasher.parts(feat)
+        digest = hasher.combine(props, geom)
+        key = feature_gid(feat) or content_key(digest)
+        if key in old_index:
+            duplicates += 1
+        geom_digest = hashlib.blake2b(geom, digest_size=8).digest()
+        old_index[key] = (digest, file_rpc or feature_rpc(feat), geom_digest, props)
+
+    # Pass 2: stream the new version against it; keep only what changed.
+    added, modified = [], []
+    seen = set()
+    unchanged = 0
+    for feat, _ in new.features():
+        props, geom = hasher.parts(feat)
+        digest = hasher.combine(props, geom)
+        key = feature_gid(feat) or content_key(digest)
+        if key in seen:
+            duplicates += 1
+        seen.add(key)
+        previous = old_index.get(key)
+        if previous is None:
+            added.append(feat)
+        elif previous[0] == digest:
+            unchanged += 1
+        else:
+            old_digest, old_rpc, old_geom, old_props = previous
+            modified.append({
+                "GlobalID": key,
+                "rpc": feature_rpc(feat),
+                "old_rpc": old_rpc,
+                "old_hash": old_digest,
+                "hash": digest,
+                "fields": field_changes(json.loads(old_props), feat.get("properties")),
+                "geometry_changed": old_geom != hashlib.blake2b(geom, digest_size=8).digest(),
+                "feature": feat,
+            })
+
+    removed = [
+        {"GlobalID": None if key.startswith("hash:") else key, "rpc": rpc, "hash": digest,
+         "properties": json.loads(props)}
+        for key, (digest, rpc, _, props) in old_index.items() if key not in seen
+    ]
+
+    if duplicates:
+        print(f"  WARNING: {duplicates} duplicate GlobalID(s); the last occurrence of each was compared",
+              file=sys.stderr)
+
+    rpcs = Counter(feature_rpc(f) for f in added)
+    rpcs.update(r["rpc"] for r in removed)
+    for m in modified:
+        rpcs[m["rpc"]] += 1
+        if m["old_rpc"] != m["rpc"]:
+            rpcs[m["old_rpc"]] += 1
+    return {
+        "format": FORMAT,
+        "version": VERSION,
+        "hash_scheme": hasher.scheme,
+        "old": str(old_path),
+        "new": str(new_path),
+        "summary": {
+            "added": len(added),
+            "removed": len(removed),
+            "modified": len(modified),
+            "unchanged": unchanged,
+            "rpcs": dict(sorted(rpcs.items())),
+        },
+        "template": new.header,
+        "added": added,
+        "removed": removed,
+        "modified": modified,
+    }
+
+
+def print_diff_summary(changeset: dict) -> None:
+    s = changeset["summary"]
+    print(f"  added {s['added']:,}, removed {s['removed']:,}, modified {s['modified']:,}, "
+          f"unchanged {s['unchanged']:,}")
+    if s["rpcs"]:
+        print("  features touched per RPC: " + ", ".join(f"{rpc} {n:,}" for rpc, n in s["rpcs"].items()))
+    fields = Counter(name for m in changeset["modified"] for name in m["fields"])
+    geometry = sum(1 for m in changeset["modified"] if m["geometry_changed"])
+    if fields or geometry:
+        top = ", ".join(f"{name} {n:,}" for name, n in fields.most_common(10))
+        print(f"  changed fields: {top or '—'}; geometry {geometry:,}")
+
+
+# ── patch ─────────────────────────────────────────────────────────────
+
+
+def plan_patch(changeset: dict, hasher: Hasher) -> dict:
+    """Per RPC: keys to drop (with expected hashes), replacements, and appends."""
+    plan = {}
+
+    def entry(rpc):
+        return plan.setdefault(rpc, {"drop": {}, "replace": {}, "append": {}})
+
+    for r in changeset["removed"]:
+        entry(r["rpc"])["drop"][r["GlobalID"] or content_key(r["hash"])] = r["hash"]
+    for m in changeset["modified"]:
+        if m["rpc"] == m["old_rpc"]:
+            entry(m["rpc"])["replace"][m["GlobalID"]] = (m["old_hash"], m["feature"])
+        else:
+            entry(m["old_rpc"])["drop"][m["GlobalID"]] = m["old_hash"]
+            entry(m["rpc"])["append"][m["GlobalID"]] = m["feature"]
+    for feat in changeset["added"]:
+        key = feature_gid(feat) or content_key(hasher.feature(feat))
+        entry(feature_rpc(feat))["append"][key] = feat
+    return plan
+
+
+def patch_file(path: Path, out_path: Path, steps: dict, template: dict,
+               hasher: Hasher) -> tuple[int, list[str]]:
+    """Stream `path` into `out_path` applying `steps`; returns (features written, conflicts)."""
+    conflicts = []
+    drop, replace, append = steps["drop"], steps["replace"], steps["append"]
+    pending = set(drop) | set(replace)
+    with ExitStack() as stack:
+        reader = stack.enter_context(FeatureReader(path)) if path.exists() else None
+        writer = stack.enter_context(FeatureWriter(out_path, reader.header if reader else template))
+        for feat in reader or ():
+            # Hash only the features the changeset is about (or that have
+            # no GlobalID to match them by).
+            gid = feature_gid(feat)
+            digest = hasher.feature(feat) if gid is None or gid in pending else None
+            key = gid or content_key(digest)
+            if key in append:
+                conflicts.append(f"{path.name}: {key} is to be added but already exists")
+            if key in drop:
+                pending.discard(key)
+                if digest != drop[key]:
+                    conflicts.append(f"{path.name}: {key} changed since the diff (removed)")
+                continue
+            if key in replace:
+                pending.discard(key)
+                old_hash, new_feat = replace[key]
+                if digest != old_hash:
+                    conflicts.append(f"{path.name}: {key} changed since the diff (modified)")
+                feat = new_feat
+            writer.write(feat)
+        for feat in append.values():
+            writer.write(feat)
+    conflicts.extend(f"{path.name}: {key} not found" for key in sorted(pending))
+    return writer.count, conflicts
+
+
+def patch(changeset: dict, directory: Path, dry_run: bool = False, force: bool = False) -> int:
+    hasher = Hasher(changeset["hash_scheme"])
+    plan = plan_patch(changeset, hasher)
+    if not plan:
+        print("  Nothing to apply.")
+        return 0
+    written, conflicts = {}, []
+    try:
+        for rpc, steps in sorted(plan.items()):
+            path = rpc_path(directory, rpc)
+            tmp = path.with_name(path.name + ".tmp")
+            template = changeset.get("template") or {"type": "FeatureCollection"}
+            count, problems = patch_file(path, tmp, steps, template, hasher)
+            written[path] = tmp
+            conflicts.extend(problems)
+            print(f"  {rpc}: -{len(steps['drop'])} ~{len(steps['replace'])} +{len(steps['append'])} "
+                  f"→ {count:,} features")
+        if conflicts:
+            print(f"\n  {len(conflicts)} conflict(s):", file=sys.stderr)
+            for line in conflicts[:20]:
+                print(f"    {line}", file=sys.stderr)
+            if len(conflicts) > 20:
+                print(f"    ... and {len(conflicts) - 20} more", file=sys.stderr)
+            if not force:
+                print("  Nothing written (use --force to apply anyway).", file=sys.stderr)
+                return 1
+        if dry_run:
+            print("\n  Dry run: nothing written.")
+            return 0
+        for path, tmp in written.items():
+            os.replace(tmp, path)
+        written = {}
+        print(f"\n  Rewrote {len(plan)} of the RPC files; the others were not touched.")
+        return 0
+    finally:
+        for tmp in written.values():
+            tmp.unlink(missing_ok=True)
+
+
+# ── CLI ───────────────────────────────────────────────────────────────
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Diff and patch the linear dataset by GlobalID.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_diff = sub.add_parser("diff", help="compare two dataset versions")
+    p_diff.add_argument("old", help="old version: statewide file or linear_by_rpc directory")
+    p_diff.add_argument("new", help="new version: statewide file or linear_by_rpc directory")
+    p_diff.add_argument("-o", "--output", default="linear_changeset.json", help="changeset file to write")
+    p_diff.add_argument("--hash", choices=sorted(CANONICAL), default=None,
+                        help="serializer for the content hashes (default: orjson when installed)")
+
+    p_patch = sub.add_parser("patch", help="apply a changeset to the per-RPC files")
+    p_patch.add_argument("changeset", help="changeset written by diff")
+    p_patch.add_argument("--dir", default=str(LINEAR_DIR), help="per-RPC directory (default data/linear_by_rpc)")
+    p_patch.add_argument("--dry-run", action="store_true", help="check and report, but write nothing")
+    p_patch.add_argument("--force", action="store_true", help="apply even when features changed since the diff")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.command == "diff":
+        print(f"Comparing {args.old} → {args.new}...")
+        try:
+            changeset = diff(args.old, args.new, scheme=args.hash)
+        except (FileNotFoundError, RuntimeError) as e:
+            sys.exit(f"ERROR: {e}")
+        with open(args.output, "w") as f:
+            json.dump(changeset, f)
+        print_diff_summary(changeset)
+        print(f"Changeset: {args.output} ({time.perf_counter() - t0:.2f}s)")
+        return
+
+    with open(args.changeset) as f:
+        changeset = json.load(f)
+    if changeset.get("format") != FORMAT or changeset.get("version") != VERSION:
+        sys.exit(f"ERROR: {args.changeset} is not a version {VERSION} {FORMAT} file")
+    print(f"Applying {args.changeset} to {args.dir}...")
+    try:
+        status = patch(changeset, Path(args.dir), dry_run=args.dry_run, force=args.force)
+    except RuntimeError as e:
+        sys.exit(f"ERROR: {e} (rerun diff with --hash json)")
+    print(f"Done in {time.perf_counter() - t0:.2f}s")
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+load_test.py
+------------
+Load-test the site's data serving: simulated visitors replay the requests a
+page load of index.html makes, and the harness reports throughput, latency
+percentiles and bytes transferred.
+
+Scenarios (--scenario), mirroring the fetches in index.html:
+
+  page        index.html and styles.css, then in parallel the towns, service
+              areas, treatment facilities, the linear overview (all RPC
+              linear files instead when the overview is missing, as the page
+              falls back) and the RPC explorer's default CCRPC linear and
+              zoning files
+  all-linear  the same, but always every RPC linear file (the page before
+              the overview layer, or a full pan at detail zoom)
+  explorer    one RPC explorer selection per session (linear + zoning),
+              cycling through the RPCs
+
+Each of --users visitors runs sessions back to back, fetching with up to
+--connections parallel connections like a browser (6 per host). Without
+--url, the harness starts serve.py itself on a free port (add --threaded for
+its threaded mode); --compare then runs the same load against the plain and
+the --gzip server and prints the two side by side. Against --url, --compare
+switches only the client's Accept-Encoding. Client and server share the
+machine, so absolute numbers are a lower bound; compare modes rather than
+reading them in isolation.
+
+Run from the repo root:
+    python scripts/load_test.py --compare
+    python scripts/load_test.py --users 8 --duration 30 --scenario all-linear --threaded --compare
+    python scripts/load_test.py --url http://localhost:8000 --gzip --sessions 5
+
+Input:   index.html and the data/ files it fetches
+Output:  report on stdout; --json PATH also writes the raw summary
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import count
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+from update_static_charts import RPC_LIST
+
+REPO = Path(__file__).resolve().parent.parent
+BROWSER_CONNECTIONS = 6   # parallel connections per host in current browsers
+EXPLORER_DEFAULT = "CCRPC"  # RPC the explorer loads on page load
+
+
+# ── Scenarios ─────────────────────────────────────────────────────────
+# A session is a list of stages run one after another; the requests of a
+# stage run in parallel. A request is (path, fallback paths fetched instead
+# when it does not return 200).
+
+
+def linear_path(rpc):
+    return f"/data/linear_by_rpc/Vermont_Linear_{rpc}.geojson"
+
+
+def zoning_path(rpc):
+    return "/" + quote(f"data/Zoning Data/{rpc}.geojson")
+
+
+def page_session(overview=True):
+    all_linear = [(linear_path(rpc), []) for rpc in RPC_LIST]
+    data = [
+        ("/data/Vermont_Town_GEOID_RPC_County.geojson", []),
+        ("/data/Vermont_Service_Areas.geojson", []),
+        ("/data/Vermont_Treatment_Facilities.geojson", []),
+        *([("/data/Vermont_Linear_Overview.geojson", [p for p, _ in all_linear])] if overview else all_linear),
+        (linear_path(EXPLORER_DEFAULT), []),
+        (zoning_path(EXPLORER_DEFAULT), []),
+    ]
+    return [[("/index.html", [])], [("/styles.css", []), *data]]
+
+
+def explorer_session(i):
+    rpc = RPC_LIST[i % len(RPC_LIST)]
+    return [[(linear_path(rpc), []), (zoning_path(rpc), [])]]
+
+
+SCENARIOS = {
+    "page": lambda i: page_session(overview=True),
+    "all-linear": lambda i: page_session(overview=False),
+    "explorer": explorer_session,
+}
+
+
+# ── Client ────────────────────────────────────────────────────────────
+
+
+class Client:
+    """HTTP/1.1 client with one reused connection per worker thread."""
+
+    def __init__(self, base_url, accept_gzip, timeout=120.0):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.headers = {"Accept-Encoding": "gzip" if accept_gzip else "identity"}
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def get(self, path):
+        """Fetch `path`; returns (status, seconds to last byte, bytes received, content encoding)."""
+        conn = self._connection()
+        t0 = time.perf_counter()
+        try:
+            conn.request("GET", self.prefix + path, headers=self.headers)
+            resp = conn.getresponse()
+            size = 0
+            while chunk := resp.read(1 << 16):
+                size += len(chunk)
+            status, encoding = resp.status, resp.getheader("Content-Encoding", "")
+            if resp.will_close:
+                conn.close()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            return 0, time.perf_counter() - t0, 0, ""
+        return status, time.perf_counter() - t0, size, encoding
+
+
+def run_session(client, pool, stages, record):
+    """Run one session; returns (seconds, whether every request succeeded)."""
+    t0 = time.perf_counter()
+    ok = True
+
+    def fetch(path, fallback):
+        status, seconds, size, encoding = client.get(path)
+        record(path, status, seconds, size, encoding)
+        return status, fallback
+
+    for stage in stages:
+        pending = {pool.submit(fetch, path, fallback) for path, fallback in stage}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                status, fallback = fut.result()
+                if status != 200:
+                    if fallback:
+                        pending |= {pool.submit(fetch, path, []) for path in fallback}
+                    else:
+                        ok = False
+    return time.perf_counter() - t0, ok
+
+
+def run_load(client, scenario, users, connections, duration, sessions, warmup):
+    """Drive the load; returns the raw measurements."""
+    lock = threading.Lock()
+    requests, pages = [], []
+    counter = count()
+    make_session = SCENARIOS[scenario]
+
+    def record(path, status, seconds, size, encoding):
+        with lock:
+            requests.append((path, status, seconds, size, encoding))
+
+    pools = [ThreadPoolExecutor(max_workers=connections) for _ in range(users)]
+    for _ in range(warmup):  # fill server-side caches (e.g. compressed files) before timing
+        run_session(client, pools[0], make_session(next(counter)), lambda *a: None)
+
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    def visitor(pool):
+        done = 0
+        while (sessions is None or done < sessions) and (deadline is None or time.perf_counter() < deadline):
+            result = run_session(client, pool, make_session(next(counter)), record)
+            with lock:
+                pages.append(result)
+            done += 1
+
+    threads = [threading.Thread(target=visitor, args=(pool,)) for pool in pools]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    for pool in pools:
+        pool.shutdown()
+    return {"wall": wall, "requests": requests, "pages": pages}
+
+
+# ── Reporting ─────────────────────────────────────────────────────────
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered) + 0.5) - 1))]
+
+
+def latency_stats(values):
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    return {"p50": percentile(values, 50), "p95": percentile(values, 95),
+            "p99": percentile(values, 99), "max": max(values)}
+
+
+def summarize(raw, label, accept_gzip):
+    reqs, wall = raw["requests"], raw["wall"]
+    ok = [r for r in reqs if r[1] == 200]
+    total_bytes = sum(r[3] for r in reqs)
+    by_path = {}
+    for path, status, seconds, size, encoding in reqs:
+        entry = by_path.setdefault(path, {"n": 0, "errors": 0, "bytes": 0, "gzip": 0, "latency": []})
+        entry["n"] += 1
+        entry["errors"] += status != 200
+        entry["bytes"] += size
+        entry["gzip"] += encoding == "gzip"
+        entry["latency"].append(seconds)
+    failed = sum(1 for _, ok in raw["pages"] if not ok)
+    return {
+        "label": label,
+        "accept_gzip": accept_gzip,
+        "wall_s": wall,
+        "sessions": len(raw["pages"]),
+        "sessions_failed": failed,
+        "requests": len(reqs),
+        "errors": len(reqs) - len(ok),
+        "bytes": total_bytes,
+        "gzip_responses": sum(1 for r in reqs if r[4] == "gzip"),
+        "sessions_per_s": len(raw["pages"]) / wall if wall else 0.0,
+        "requests_per_s": len(reqs) / wall if wall else 0.0,
+        "mb_per_s": total_bytes / 1e6 / wall if wall else 0.0,
+        "session_latency": latency_stats([seconds for seconds, _ in raw["pages"]]),
+        "request_latency": latency_stats([r[2] for r in ok]),
+        "paths": {
+            path: {"n": e["n"], "errors": e["errors"], "bytes_per_request": e["bytes"] / e["n"],
+                   "gzip": e["gzip"], **latency_stats(e["latency"])}
+            for path, e in sorted(by_path.items())
+        },
+    }
+
+
+def ms(seconds):
+    return "—" if seconds is None else f"{seconds * 1000:,.0f} ms"
+
+
+def print_summary(s):
+    print(f"\n== {s['label']} ==")
+    print(f"  {s['sessions']} sessions ({s['sessions_failed']} with errors), {s['requests']:,} requests "
+          f"({s['errors']} errors, {s['gzip_responses']} gzip) in {s['wall_s']:.1f}s")
+    print(f"  Throughput: {s['sessions_per_s']:.2f} sessions/s, {s['requests_per_s']:.1f} requests/s, "
+          f"{s['mb_per_s']:.1f} MB/s ({s['bytes'] / 1e6:,.1f} MB transferred)")
+    for name, key in (("Session", "session_latency"), ("Request", "request_latency")):
+        lat = s[key]
+        print(f"  {name} latency: p50 {ms(lat['p50'])}, p95 {ms(lat['p95'])}, "
+              f"p99 {ms(lat['p99'])}, max {ms(lat['max'])}")
+    print(f"  {'path':<56} {'n':>5} {'KB/req':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for path, p in s["paths"].items():
+        flag = f"  ({p['errors']} errors)" if p["errors"] else ""
+        print(f"  {path[-56:]:<56} {p['n']:>5} {p['bytes_per_request'] / 1e3:>9,.1f} "
+              f"{ms(p['p50']):>9} {ms(p['p95']):>9} {ms(p['p99']):>9}{flag}")
+
+
+def print_comparison(a, b):
+    rows = [
+        ("sessions/s", "sessions_per_s", "{:.2f}"),
+        ("requests/s", "requests_per_s", "{:.1f}"),
+        ("MB transferred", None, None),
+        ("MB/session", None, None),
+        ("session p50", ("session_latency", "p50"), None),
+        ("session p95", ("session_latency", "p95"), None),
+        ("session p99", ("session_latency", "p99"), None),
+        ("request p50", ("request_latency", "p50"), None),
+        ("request p95", ("request_latency", "p95"), None),
+        ("request p99", ("request_latency", "p99"), None),
+        ("errors", "errors", "{}"),
+    ]
+
+    def cell(s, name, key, fmt):
+        if name == "MB transferred":
+            return f"{s['bytes'] / 1e6:,.1f}"
+        if name == "MB/session":
+            return f"{s['bytes'] / 1e6 / max(1, s['sessions']):,.2f}"
+        if isinstance(key, tuple):
+            return ms(s[key[0]][key[1]])
+        return fmt.format(s[key])
+
+    print(f"\n{'':<16} {a['label']:>20} {b['label']:>20}")
+    for name, key, fmt in rows:
+        print(f"{name:<16} {cell(a, name, key, fmt):>20} {cell(b, name, key, fmt):>20}")
+
+
+# ── Server ────────────────────────────────────────────────────────────
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class LocalServer:
+    """serve.py in a subprocess, so it does not share the harness's GIL."""
+
+    def __init__(self, gzip, threaded):
+        self.port = free_port()
+        cmd = [sys.executable, str(REPO / "serve.py"), "--no-browser", "--port", str(self.port)]
+        cmd += ["--gzip"] * gzip + ["--threaded"] * threaded
+        self.proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.url = f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise SystemExit("serve.py exited before accepting connections")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.2).close()
+                return self.url
+            except OSError:
+                time.sleep(0.05)
+        self.proc.kill()
+        raise SystemExit("serve.py did not start listening")
+
+    def __exit__(self, *exc):
+        self.proc.terminate()
+        self.proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the site's page-load fetches against a server under load.")
+    parser.add_argument("--url", help="server to test (default: start serve.py on a free port)")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="page")
+    parser.add_argument("--users", type=int, default=4, help="concurrent visitors (default 4)")
+    parser.add_argument("--connections", type=int, default=BROWSER_CONNECTIONS,
+                        help=f"parallel connections per visitor (default {BROWSER_CONNECTIONS})")
+    parser.add_argument("--duration", type=float, default=20.0,
+                        help="seconds to run (default 20; 0 with --sessions to run a fixed count)")
+    parser.add_argument("--sessions", type=int, help="sessions per visitor (stops early when reached)")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed sessions first (default 1)")
+    parser.add_argument("--gzip", action="store_true", help="send Accept-Encoding: gzip (and start serve.py --gzip)")
+    parser.add_argument("--threaded", action="store_true", help="start serve.py --threaded")
+    parser.add_argument("--compare", action="store_true", help="run uncompressed, then gzip, and compare")
+    parser.add_argument("--json", type=Path, help="also write the summaries as JSON")
+    args = parser.parse_args()
+    if not args.duration and not args.sessions:
+        parser.error("--duration 0 needs --sessions")
+
+    modes = [False, True] if args.compare else [args.gzip]
+    print(f"Scenario {args.scenario}: {args.users} visitors × {args.connections} connections, "
+          + (f"{args.duration:g}s" if args.duration else f"{args.sessions} sessions each"))
+    summaries = []
+    for gz in modes:
+        label = ("gzip" if gz else "identity") + (" threaded" if args.threaded and not args.url else "")
+        with nullcontext(args.url) if args.url else LocalServer(gzip=gz, threaded=args.threaded) as url:
+            raw = run_load(Client(url, accept_gzip=gz), args.scenario, args.users, args.connections,
+                           args.duration or None, args.sessions, args.warmup)
+        summary = summarize(raw, label, gz)
+        print_summary(summary)
+        summaries.append(summary)
+    if len(summaries) == 2:
+        if summaries[1]["gzip_responses"] == 0:
+            print("\nNote: the server sent no gzip responses; start it with serve.py --gzip.")
+        print_comparison(*summaries)
+    if args.json:
+        args.json.write_text(json.dumps({"scenario": args.scenario, "users": args.users,
+                                         "connections": args.connections, "runs": summaries}, indent=1))
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
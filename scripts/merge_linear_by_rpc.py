@@ -10,12 +10,18 @@ Run from the repo root:
 
 Inputs:  data/linear_by_rpc/Vermont_Linear_<RPC>.geojson  (one per RPC)
 Output:  data/Vermont_Linear_Features.geojson
+         .cache/feature_index/  GlobalID index of the RPC files (see
+                                feature_index.py), from the same read
 """
 
 import glob
 import json
 import os
 import sys
+from pathlib import Path
+
+from feature_index import FeatureIndex, records_from_spans
+from geojson_stream import FeatureReader
 
 INPUT_DIR = "data/linear_by_rpc"
 OUTPUT = "data/Vermont_Linear_Features.geojson"
@@ -30,6 +36,7 @@ if not files:
 all_features = []
 # Preserve top-level GeoJSON metadata (crs, name, etc.) from the first file
 template = None
+index = FeatureIndex()
 
 for path in files:
     rpc = (
@@ -37,15 +44,21 @@ for path in files:
         .replace("Vermont_Linear_", "")
         .replace(".geojson", "")
     )
-    with open(path) as f:
-        gj = json.load(f)
+    features, spans = [], []
+    with FeatureReader(Path(path)) as reader:
+        for feat, offset, length in reader.spans():
+            features.append(feat)
+            spans.append((offset, length))
     if template is None:
-        template = {k: v for k, v in gj.items() if k != "features"}
-    all_features.extend(gj["features"])
-    print(f"  {rpc}: {len(gj['features']):,} features")
+        template = {**reader.header, **reader.footer}
+    index.record_file(Path(path), records_from_spans(
+        [(feat.get("properties") or {}).get("GlobalID") for feat in features], spans))
+    all_features.extend(features)
+    print(f"  {rpc}: {len(features):,} features")
 
 out = {**template, "features": all_features}
 with open(OUTPUT, "w") as f:
     json.dump(out, f)
 
+index.update()
 print(f"\nMerged {len(all_features):,} features from {len(files)} files → {OUTPUT}")
@@ -0,0 +1,102 @@
+"""
+normalization_rules.py
+----------------------
+Declarative attribute normalization for GeoJSON features.
+
+Rules live in a JSON file (see scripts/cleanup_rules.json):
+
+    {
+      "rules": [
+        {
+          "counter": "status_standardized",      # audit counter name
+          "field": "Status",                     # property to normalize
+          "match": ["E"],                        # values to replace (null allowed)
+          "match_blank": false,                  # also match ""/whitespace-only
+          "replacement": "Existing",
+          "description": "'E' values converted to 'Existing'"
+        }
+      ]
+    }
+
+The features are first pulled into a columnar table holding only the fields
+the rules touch. All rules for a field are compiled into one value →
+replacement lookup, so each column is scanned once no matter how many rules
+target it, and only changed cells are written back to the feature dicts.
+
+Used by cleanup_linear_data.py; not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from pathlib import Path
+
+
+def load_rules(path: Path) -> list[dict]:
+    """Load and sanity-check a rule file."""
+    with path.open() as f:
+        rules = json.load(f).get("rules", [])
+    for i, rule in enumerate(rules):
+        missing = {"counter", "field", "replacement"} - rule.keys()
+        if missing:
+            raise ValueError(f"{path.name}: rule {i} is missing {', '.join(sorted(missing))}")
+        if not rule.get("match") and not rule.get("match_blank"):
+            raise ValueError(f"{path.name}: rule {i} ({rule['counter']}) matches nothing")
+    return rules
+
+
+def compile_rules(rules: list[dict]) -> dict[str, dict]:
+    """Group rules by field into {field: {"values": {value: rule}, "blank": rule}}.
+
+    The first rule that claims a value wins, mirroring the order of the file.
+    """
+    compiled: dict[str, dict] = {}
+    for rule in rules:
+        entry = compiled.setdefault(rule["field"], {"values": {}, "blank": None})
+        for value in rule.get("match", []):
+            entry["values"].setdefault(value, rule)
+        if rule.get("match_blank") and entry["blank"] is None:
+            entry["blank"] = rule
+    return compiled
+
+
+def build_table(features: list[dict], fields) -> dict[str, list]:
+    """Extract the given property columns from a feature list."""
+    props = [f.get("properties") or {} for f in features]
+    return {field: [p.get(field) for p in props] for field in fields}
+
+
+def _is_blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def apply_rules(features: list[dict], rules: list[dict]) -> Counter:
+    """Apply `rules` column-wise to `features` in place.
+
+    Returns a Counter keyed by each rule's audit counter (zero for rules that
+    matched nothing, so reports always list every rule).
+    """
+    counts: Counter = Counter({rule["counter"]: 0 for rule in rules})
+    compiled = compile_rules(rules)
+    table = build_table(features, compiled.keys())
+
+    for field, entry in compiled.items():
+        values, blank = entry["values"], entry["blank"]
+        # One scan per column; only the changed cells are written back.
+        for row, value in enumerate(table[field]):
+            rule = values.get(value) if _hashable(value) else None
+            if rule is None and blank is not None and _is_blank(value):
+                rule = blank
+            if rule is None:
+                continue
+            feat = features[row]
+            if feat.get("properties") is None:
+                feat["properties"] = {}
+            feat["properties"][field] = rule["replacement"]
+            counts[rule["counter"]] += 1
+    return counts
+
+
+def _hashable(value) -> bool:
+    return not isinstance(value, (dict, list))
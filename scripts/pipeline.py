@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+pipeline.py
+-----------
+Run the data scripts as one dependency-aware pipeline.
+
+Each step below declares the script it runs, the files it reads (inputs),
+the files it writes (outputs), and the steps it must wait for (after).
+Steps whose dependencies are done run concurrently (--jobs, one subprocess
+each). A step is skipped when the content hashes of its inputs, the
+script, and its arguments match the last successful run and all of its
+outputs exist. Hashes are recorded after the step finishes, so
+steps that rewrite their own inputs in place (cleanup) are not re-run on
+the next invocation. A step with a missing required input (e.g. the
+investment source, which is not in the repo) is skipped and does not block
+the steps after it.
+
+Default steps (rebuilding the site after a data update):
+    transform -> cleanup -> merge
+                         \\-> html
+                         \\-> corridor
+                         \\-> overview
+    points, clusters (independent)
+Extra steps, run only when named: validate, network, dedupe, hex,
+topojson, boundaries, split (split is the inverse of merge, for when the
+statewide file is the edited copy).
+
+Run from repo root:
+    python scripts/pipeline.py                 # default steps
+    python scripts/pipeline.py html validate   # named steps + their deps
+    python scripts/pipeline.py --list
+    python scripts/pipeline.py --dry-run
+    python scripts/pipeline.py --force --jobs 2
+
+State:  .cache/pipeline_state.json
+Logs:   .cache/pipeline_logs/<step>.log (stdout + stderr of the last run)
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+CACHE_DIR = REPO / ".cache"
+STATE_FILE = CACHE_DIR / "pipeline_state.json"
+LOG_DIR = CACHE_DIR / "pipeline_logs"
+
+LINEAR = "data/linear_by_rpc/Vermont_Linear_*.geojson"
+TOWNS = "data/Vermont_Town_GEOID_RPC_County.geojson"
+STATEWIDE = "data/Vermont_Linear_Features.geojson"
+INVESTMENT = "data/Vermont_Water_Investment_Infrastructure_Public_-6999738747210364761.geojson"
+
+# Inputs prefixed with "?" are optional: a missing optional input is just
+# left out of the hash, a missing required input skips the step.
+STEPS = [
+    {
+        "name": "transform",
+        "script": "transform_investment_to_linear_by_rpc.py",
+        "inputs": [INVESTMENT, TOWNS, "scripts/geojson_stream.py", "scripts/town_grid.py",
+                   "scripts/bulk_geometry.py"],
+        "outputs": [LINEAR, "data/Vermont_Linear_Features_from_investment.geojson"],
+        "after": [],
+    },
+    {
+        "name": "cleanup",
+        "script": "cleanup_linear_data.py",
+        "inputs": [LINEAR, TOWNS, "scripts/cleanup_rules.json",
+                   "scripts/normalization_rules.py", "scripts/data_loader.py",
+                   "scripts/town_grid.py", "scripts/bulk_geometry.py"],
+        "outputs": [LINEAR, "cleanup_report.txt", "analysis/Owner_Source_Codebook.md"],
+        "after": ["transform"],
+    },
+    {
+        "name": "merge",
+        "script": "merge_linear_by_rpc.py",
+        "inputs": [LINEAR, "scripts/feature_index.py", "scripts/geojson_stream.py"],
+        "outputs": [STATEWIDE],
+        "after": ["cleanup"],
+    },
+    {
+        "name": "html",
+        "script": "update_linear_html_values.py",
+        "inputs": [LINEAR, TOWNS, "scripts/update_static_charts.py", "scripts/data_loader.py"],
+        "outputs": ["index.html", "data.html"],
+        "after": ["cleanup"],
+    },
+    {
+        "name": "corridor",
+        "script": "verify_sewer_corridor.py",
+        "args": ["--by-town"],
+        "inputs": [LINEAR, TOWNS, "scripts/projection.py", "scripts/boundary_cache.py",
+                   "scripts/data_loader.py", "scripts/bulk_geometry.py",
+                   "scripts/corridor_cache.py", "scripts/corridor_raster.py"],
+        "outputs": ["data/sewer_corridor_by_town.csv", "data/sewer_corridor_by_rpc.csv",
+                    "data/sewer_corridor_by_town.json"],
+        "after": ["cleanup"],
+    },
+    {
+        "name": "overview",
+        "script": "build_linear_overview.py",
+        "inputs": [LINEAR, "scripts/update_static_charts.py", "scripts/data_loader.py"],
+        "outputs": ["data/Vermont_Linear_Overview.geojson"],
+        "after": ["cleanup"],
+    },
+    {
+        "name": "points",
+        "script": "split_points_by_rpc.py",
+        "inputs": ["data/Vermont_Point_Features.geojson", "scripts/geojson_stream.py"],
+        "outputs": ["data/points_by_rpc/index.json"],
+        "after": [],
+    },
+    {
+        "name": "clusters",
+        "script": "cluster_points.py",
+        "inputs": ["data/Vermont_Point_Features.geojson", "scripts/data_loader.py"],
+        "outputs": ["data/point_clusters/index.json"],
+        "after": [],
+    },
+    {
+        "name": "validate",
+        "script": "validate_data_standards.py",
+        "inputs": [LINEAR, TOWNS, "?data/Vermont_Point_Features.geojson", "?data/Zoning Data/*.geojson"],
+        "outputs": ["validation_report.txt"],
+        "after": ["cleanup"],
+        "default": False,
+    },
+    {
+        "name": "network",
+        "script": "build_sewer_network.py",
+        "inputs": [LINEAR, TOWNS, "data/Vermont_Treatment_Facilities.geojson"],
+        "outputs": ["analysis/sewer_network_components.csv", "analysis/sewer_network_by_town.csv"],
+        "after": ["cleanup"],
+        "default": False,
+    },
+    {
+        "name": "dedupe",
+        "script": "dedupe_linear_features.py",
+        "inputs": [LINEAR],
+        "outputs": ["analysis/duplicate_linear_features.csv"],
+        "after": ["cleanup"],
+        "default": False,
+    },
+    {
+        "name": "hex",
+        "script": "hex_density.py",
+        "inputs": [LINEAR, "?data/Vermont_Point_Features.geojson", "scripts/update_static_charts.py",
+                   "scripts/projection.py", "scripts/data_loader.py"],
+        "outputs": ["data/hex_density/hex_*m.json"],
+        "after": ["cleanup"],
+        "default": False,
+    },
+    {
+        "name": "topojson",
+        "script": "build_topojson.py",
+        "inputs": ["data/Zoning Data/*.geojson", TOWNS, "scripts/data_loader.py"],
+        "outputs": ["data/topojson/*.topojson"],
+        "after": [],
+        "default": False,
+    },
+    {
+        "name": "boundaries",
+        "script": "boundary_cache.py",
+        "inputs": [TOWNS, "scripts/projection.py"],
+        "outputs": [".cache/boundaries/boundaries_*.json"],
+        "after": [],
+        "default": False,
+    },
+    {
+        "name": "split",
+        "script": "split_linear_by_rpc.py",
+        "inputs": [STATEWIDE, "scripts/feature_index.py", "scripts/geojson_stream.py"],
+        "outputs": [LINEAR],
+        "after": [],
+        "default": False,
+    },
+]
+STEP_BY_NAME = {step["name"]: step for step in STEPS}
+
+
+# ── File hashing ──────────────────────────────────────────────────────
+
+
+class FileHasher:
+    """Content hashes with a (size, mtime) shortcut carried across runs."""
+
+    def __init__(self, known: dict | None = None):
+        self.known = dict(known or {})  # relpath -> [size, mtime_ns, digest]
+
+    def digest(self, path: Path) -> str:
+        st = path.stat()
+        rel = path.relative_to(REPO).as_posix()
+        entry = self.known.get(rel)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        h = hashlib.blake2b(digest_size=16)
+        with path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        self.known[rel] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+        return h.hexdigest()
+
+    def digest_patterns(self, patterns) -> tuple[str, list[str]]:
+        """Combined digest of every file matching the patterns, plus missing required ones."""
+        h = hashlib.blake2b(digest_size=16)
+        missing = []
+        for pattern in patterns:
+            optional = pattern.startswith("?")
+            pattern = pattern.lstrip("?")
+            paths = sorted(REPO.glob(pattern)) if any(c in pattern for c in "*?[") else [REPO / pattern]
+            paths = [p for p in paths if p.is_file()]
+            if not paths and not optional:
+                missing.append(pattern)
+            for path in paths:
+                h.update(path.relative_to(REPO).as_posix().encode())
+                h.update(self.digest(path).encode())
+        return h.hexdigest(), missing
+
+
+def step_command(step: dict) -> list[str]:
+    return [sys.executable, str(REPO / "scripts" / step["script"]), *step.get("args", [])]
+
+
+def step_signature(step: dict) -> list[str]:
+    """Script and arguments, relative to the repo, as recorded in the state."""
+    return [f"scripts/{step['script']}", *step.get("args", [])]
+
+
+def step_inputs(step: dict) -> list[str]:
+    """Declared inputs plus the script itself."""
+    return [*step["inputs"], f"scripts/{step['script']}"]
+
+
+# ── Planning ──────────────────────────────────────────────────────────
+
+
+def plan(targets, include_deps: bool = True) -> list[dict]:
+    """Steps needed for `targets` (default steps if empty), in declaration order."""
+    wanted = set()
+    stack = list(targets or [s["name"] for s in STEPS if s.get("default", True)])
+    while stack:
+        name = stack.pop()
+        if name not in STEP_BY_NAME:
+            raise KeyError(f"unknown step {name!r}; choose from {', '.join(STEP_BY_NAME)}")
+        if name not in wanted:
+            wanted.add(name)
+            if include_deps:
+                stack.extend(STEP_BY_NAME[name]["after"])
+    return [s for s in STEPS if s["name"] in wanted]
+
+
+def load_state() -> dict:
+    if STATE_FILE.exists():
+        with STATE_FILE.open() as f:
+            return json.load(f)
+    return {"files": {}, "steps": {}}
+
+
+def save_state(state: dict) -> None:
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_FILE.with_suffix(".tmp")
+    with tmp.open("w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, STATE_FILE)
+
+
+def check_step(step: dict, hasher: FileHasher, state: dict, force: bool) -> tuple[str, str]:
+    """Return ("run" | "skip" | "missing", reason) for one step."""
+    inputs_digest, missing = hasher.digest_patterns(step_inputs(step))
+    if missing:
+        return "missing", f"missing input {missing[0]}"
+    if force:
+        return "run", "forced"
+    last = state["steps"].get(step["name"])
+    if last is None:
+        return "run", "never run"
+    if last["command"] != step_signature(step):
+        return "run", "arguments changed"
+    if last["inputs"] != inputs_digest:
+        return "run", "inputs changed"
+    # Outputs only need to exist: several steps rewrite the RPC files, so
+    # their content legitimately changes after the step that first wrote them.
+    _, missing_out = hasher.digest_patterns(step["outputs"])
+    if missing_out:
+        return "run", f"missing output {missing_out[0]}"
+    return "skip", "up to date"
+
+
+# ── Execution ─────────────────────────────────────────────────────────
+
+
+def run_step(step: dict) -> tuple[int, float]:
+    """Run one step as a subprocess, logging its output; returns (exit code, seconds)."""
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    with (LOG_DIR / f"{step['name']}.log").open("w") as log:
+        proc = subprocess.run(step_command(step), cwd=REPO, stdout=log, stderr=subprocess.STDOUT, check=False)
+    return proc.returncode, time.perf_counter() - t0
+
+
+def dry_run(targets=None, force: bool = False) -> list[dict]:
+    """Report what run_pipeline would do, without running anything."""
+    state = load_state()
+    hasher = FileHasher(state.get("files"))
+    results = {}
+    for step in plan(targets):
+        name = step["name"]
+        upstream = [d for d in step["after"] if results.get(d, {}).get("status") == "would run"]
+        action, reason = check_step(step, hasher, state, force)
+        if action == "missing":
+            status = "missing input"
+        elif upstream:
+            status, reason = "would run", f"after {', '.join(upstream)}"
+        else:
+            status = "would run" if action == "run" else "skipped"
+        results[name] = {"name": name, "status": status, "reason": reason, "seconds": 0.0}
+    return list(results.values())
+
+
+def run_pipeline(targets=None, jobs: int = 4, force: bool = False, include_deps: bool = True) -> list[dict]:
+    """Run the planned steps; returns one result dict per step, in plan order."""
+    steps = plan(targets, include_deps)
+    state = load_state()
+    hasher = FileHasher(state.get("files"))
+    results = {s["name"]: {"name": s["name"], "status": "pending", "reason": "", "seconds": 0.0} for s in steps}
+    # Only dependencies inside the plan count; the rest were not requested.
+    deps = {s["name"]: [d for d in s["after"] if d in results] for s in steps}
+
+    pending = list(steps)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            for step in list(pending):
+                name = step["name"]
+                dep_status = [results[d]["status"] for d in deps[name]]
+                if any(st in ("failed", "blocked") for st in dep_status):
+                    results[name].update(status="blocked", reason="dependency failed")
+                    pending.remove(step)
+                    continue
+                if any(st in ("pending", "running") for st in dep_status):
+                    continue
+                pending.remove(step)
+                # Checked only once the dependencies have settled, so the
+                # hashes see whatever the upstream steps wrote.
+                action, reason = check_step(step, hasher, state, force)
+                if action == "missing":
+                    results[name].update(status="missing input", reason=reason)
+                elif action == "skip":
+                    results[name].update(status="skipped", reason=reason)
+                else:
+                    print(f"[{name}] running ({reason})", flush=True)
+                    results[name].update(status="running", reason=reason)
+                    running[pool.submit(run_step, step)] = step
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                name = step["name"]
+                code, seconds = future.result()
+                results[name]["seconds"] = seconds
+                if code != 0:
+                    log = (LOG_DIR / f"{name}.log").relative_to(REPO)
+                    results[name].update(status="failed", reason=f"exit {code}, see {log}")
+                    print(f"[{name}] FAILED after {seconds:.1f}s", flush=True)
+                    continue
+                results[name]["status"] = "ran"
+                print(f"[{name}] done in {seconds:.1f}s", flush=True)
+                inputs_digest, _ = hasher.digest_patterns(step_inputs(step))
+                state["steps"][name] = {
+                    "command": step_signature(step),
+                    "inputs": inputs_digest,
+                    "seconds": round(seconds, 3),
+                }
+                state["files"] = hasher.known
+                save_state(state)
+
+    state["files"] = hasher.known
+    save_state(state)
+    return [results[s["name"]] for s in steps]
+
+
+def print_summary(results: list[dict], wall: float) -> None:
+    print(f"\n{'Step':<12}{'Status':<15}{'Seconds':>9}  Reason")
+    print("-" * 60)
+    for r in results:
+        secs = f"{r['seconds']:.1f}" if r["status"] in ("ran", "failed") else "-"
+        print(f"{r['name']:<12}{r['status']:<15}{secs:>9}  {r['reason']}")
+    busy = sum(r["seconds"] for r in results)
+    print("-" * 60)
+    print(f"Wall clock {wall:.1f}s, step time {busy:.1f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the data pipeline, skipping up-to-date steps.")
+    parser.add_argument("steps", nargs="*", help="steps to run (plus their dependencies); default steps if omitted")
+    parser.add_argument("--jobs", type=int, default=min(4, os.cpu_count() or 1),
+                        help="steps to run at the same time (default: min(4, CPU count))")
+    parser.add_argument("--force", action="store_true", help="run every planned step even if up to date")
+    parser.add_argument("--dry-run", action="store_true", help="show what would run without running it")
+    parser.add_argument("--list", action="store_true", help="list the steps and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for s in STEPS:
+            flag = "" if s.get("default", True) else " (on request)"
+            after = f" after {', '.join(s['after'])}" if s["after"] else ""
+            print(f"{s['name']:<12}{s['script']}{after}{flag}")
+        return
+
+    try:
+        plan(args.steps)
+    except KeyError as e:
+        parser.error(e.args[0])
+
+    t0 = time.perf_counter()
+    if args.dry_run:
+        results = dry_run(args.steps, force=args.force)
+    else:
+        results = run_pipeline(args.steps, jobs=args.jobs, force=args.force)
+    print_summary(results, time.perf_counter() - t0)
+    if any(r["status"] in ("failed", "blocked") for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+projection.py
+-------------
+Lightweight CRS projection for shapely geometries.
+
+One pyproj Transformer is built per (source, target) pair and cached for the
+life of the process. Geometries are projected in bulk: shapely.transform
+hands every coordinate of the whole array to the transformer as one flat
+(N, 2) array and rebuilds the geometries from the result, so there is no
+per-feature Python work and no GeoDataFrame.
+
+geopandas is optional. backend="geopandas" keeps the previous
+GeoDataFrame.to_crs path (imported only when asked for) so the two can be
+compared.
+
+Used by verify_sewer_corridor.py; not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+import shapely
+
+WGS84 = "EPSG:4326"
+UTM_18N = "EPSG:32618"  # covers Vermont
+
+
+@lru_cache(maxsize=None)
+def get_transformer(source: str, target: str):
+    """Cached always_xy Transformer (lon/lat order in, easting/northing out)."""
+    from pyproj import Transformer
+
+    return Transformer.from_crs(source, target, always_xy=True)
+
+
+def project(geometries, target: str = UTM_18N, source: str = WGS84, backend: str = "pyproj") -> np.ndarray:
+    """Project shapely geometries from `source` to `target`.
+
+    Accepts any iterable of geometries and returns a NumPy object array in
+    the same order.
+    """
+    geoms = np.asarray(list(geometries), dtype=object)
+    if backend == "geopandas":
+        from geopandas import GeoDataFrame
+
+        gdf = GeoDataFrame({"geometry": geoms}, crs=source)
+        return gdf.to_crs(target).geometry.values.to_numpy()
+    if backend != "pyproj":
+        raise ValueError(f"unknown projection backend: {backend}")
+
+    transformer = get_transformer(source, target)
+
+    def _transform(coords: np.ndarray) -> np.ndarray:
+        x, y = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y])
+
+    return shapely.transform(geoms, _transform)
+
+
+def to_utm(geometries, backend: str = "pyproj") -> np.ndarray:
+    """Project WGS84 geometries to UTM Zone 18N (EPSG:32618)."""
+    return project(geometries, UTM_18N, WGS84, backend=backend)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+query_features.py
+-----------------
+Answer ad-hoc questions about the linear and point features ("how many
+miles of force main in Windham County, by Status?") from the columnar
+feature store (feature_store.py) instead of parsing the GeoJSON each time.
+
+Filters take comma-separated values and match case-insensitively; "null"
+matches a missing value. --town matches Municipal_Name or GEOIDTXT;
+--intersects-town instead selects features whose geometry touches the
+town polygon. --site applies the site's includeLinear rule. Results are
+grouped by --group-by fields (none: a single total row) with the --agg
+columns. Stale cache chunks are rebuilt first, so the first query after
+the data changes is slower.
+
+Run from the repo root:
+    python scripts/query_features.py --system-type Wastewater --type 18 \\
+        --county Windham --group-by Status --agg count,length_mi
+    python scripts/query_features.py --layer points --rpc CVRPC --group-by SystemType,Type
+    python scripts/query_features.py --intersects-town Montpelier --group-by SystemType --format csv
+    python scripts/query_features.py --bbox=-73.3,42.7,-72.5,43.2 --agg count,length_m --format json
+
+Input:   data/linear_by_rpc/Vermont_Linear_<RPC>.geojson
+         data/Vermont_Point_Features.geojson
+         data/Vermont_Town_GEOID_RPC_County.geojson (for --intersects-town)
+Cache:   .cache/feature_store/
+Output:  table, CSV or JSON on stdout
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+import numpy as np
+
+from feature_store import CATEGORICAL, LAYERS, load_layer, load_towns, refresh_layer
+
+M_PER_MILE = 1609.344
+
+FILTERS = {  # option -> field
+    "rpc": "RPC",
+    "county": "County",
+    "system_type": "SystemType",
+    "type": "Type",
+    "status": "Status",
+    "owner": "Owner",
+    "source": "Source",
+}
+GROUP_ALIASES = {f.casefold(): f for f in CATEGORICAL} | {"town": "Municipal_Name", "geoid": "GEOIDTXT"}
+AGGREGATES = ("count", "length_m", "length_mi")
+
+
+def value_matcher(raw: str):
+    """Predicate for dictionary values matching any of the comma-separated `raw`."""
+    wanted = {w.strip().casefold() for w in raw.split(",") if w.strip()}
+    def match(value):
+        if value is None:
+            return "null" in wanted
+        return str(value).casefold() in wanted
+    return match
+
+
+def site_mask(chunk) -> np.ndarray:
+    """includeLinear: drop stormwater features that are not Type 2."""
+    def not_type_2(value):
+        try:
+            return int(value) != 2
+        except (TypeError, ValueError):
+            return True
+    storm = np.isin(chunk.column("SystemType"), chunk.codes_for("SystemType", lambda v: v == "Stormwater"))
+    other = np.isin(chunk.column("Type"), chunk.codes_for("Type", not_type_2))
+    return ~(storm & other)
+
+
+def bbox_mask(chunk, bbox) -> np.ndarray:
+    b = chunk.column("bbox")
+    w, s, e, n = bbox
+    return (b[:, 0] <= e) & (b[:, 2] >= w) & (b[:, 1] <= n) & (b[:, 3] >= s)
+
+
+def intersects_mask(chunk, candidates: np.ndarray, polygon) -> np.ndarray:
+    """Exact intersection test for the candidate features, built in bulk from the coordinate columns."""
+    import shapely
+
+    hit = np.zeros(chunk.count, dtype=bool)
+    part_feature = chunk.column("part_feature")
+    parts = np.flatnonzero(candidates[part_feature])
+    if not len(parts):
+        return hit
+    offsets = chunk.column("part_offsets")
+    starts, ends = offsets[parts], offsets[parts + 1]
+    lengths = ends - starts
+    coords = chunk.column("coords")
+    for single in (True, False):
+        sel = (lengths == 1) if single else (lengths >= 2)
+        if not sel.any():
+            continue
+        s, n = starts[sel], lengths[sel]
+        idx = np.repeat(s - np.cumsum(n) + n, n) + np.arange(n.sum())
+        pts = np.asarray(coords[idx])
+        if single:
+            geoms = shapely.points(pts)
+        else:
+            geoms = shapely.linestrings(pts, indices=np.repeat(np.arange(len(n)), n))
+        touched = shapely.intersects(geoms, polygon)
+        hit[part_feature[parts[sel][touched]]] = True
+    return hit
+
+
+def chunk_mask(chunk, args, town_geom) -> np.ndarray:
+    mask = np.ones(chunk.count, dtype=bool)
+    for option, field in FILTERS.items():
+        raw = getattr(args, option)
+        if raw:
+            mask &= np.isin(chunk.column(field), chunk.codes_for(field, value_matcher(raw)))
+    if args.town:
+        match = value_matcher(args.town)
+        mask &= (np.isin(chunk.column("Municipal_Name"), chunk.codes_for("Municipal_Name", match))
+                 | np.isin(chunk.column("GEOIDTXT"), chunk.codes_for("GEOIDTXT", match)))
+    if args.site:
+        mask &= site_mask(chunk)
+    if args.bbox:
+        mask &= bbox_mask(chunk, args.bbox)
+    if town_geom is not None:
+        mask &= bbox_mask(chunk, town_geom.bounds)
+        mask &= intersects_mask(chunk, mask, town_geom)
+    return mask
+
+
+def aggregate(chunks, args, town_geom):
+    """{group values tuple: [count, metres]} over all chunks."""
+    results = {}
+    for chunk in chunks:
+        mask = chunk_mask(chunk, args, town_geom)
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            continue
+        metres = chunk.column("length_m")[rows]
+        if args.group_by:
+            codes = np.stack([chunk.column(f)[rows] for f in args.group_by], axis=1)
+            keys, inverse = np.unique(codes, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            counts = np.bincount(inverse, minlength=len(keys))
+            sums = np.bincount(inverse, weights=metres, minlength=len(keys))
+            for key, count, total in zip(keys, counts, sums):
+                values = tuple(chunk.dictionaries[f][c] for f, c in zip(args.group_by, key))
+                acc = results.setdefault(tuple(json.dumps(v) for v in values), [values, 0, 0.0])
+                acc[1] += int(count)
+                acc[2] += float(total)
+        else:
+            acc = results.setdefault((), [(), 0, 0.0])
+            acc[1] += len(rows)
+            acc[2] += float(metres.sum())
+    return sorted(results.values(), key=lambda r: tuple("" if v is None else str(v) for v in r[0]))
+
+
+def result_rows(groups, args):
+    rows = []
+    for values, count, metres in groups:
+        row = dict(zip(args.group_by, values))
+        for agg in args.agg:
+            row[agg] = {"count": count, "length_m": round(metres, 1), "length_mi": round(metres / M_PER_MILE, 2)}[agg]
+        rows.append(row)
+    return rows
+
+
+def print_table(rows, columns):
+    cells = [[("" if r[c] is None else f"{r[c]:,}" if isinstance(r[c], (int, float)) and c in AGGREGATES else str(r[c]))
+              for c in columns] for r in rows]
+    widths = [max([len(c)] + [len(row[i]) for row in cells]) for i, c in enumerate(columns)]
+    numeric = [c in AGGREGATES for c in columns]
+    def line(values):
+        return "  ".join(v.rjust(w) if num else v.ljust(w) for v, w, num in zip(values, widths, numeric)).rstrip()
+    print(line(columns))
+    print(line(["-" * w for w in widths]))
+    for row in cells:
+        print(line(row))
+
+
+def parse_list(raw, allowed, what):
+    items = [i.strip() for i in raw.split(",") if i.strip()]
+    for item in items:
+        if item.casefold() not in allowed:
+            raise SystemExit(f"unknown {what}: {item} (choose from {', '.join(sorted(set(allowed.values())))})")
+    return [allowed[i.casefold()] for i in items]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the linear and point features from the columnar cache.")
+    parser.add_argument("--layer", choices=LAYERS, default="linear")
+    for option, field in FILTERS.items():
+        parser.add_argument(f"--{option.replace('_', '-')}", metavar="VALUES", help=f"{field} values")
+    parser.add_argument("--town", metavar="VALUES", help="Municipal_Name or GEOIDTXT values")
+    parser.add_argument("--bbox", metavar="W,S,E,N",
+                        type=lambda s: [float(v) for v in s.split(",")], help="features whose bounds overlap this box")
+    parser.add_argument("--intersects-town", metavar="TOWN", help="features that intersect this town (name or GEOID)")
+    parser.add_argument("--site", action="store_true", help="only features the mapping site shows (includeLinear)")
+    parser.add_argument("--group-by", default="", metavar="FIELDS",
+                        help="comma-separated fields (RPC, County, town, geoid, SystemType, Type, Status, Owner, Source)")
+    parser.add_argument("--agg", default="count,length_mi", metavar="AGGS", help=f"any of {', '.join(AGGREGATES)}")
+    parser.add_argument("--format", choices=("table", "csv", "json"), default="table")
+    parser.add_argument("--rebuild", action="store_true", help="rebuild the whole cache first")
+    args = parser.parse_args()
+    if args.bbox is not None and len(args.bbox) != 4:
+        parser.error("--bbox needs four numbers: W,S,E,N")
+    args.group_by = parse_list(args.group_by, GROUP_ALIASES, "group-by field")
+    args.agg = parse_list(args.agg, {a: a for a in AGGREGATES}, "aggregate")
+
+    t0 = time.perf_counter()
+    built = refresh_layer(args.layer, rebuild=args.rebuild)
+    if built:
+        print(f"Rebuilt {len(built)} cache chunk(s) in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    t1 = time.perf_counter()
+    chunks = load_layer(args.layer, refresh=False)
+    if not chunks:
+        raise SystemExit(f"No {args.layer} data found")
+
+    town_geom = None
+    if args.intersects_town:
+        towns = load_towns()
+        i = towns.find(args.intersects_town)
+        if i is None:
+            raise SystemExit(f"Unknown town: {args.intersects_town}")
+        town_geom = towns.geometry(i)
+        import shapely
+        shapely.prepare(town_geom)
+
+    rows = result_rows(aggregate(chunks, args, town_geom), args)
+    columns = args.group_by + args.agg
+    if args.format == "json":
+        json.dump(rows, sys.stdout, indent=1)
+        print()
+    elif args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        print_table(rows, columns)
+    print(f"{sum(c.count for c in chunks):,} features, query {time.perf_counter() - t1:.3f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
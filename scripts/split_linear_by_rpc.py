@@ -11,11 +11,17 @@ Run from the repo root:
 
 Input:   data/Vermont_Linear_Features.geojson
 Output:  data/linear_by_rpc/Vermont_Linear_<RPC>.geojson  (one per RPC)
+         .cache/feature_index/  GlobalID index of the written files (see
+                                feature_index.py)
 """
 
 import json
 import os
 from collections import defaultdict
+from pathlib import Path
+
+from feature_index import FeatureIndex, records_from_spans
+from geojson_stream import FeatureWriter
 
 INPUT = "data/Vermont_Linear_Features.geojson"
 OUTPUT_DIR = "data/linear_by_rpc"
@@ -40,12 +46,18 @@ for feat in gj["features"]:
 # Preserve top-level GeoJSON metadata (crs, name, etc.) without the features list
 template = {k: v for k, v in gj.items() if k != "features"}
 
+index = FeatureIndex()
 for rpc, features in sorted(by_rpc.items()):
     out_path = os.path.join(OUTPUT_DIR, f"Vermont_Linear_{rpc}.geojson")
-    out = {**template, "features": features}
-    with open(out_path, "w") as f:
-        json.dump(out, f)
+    # Same bytes as json.dump({**template, "features": features}), plus the
+    # offset of every feature for the GlobalID index.
+    with FeatureWriter(Path(out_path), template, record_spans=True) as writer:
+        for feat in features:
+            writer.write(feat)
+    index.record_file(Path(out_path), records_from_spans(
+        [feat["properties"].get("GlobalID") for feat in features], writer.spans))
     print(f"  {rpc}: {len(features):,} features → {out_path}")
+index.update()
 
 print(f"\nTotal: {len(gj['features']):,} features across {len(by_rpc)} RPCs")
 if null_count:
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+split_points_by_rpc.py
+----------------------
+Split Vermont_Point_Features.geojson into one file per Regional Planning
+Commission (RPC) and point Type, plus an index manifest. This is the point
+counterpart of split_linear_by_rpc.py: the mapping site reads the manifest
+and fetches only the files for the types it displays whose bounds are in
+view, instead of the full statewide point file.
+
+The input is streamed (geojson_stream.py) and every feature is appended to
+its output file as soon as it is read, so memory use does not grow with
+the size of the point file.
+
+Run from the repo root:
+    python scripts/split_points_by_rpc.py
+
+Input:   data/Vermont_Point_Features.geojson
+Output:  data/points_by_rpc/Vermont_Point_<RPC>_<Type>.geojson
+         data/points_by_rpc/index.json
+             {"source", "total",
+              "files": [{"rpc", "type", "file", "count", "bbox"}, ...],
+              "rpcs":  {rpc: {"count", "bbox"}},
+              "types": {type: count}}
+         bbox is [min lon, min lat, max lon, max lat].
+"""
+
+import json
+import os
+from contextlib import ExitStack
+from pathlib import Path
+
+from geojson_stream import FeatureReader, FeatureWriter
+
+REPO = Path(__file__).resolve().parent.parent
+INPUT = REPO / "data" / "Vermont_Point_Features.geojson"
+OUTPUT_DIR = REPO / "data" / "points_by_rpc"
+MANIFEST = OUTPUT_DIR / "index.json"
+
+
+def extend_bbox(bbox, x, y):
+    if bbox is None:
+        return [x, y, x, y]
+    bbox[0] = min(bbox[0], x)
+    bbox[1] = min(bbox[1], y)
+    bbox[2] = max(bbox[2], x)
+    bbox[3] = max(bbox[3], y)
+    return bbox
+
+
+def point_xy(geom):
+    """Coordinates of a Point (first point of a MultiPoint), or None."""
+    if not geom or not geom.get("coordinates"):
+        return None
+    if geom["type"] == "Point":
+        return geom["coordinates"][:2]
+    if geom["type"] == "MultiPoint":
+        return geom["coordinates"][0][:2]
+    return None
+
+
+def main():
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    print(f"Streaming {INPUT.relative_to(REPO)}...")
+    writers = {}
+    bboxes = {}
+    total = 0
+    null_rpc = 0
+    # Every writer is in the stack, so an error mid-stream aborts them all and
+    # leaves the previous split files in place.
+    with ExitStack() as stack:
+        reader = stack.enter_context(FeatureReader(INPUT))
+        for feat in reader:
+            props = feat.get("properties") or {}
+            rpc = props.get("RPC")
+            if not rpc:
+                rpc = "UNKNOWN"
+                null_rpc += 1
+            ptype = props.get("Type")
+            key = (rpc, "none" if ptype in (None, "") else str(ptype))
+            if key not in writers:
+                path = OUTPUT_DIR / f"Vermont_Point_{key[0]}_{key[1]}.geojson"
+                writers[key] = stack.enter_context(FeatureWriter(path, reader.header))
+                bboxes[key] = None
+            writers[key].write(feat)
+            xy = point_xy(feat.get("geometry"))
+            if xy:
+                bboxes[key] = extend_bbox(bboxes[key], xy[0], xy[1])
+            total += 1
+
+    # Remove files from an earlier split so dropped RPC/Type pairs do not linger.
+    written = {w.path for w in writers.values()}
+    for old in OUTPUT_DIR.glob("Vermont_Point_*.geojson"):
+        if old not in written:
+            old.unlink()
+
+    files = []
+    rpcs = {}
+    types = {}
+    for (rpc, ptype), writer in sorted(writers.items()):
+        bbox = bboxes[(rpc, ptype)]
+        files.append({
+            "rpc": rpc,
+            "type": int(ptype) if ptype.lstrip("-").isdigit() else ptype,
+            "file": writer.path.name,
+            "count": writer.count,
+            "bbox": [round(v, 6) for v in bbox] if bbox else None,
+        })
+        entry = rpcs.setdefault(rpc, {"count": 0, "bbox": None})
+        entry["count"] += writer.count
+        if bbox:
+            entry["bbox"] = extend_bbox(entry["bbox"], bbox[0], bbox[1])
+            entry["bbox"] = extend_bbox(entry["bbox"], bbox[2], bbox[3])
+        types[ptype] = types.get(ptype, 0) + writer.count
+        print(f"  {rpc} / Type {ptype}: {writer.count:,} features → {writer.path.name}")
+
+    manifest = {
+        "source": INPUT.name,
+        "total": total,
+        "files": files,
+        "rpcs": {rpc: {"count": e["count"], "bbox": [round(v, 6) for v in e["bbox"]] if e["bbox"] else None}
+                 for rpc, e in sorted(rpcs.items())},
+        "types": dict(sorted(types.items(), key=lambda kv: (len(kv[0]), kv[0]))),
+    }
+    with open(MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    print(f"\nTotal: {total:,} features in {len(files)} files ({len(rpcs)} RPCs × {len(types)} types)")
+    if null_rpc:
+        print(f"  ({null_rpc} features had null RPC → UNKNOWN)")
+    print(f"Manifest: {MANIFEST.relative_to(REPO)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+town_grid.py
+------------
+Point-in-town lookup with an interior grid fast path.
+
+A regular grid is laid over the town polygons and every cell is classified
+once, in bulk, from an expanded copy of its box:
+
+  inside town i  the box lies in the interior of exactly one town
+                 (contains_properly) and touches no other town
+  outside        the box touches no town
+  boundary       anything else
+
+A point in an inside or outside cell is resolved by an array index. A point
+in a boundary cell, or off the grid, gets the exact test: the polygons whose
+bounds hold the point, in their original order, with the same predicate
+("contains" or "covers") the callers used before. Cells are classified
+conservatively, so lookups return exactly what the first-match scan over
+all polygons returns.
+
+Classifying the cells takes about a second for the Vermont towns, so the
+grid is cached in .cache/town_grid/, keyed by a hash of the polygons' WKB
+and the cell size; any change to the towns gives a new key.
+
+    from town_grid import TownGrid
+    grid = TownGrid(polygons, geoids, predicate="contains")
+    geoid = grid.lookup(lon, lat)           # value of the first match, or None
+    geoids = grid.lookup_many(lons, lats)   # the same for coordinate arrays
+
+Used by cleanup_linear_data.py and transform_investment_to_linear_by_rpc.py;
+not meant to be run directly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+import shapely
+
+REPO = Path(__file__).resolve().parent.parent
+CACHE_DIR = REPO / ".cache" / "town_grid"
+FORMAT_VERSION = 1
+CELL_DEGREES = 0.005  # about 400 m × 550 m in Vermont
+OUTSIDE = -1
+BOUNDARY = -2
+
+
+class TownGrid:
+    def __init__(self, polygons, values, predicate: str = "covers", cell: float = CELL_DEGREES):
+        if predicate not in ("contains", "covers"):
+            raise ValueError(f"unsupported predicate: {predicate}")
+        self.polygons = np.asarray(polygons, dtype=object)
+        self.values = list(values)
+        self.predicate = predicate
+        self.tree = shapely.STRtree(self.polygons)
+        self.stats = {"grid": 0, "exact": 0}
+        shapely.prepare(self.polygons)
+
+        minx, miny, maxx, maxy = shapely.total_bounds(self.polygons)
+        self.cell = cell
+        self.x0, self.y0 = minx, miny
+        self.nx = max(1, math.ceil((maxx - minx) / cell))
+        self.ny = max(1, math.ceil((maxy - miny) / cell))
+        self.grid = self._load_or_classify()
+
+    def _cache_path(self) -> Path:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{FORMAT_VERSION}:{self.cell!r}:".encode())
+        for wkb in shapely.to_wkb(self.polygons):
+            h.update(wkb)
+        return CACHE_DIR / f"grid_{h.hexdigest()}.npy"
+
+    def _load_or_classify(self) -> np.ndarray:
+        path = self._cache_path()
+        try:
+            grid = np.load(path)
+            if grid.shape == (self.ny, self.nx):
+                return grid
+        except (OSError, ValueError):
+            pass
+        grid = self._classify()
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp, grid)
+        os.replace(tmp, path)
+        return grid
+
+    def _classify(self) -> np.ndarray:
+        # Boxes are grown a little so a point assigned to a cell by floor()
+        # always lies inside its box despite rounding.
+        pad = self.cell * 1e-6
+        ix, iy = np.meshgrid(np.arange(self.nx), np.arange(self.ny))
+        x = self.x0 + ix.ravel() * self.cell
+        y = self.y0 + iy.ravel() * self.cell
+        boxes = shapely.box(x - pad, y - pad, x + self.cell + pad, y + self.cell + pad)
+
+        box_idx, poly_idx = self.tree.query(boxes, predicate="intersects")
+        touching = np.bincount(box_idx, minlength=len(boxes))
+        grid = np.full(len(boxes), BOUNDARY, dtype=np.int32)
+        grid[touching == 0] = OUTSIDE
+        single = touching[box_idx] == 1
+        b, p = box_idx[single], poly_idx[single]
+        inside = shapely.contains_properly(self.polygons[p], boxes[b])
+        grid[b[inside]] = p[inside]
+        return grid.reshape(self.ny, self.nx)
+
+    def index(self, x: float, y: float) -> int | None:
+        """Index of the first polygon holding (x, y), or None."""
+        i = math.floor((x - self.x0) / self.cell)
+        j = math.floor((y - self.y0) / self.cell)
+        if 0 <= i < self.nx and 0 <= j < self.ny:
+            code = int(self.grid[j, i])
+            if code != BOUNDARY:
+                self.stats["grid"] += 1
+                return code if code >= 0 else None
+        return self._exact(x, y)
+
+    def _exact(self, x: float, y: float) -> int | None:
+        self.stats["exact"] += 1
+        pt = shapely.Point(x, y)
+        test = shapely.contains if self.predicate == "contains" else shapely.covers
+        for k in sorted(self.tree.query(pt)):
+            if test(self.polygons[k], pt):
+                return int(k)
+        return None
+
+    def lookup(self, x: float, y: float):
+        """Value of the first polygon holding (x, y), or None."""
+        k = self.index(x, y)
+        return None if k is None else self.values[k]
+
+    def indices(self, xs, ys) -> np.ndarray:
+        """index() for coordinate arrays; -1 where no polygon holds the point.
+
+        The points in boundary cells get the exact test in one bulk STRtree
+        query (point within / covered_by polygon, the converse of the
+        polygon's contains / covers), keeping the lowest matching index.
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        out = np.full(len(xs), BOUNDARY, dtype=np.int64)
+        fx = np.floor((xs - self.x0) / self.cell)
+        fy = np.floor((ys - self.y0) / self.cell)
+        on_grid = (fx >= 0) & (fx < self.nx) & (fy >= 0) & (fy < self.ny)
+        out[on_grid] = self.grid[fy[on_grid].astype(np.int64), fx[on_grid].astype(np.int64)]
+
+        exact = np.flatnonzero(out == BOUNDARY)
+        self.stats["grid"] += len(xs) - len(exact)
+        self.stats["exact"] += len(exact)
+        out[exact] = OUTSIDE
+        predicate = "within" if self.predicate == "contains" else "covered_by"
+        pt_idx, poly_idx = self.tree.query(shapely.points(xs[exact], ys[exact]), predicate=predicate)
+        order = np.lexsort((poly_idx, pt_idx))
+        first_pt, first = np.unique(pt_idx[order], return_index=True)
+        out[exact[first_pt]] = poly_idx[order][first]
+        return out
+
+    def lookup_many(self, xs, ys) -> list:
+        """lookup() for coordinate arrays."""
+        return [None if k < 0 else self.values[k] for k in self.indices(xs, ys)]
+
+    def lookup_first(self, xs, ys, groups, n: int) -> list:
+        """For points tagged with group numbers 0..n-1 (in order), the value of
+        each group's first point that lies in a polygon, or None."""
+        codes = self.indices(xs, ys)
+        groups = np.asarray(groups, dtype=np.int64)
+        hit = np.flatnonzero(codes >= 0)
+        found, first = np.unique(groups[hit], return_index=True)
+        out = [None] * n
+        for g, k in zip(found, hit[first]):
+            out[g] = self.values[codes[k]]
+        return out
+
+    def coverage(self) -> dict:
+        """Share of grid cells that are inside a town, outside all towns, or on a boundary."""
+        n = self.grid.size
+        return {"inside": float((self.grid >= 0).sum()) / n,
+                "outside": float((self.grid == OUTSIDE).sum()) / n,
+                "boundary": float((self.grid == BOUNDARY).sum()) / n}
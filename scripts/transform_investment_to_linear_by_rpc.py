@@ -8,6 +8,17 @@ Vermont_Town_GEOID_RPC_County.geojson, and split output by RPC.
 
 Run from repo root:
     python scripts/transform_investment_to_linear_by_rpc.py
+    python scripts/transform_investment_to_linear_by_rpc.py --stream [--chunk-size 5000] [--workers 4]
+
+--stream reads the source features in chunks (geojson_stream.py) instead of
+loading the whole file, normalizes each chunk (GEOIDTXT lookup and spatial
+fallback) in a worker pool, and appends the results to the statewide file
+and the per-RPC files as it goes. At most two chunks per worker are in
+flight, so memory is bounded by the chunk size; output files and feature
+order are the same as without --stream. The writers only know the keys
+before "features", so a source with top-level keys after the features
+array is rejected (and no output is replaced) rather than written without
+them.
 
 Input:
   - data/Vermont_Water_Investment_Infrastructure_Public_-6999738747210364761.geojson
@@ -19,11 +30,20 @@ Output:
 
 from __future__ import annotations
 
+import argparse
 import json
-from collections import defaultdict
+import os
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
 
-from shapely.geometry import shape
+import numpy as np
+import shapely
+
+from bulk_geometry import feature_geometries, geometry_array
+from geojson_stream import FeatureReader, FeatureWriter
+from town_grid import TownGrid
 
 INPUT = Path(
     "data/Vermont_Water_Investment_Infrastructure_Public_-6999738747210364761.geojson"
@@ -53,59 +73,69 @@ def build_town_lookup(towns_geojson: dict) -> dict[str, dict[str, str]]:
     return lookup
 
 
-def build_town_spatial_index(towns_geojson: dict) -> list[tuple[tuple[float, float, float, float], object, dict[str, str]]]:
-    towns_index = []
-    for feature in towns_geojson.get("features", []):
+def build_town_spatial_index(towns_geojson: dict) -> TownGrid:
+    towns = [f for f in towns_geojson.get("features", []) if f.get("geometry")]
+    admins = []
+    for feature in towns:
         props = feature.get("properties") or {}
-        geom = feature.get("geometry")
-        if not geom:
-            continue
-        polygon = shape(geom)
-        admin = {
+        admins.append({
             "Municipal_Name": props.get("Municipal_Name"),
             "County": props.get("County"),
             "RPC": props.get("RPC"),
-        }
-        towns_index.append((polygon.bounds, polygon, admin))
-    return towns_index
+        })
+    geoms = feature_geometries(towns, labels=[a["Municipal_Name"] for a in admins])
+    parsed = [i for i, geom in enumerate(geoms) if geom is not None]
+    return TownGrid(geoms[parsed], [admins[i] for i in parsed], predicate="covers")
+
 
+def spatial_admin_lookups(geometries: list[dict | None], towns_index: TownGrid) -> list[dict[str, str] | None]:
+    """Town admin fields for each geometry, from one point on it; None if missing, empty or outside."""
+    geoms = geometry_array(geometries)
+    valid = np.flatnonzero(~shapely.is_missing(geoms) & ~shapely.is_empty(geoms))
 
-def spatial_admin_lookup(feature_geometry: dict | None, towns_index: list[tuple[tuple[float, float, float, float], object, dict[str, str]]]) -> dict[str, str] | None:
-    if not feature_geometry:
-        return None
+    # point_on_surface (representative_point) is guaranteed to lie on the geometry.
+    points = shapely.point_on_surface(geoms[valid])
+    valid, points = valid[~shapely.is_empty(points)], points[~shapely.is_empty(points)]
+    xy = shapely.get_coordinates(points)
 
-    geom = shape(feature_geometry)
-    if geom.is_empty:
-        return None
+    # Interior grid cells answer directly; boundary cells fall back to polygon.covers(pt).
+    admins: list[dict[str, str] | None] = [None] * len(geoms)
+    for i, admin in zip(valid, towns_index.lookup_many(xy[:, 0], xy[:, 1])):
+        admins[i] = admin
+    return admins
 
-    # representative_point() is guaranteed to lie on the geometry for lines/multilines.
-    pt = geom.representative_point()
-    x, y = pt.x, pt.y
 
-    for (minx, miny, maxx, maxy), polygon, admin in towns_index:
-        if minx <= x <= maxx and miny <= y <= maxy and polygon.covers(pt):
-            return admin
-    return None
+def normalize_features(
+    features: list[dict],
+    town_lookup: dict[str, dict[str, str]],
+    towns_index: TownGrid,
+) -> list[tuple[dict, bool, bool]]:
+    """normalize_feature for a batch: GEOIDTXT lookups first, then one bulk spatial fallback."""
+    admins = []
+    for feature in features:
+        geoidtxt = (feature.get("properties") or {}).get("GEOIDTXT")
+        admins.append(town_lookup.get(str(geoidtxt)) if geoidtxt not in (None, "") else None)
+
+    missing = [i for i, admin in enumerate(admins) if not admin]
+    spatial = spatial_admin_lookups([features[i].get("geometry") for i in missing], towns_index)
+    fallback = set()
+    for i, admin in zip(missing, spatial):
+        if admin is not None:
+            admins[i] = admin
+            fallback.add(i)
+    return [normalize_feature(f, admins[i], i in fallback) for i, f in enumerate(features)]
 
 
 def normalize_feature(
     feature: dict,
-    town_lookup: dict[str, dict[str, str]],
-    towns_index: list[tuple[tuple[float, float, float, float], object, dict[str, str]]],
+    admin: dict[str, str] | None,
+    spatial_fallback_used: bool,
 ) -> tuple[dict, bool, bool]:
     props = dict(feature.get("properties") or {})
 
     # OBJECTID does not appear in the standardized statewide linear schema.
     props.pop("OBJECTID", None)
 
-    geoidtxt = props.get("GEOIDTXT")
-    admin = town_lookup.get(str(geoidtxt)) if geoidtxt not in (None, "") else None
-    spatial_fallback_used = False
-
-    if not admin:
-        admin = spatial_admin_lookup(feature.get("geometry"), towns_index)
-        spatial_fallback_used = admin is not None
-
     if admin:
         props["Municipal_Name"] = admin.get("Municipal_Name")
         props["County"] = admin.get("County")
@@ -124,7 +154,96 @@ def normalize_feature(
     }, matched, spatial_fallback_used
 
 
+# ── Streaming mode (worker side) ──────────────────────────────────────
+
+_town_lookup = None
+_towns_index = None
+
+
+def _init_worker(towns_path: Path) -> None:
+    """Build the town lookup and spatial index once per worker."""
+    global _town_lookup, _towns_index
+    towns = load_geojson(towns_path)
+    _town_lookup = build_town_lookup(towns)
+    _towns_index = build_town_spatial_index(towns)
+
+
+def _normalize_chunk(features: list[dict]) -> list[tuple[dict, bool, bool]]:
+    return normalize_features(features, _town_lookup, _towns_index)
+
+
+def _chunks(iterable, size: int):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_transform(chunk_size: int, workers: int) -> None:
+    """Chunked, multiprocess version of main() with incremental writers."""
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    counts = Counter()
+    writers: dict[str, FeatureWriter] = {}
+
+    def consume(results):
+        for normalized, is_matched, used_spatial_fallback in results:
+            counts["total"] += 1
+            if is_matched:
+                counts["spatial" if used_spatial_fallback else "geoid"] += 1
+            statewide.write(normalized)
+            rpc = normalized["properties"].get("RPC") or "UNKNOWN"
+            if rpc not in writers:
+                path = OUTPUT_DIR / f"Vermont_Linear_{rpc}.geojson"
+                writers[rpc] = stack.enter_context(FeatureWriter(path, reader.header))
+            writers[rpc].write(normalized)
+
+    # Every writer is in the stack, so an error mid-stream discards all the
+    # partial files and leaves the previous outputs in place.
+    with ExitStack() as stack:
+        reader = stack.enter_context(FeatureReader(INPUT))
+        statewide = stack.enter_context(FeatureWriter(STATEWIDE_OUTPUT, reader.header))
+        pool = stack.enter_context(
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(TOWNS,)))
+        pending = deque()
+        for chunk in _chunks(reader, chunk_size):
+            pending.append(pool.submit(_normalize_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                consume(pending.popleft().result())
+        while pending:
+            consume(pending.popleft().result())
+        if reader.footer:
+            # Raised inside the stack, so every writer is aborted.
+            raise SystemExit(f"{INPUT.name} has top-level keys after \"features\" "
+                             f"({', '.join(reader.footer)}); run without --stream to keep them")
+
+    total = counts["total"]
+    print(f"Source features: {total:,}")
+    print(f"Matched by GEOIDTXT lookup: {counts['geoid']:,}")
+    print(f"Matched by spatial fallback: {counts['spatial']:,}")
+    print(f"Unmatched after enrichment: {total - counts['geoid'] - counts['spatial']:,}")
+    print(f"Statewide transformed file: {STATEWIDE_OUTPUT}")
+    for rpc, writer in sorted(writers.items()):
+        print(f"  {rpc}: {writer.count:,} -> {writer.path}")
+    print(f"\nWrote {len(writers)} files to {OUTPUT_DIR}")
+
+
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Transform the investment layer into per-RPC linear files.")
+    parser.add_argument("--stream", action="store_true",
+                        help="read and write features in chunks, normalizing them in a worker pool")
+    parser.add_argument("--chunk-size", type=int, default=5000,
+                        help="features per chunk with --stream (default 5000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes with --stream (default: CPU count)")
+    args = parser.parse_args()
+    if args.stream:
+        stream_transform(args.chunk_size, args.workers)
+        return
+
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     source = load_geojson(INPUT)
@@ -139,10 +258,9 @@ def main() -> None:
     matched_by_geoid = 0
     matched_by_spatial = 0
 
-    for feature in source.get("features", []):
-        normalized, is_matched, used_spatial_fallback = normalize_feature(
-            feature, town_lookup, towns_index
-        )
+    for normalized, is_matched, used_spatial_fallback in normalize_features(
+        source.get("features", []), town_lookup, towns_index
+    ):
         normalized_features.append(normalized)
         total += 1
         matched_total += int(is_matched)
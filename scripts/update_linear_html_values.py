@@ -24,13 +24,14 @@ Run from repo root:
 
 from __future__ import annotations
 
-import json
 import re
 import subprocess
 import sys
 from collections import Counter
 from pathlib import Path
 
+from data_loader import load_json_files
+
 
 REPO = Path(__file__).resolve().parent.parent
 LINEAR_DIR = REPO / "data" / "linear_by_rpc"
@@ -69,9 +70,7 @@ def load_linear_features() -> list[dict]:
         raise FileNotFoundError(f"No linear files found in {LINEAR_DIR}")
 
     features: list[dict] = []
-    for path in paths:
-        with path.open() as f:
-            gj = json.load(f)
+    for gj in load_json_files(paths):
         features.extend(gj.get("features", []))
     return features
 
@@ -100,6 +99,21 @@ def compute_metrics(features: list[dict]) -> dict:
     }
 
 
+def merge_metrics(parts: list[dict]) -> dict:
+    """Combine compute_metrics results for disjoint feature lists."""
+    merged = {
+        "total": 0, "system": Counter(), "type": Counter(),
+        "null_status": 0, "null_type": 0, "null_geoid": 0, "ww_combined_segments": 0,
+    }
+    for part in parts:
+        for key, value in part.items():
+            if isinstance(value, Counter):
+                merged[key].update(value)
+            else:
+                merged[key] += value
+    return merged
+
+
 def replace_or_fail(text: str, pattern: str, repl: str, description: str) -> str:
     new_text, count = re.subn(pattern, repl, text, flags=re.MULTILINE)
     if count == 0:
@@ -108,7 +122,7 @@ def replace_or_fail(text: str, pattern: str, repl: str, description: str) -> str
 
 
 def update_index_html(metrics: dict) -> None:
-    text = INDEX_HTML.read_text(encoding="utf-8")
+    original = text = INDEX_HTML.read_text(encoding="utf-8")
 
     text = replace_or_fail(
         text,
@@ -124,11 +138,12 @@ def update_index_html(metrics: dict) -> None:
         "index sewer corridor segment count",
     )
 
-    INDEX_HTML.write_text(text, encoding="utf-8")
+    if text != original:
+        INDEX_HTML.write_text(text, encoding="utf-8")
 
 
 def update_data_html(metrics: dict) -> None:
-    text = DATA_HTML.read_text(encoding="utf-8")
+    original = text = DATA_HTML.read_text(encoding="utf-8")
 
     total_s = fmt_int(metrics["total"])
     text = replace_or_fail(
@@ -190,7 +205,8 @@ def update_data_html(metrics: dict) -> None:
         "data null GEOIDTXT count",
     )
 
-    DATA_HTML.write_text(text, encoding="utf-8")
+    if text != original:
+        DATA_HTML.write_text(text, encoding="utf-8")
 
 
 def run_static_chart_updater() -> None:
@@ -8,7 +8,8 @@ current GeoJSON data and writes the updated HTML in-place.
 Run from the repo root:
     python scripts/update_static_charts.py
 
-Requirements: Python 3.8+, no third-party packages needed.
+Requirements: Python 3.8+, no third-party packages needed (orjson is used
+for faster loading when installed; see data_loader.py).
 
 What gets updated
 -----------------
@@ -28,12 +29,13 @@ If those sentinels are absent the script prints the generated HTML and
 exits without modifying the file.
 """
 
-import json
 import math
 import re
 import sys
 from pathlib import Path
 
+from data_loader import load_json_files
+
 # ── Paths ─────────────────────────────────────────────────────────────
 REPO = Path(__file__).resolve().parent.parent
 LINEAR_DIR = REPO / "data" / "linear_by_rpc"
@@ -54,13 +56,15 @@ SYSTEM_COLORS = {
 
 SW_ORDER = ["Stormwater", "Wastewater", "Water", "Combined"]
 
+EARTH_RADIUS_M = 6_371_000  # mean Earth radius used by haversine_m
+
 
 # ── Helpers ────────────────────────────────────────────────────────────
 
 
 def haversine_m(lon1, lat1, lon2, lat2):
     """Great-circle distance in metres between two WGS-84 points."""
-    R = 6_371_000
+    R = EARTH_RADIUS_M
     to_r = math.pi / 180
     phi1, phi2 = lat1 * to_r, lat2 * to_r
     dphi = (lat2 - lat1) * to_r
@@ -110,24 +114,12 @@ def fmt_mi(metres):
 
 # ── Step 1: load + aggregate ───────────────────────────────────────────
 
-print("Loading town boundaries...")
-with open(TOWNS_FILE) as f:
-    towns_gj = json.load(f)
-total_towns = len(towns_gj["features"])
-print(f"  {total_towns} towns")
-
-by_type = {t: 0.0 for t in SW_ORDER}
-feat_count = 0
-towns_with_data: set = set()
-
-print(f"Loading {len(RPC_LIST)} RPC linear files...")
-for rpc in RPC_LIST:
-    path = LINEAR_DIR / f"Vermont_Linear_{rpc}.geojson"
-    if not path.exists():
-        print(f"  WARNING: {path.name} not found — skipping", file=sys.stderr)
-        continue
-    with open(path) as f:
-        gj = json.load(f)
+
+def aggregate_rpc(gj):
+    """Per-file totals: length by SystemType, segment count, towns with sewer."""
+    by_type = {t: 0.0 for t in SW_ORDER}
+    feat_count = 0
+    towns_with_data = set()
     for feat in gj["features"]:
         if not include_linear(feat):
             continue
@@ -141,20 +133,56 @@ for rpc in RPC_LIST:
             geoid = p.get("GEOIDTXT") or p.get("GEOID")
             if geoid:
                 towns_with_data.add(str(geoid))
-    print(f"  {rpc}: {len(gj['features']):,} features")
-
-towns_has = len(towns_with_data)
-towns_none = total_towns - towns_has
-total_len = sum(by_type.values())
-
-print("\nResults:")
-print(
-    f"  Towns with data : {towns_has} / {total_towns}"
-    f" ({towns_has / total_towns * 100:.1f}%)"
-)
-for st, m in by_type.items():
-    print(f"  {st:<12}: {fmt_mi(m)}")
-print(f"  Total           : {fmt_mi(total_len)}  ({feat_count:,} segments)")
+    return {"by_type": by_type, "feat_count": feat_count, "towns_with_data": towns_with_data}
+
+
+def combine_stats(total_towns, rpc_aggs):
+    """Statewide stats from the per-file aggregates (see aggregate_rpc)."""
+    by_type = {t: 0.0 for t in SW_ORDER}
+    feat_count = 0
+    towns_with_data = set()
+    for agg in rpc_aggs:
+        for t in SW_ORDER:
+            by_type[t] += agg["by_type"][t]
+        feat_count += agg["feat_count"]
+        towns_with_data |= agg["towns_with_data"]
+    return {
+        "total_towns": total_towns,
+        "towns_has": len(towns_with_data),
+        "by_type": by_type,
+        "feat_count": feat_count,
+    }
+
+
+def load_stats():
+    """Load the towns file and RPC linear files and aggregate them."""
+    print(f"Loading town boundaries and {len(RPC_LIST)} RPC linear files...")
+    rpc_paths = [LINEAR_DIR / f"Vermont_Linear_{rpc}.geojson" for rpc in RPC_LIST]
+    towns_gj, *rpc_gjs = load_json_files([TOWNS_FILE, *rpc_paths])
+    total_towns = len(towns_gj["features"])
+    print(f"  {total_towns} towns")
+
+    aggs = []
+    for rpc, path, gj in zip(RPC_LIST, rpc_paths, rpc_gjs):
+        if gj is None:
+            print(f"  WARNING: {path.name} not found — skipping", file=sys.stderr)
+            continue
+        aggs.append(aggregate_rpc(gj))
+        print(f"  {rpc}: {len(gj['features']):,} features")
+    return combine_stats(total_towns, aggs)
+
+
+def print_stats(stats):
+    towns_has, total_towns = stats["towns_has"], stats["total_towns"]
+    total_len = sum(stats["by_type"].values())
+    print("\nResults:")
+    print(
+        f"  Towns with data : {towns_has} / {total_towns}"
+        f" ({towns_has / total_towns * 100:.1f}%)"
+    )
+    for st, m in stats["by_type"].items():
+        print(f"  {st:<12}: {fmt_mi(m)}")
+    print(f"  Total           : {fmt_mi(total_len)}  ({stats['feat_count']:,} segments)")
 
 
 # ── Step 2: build SVG donut ────────────────────────────────────────────
@@ -211,127 +239,150 @@ def svg_donut(has, total, cx=110, cy=110, r=90, hole=52):
 
 # ── Step 3: render HTML blocks ─────────────────────────────────────────
 
-# Town coverage chart
-svg_paths = svg_donut(towns_has, total_towns)
-has_pct = f"{towns_has / total_towns * 100:.1f}"
-none_pct = f"{towns_none / total_towns * 100:.1f}"
-town_chart_html = (
-    '        <div class="pie-chart-wrap">\n'
-    '          <svg viewBox="0 0 220 220" width="220" height="220">\n'
-    f"            {svg_paths}\n"
-    "          </svg>\n"
-    '          <div class="pie-legend">\n'
-    '            <div class="pie-legend-item">\n'
-    '              <span class="pie-legend-swatch"'
-    ' style="background:#1a7a9a;"></span>\n'
-    "              <span>Has mapped wastewater or combined sewer"
-    f" &mdash; <strong>{towns_has}</strong> towns ({has_pct}%)</span>\n"
-    "            </div>\n"
-    '            <div class="pie-legend-item">\n'
-    '              <span class="pie-legend-swatch"'
-    ' style="background:#bdc3c7;"></span>\n'
-    "              <span>No mapped wastewater or combined sewer"
-    f" &mdash; <strong>{towns_none}</strong> towns ({none_pct}%)</span>\n"
-    "            </div>\n"
-    "          </div>\n"
-    "        </div>"
-)
-
-# Linear length bar chart
-sw_max = max((by_type[t] for t in SW_ORDER), default=1)
-bar_rows = []
-labels = {"Water": "Water Supply"}
-for t in SW_ORDER:
-    length = by_type[t]
-    pct = length / sw_max * 100
-    label = labels.get(t, t)
-    color = SYSTEM_COLORS[t]
-    fill = (
-        f'<div class="chart-bar-fill"'
-        f' style="width:{pct:.1f}%;background:{color};"></div>'
+
+def render_blocks(stats):
+    """Render the auto-generated HTML blocks, keyed by sentinel name."""
+    total_towns = stats["total_towns"]
+    towns_has = stats["towns_has"]
+    towns_none = total_towns - towns_has
+    by_type = stats["by_type"]
+    feat_count = stats["feat_count"]
+    total_len = sum(by_type.values())
+
+    # Town coverage chart
+    svg_paths = svg_donut(towns_has, total_towns)
+    has_pct = f"{towns_has / total_towns * 100:.1f}"
+    none_pct = f"{towns_none / total_towns * 100:.1f}"
+    town_chart_html = (
+        '        <div class="pie-chart-wrap">\n'
+        '          <svg viewBox="0 0 220 220" width="220" height="220">\n'
+        f"            {svg_paths}\n"
+        "          </svg>\n"
+        '          <div class="pie-legend">\n'
+        '            <div class="pie-legend-item">\n'
+        '              <span class="pie-legend-swatch"'
+        ' style="background:#1a7a9a;"></span>\n'
+        "              <span>Has mapped wastewater or combined sewer"
+        f" &mdash; <strong>{towns_has}</strong> towns ({has_pct}%)</span>\n"
+        "            </div>\n"
+        '            <div class="pie-legend-item">\n'
+        '              <span class="pie-legend-swatch"'
+        ' style="background:#bdc3c7;"></span>\n'
+        "              <span>No mapped wastewater or combined sewer"
+        f" &mdash; <strong>{towns_none}</strong> towns ({none_pct}%)</span>\n"
+        "            </div>\n"
+        "          </div>\n"
+        "        </div>"
+    )
+
+    # Linear length bar chart
+    sw_max = max((by_type[t] for t in SW_ORDER), default=1)
+    bar_rows = []
+    labels = {"Water": "Water Supply"}
+    for t in SW_ORDER:
+        length = by_type[t]
+        pct = length / sw_max * 100
+        label = labels.get(t, t)
+        color = SYSTEM_COLORS[t]
+        fill = (
+            f'<div class="chart-bar-fill"'
+            f' style="width:{pct:.1f}%;background:{color};"></div>'
+        )
+        bar_rows.append(
+            f'        <div class="chart-bar-row">\n'
+            f'          <span class="chart-bar-label">{label}</span>\n'
+            f'          <div class="chart-bar-track">{fill}</div>\n'
+            f'          <span class="chart-bar-value">{fmt_mi(length)}</span>\n'
+            f"        </div>"
+        )
+    linear_chart_html = "\n".join(bar_rows)
+
+    # Summary paragraphs
+    longest_type = max(SW_ORDER, key=lambda t: by_type[t])
+    longest_pct = by_type[longest_type] / total_len * 100
+    ww = fmt_mi(by_type["Wastewater"])
+    wa = fmt_mi(by_type["Water"])
+    co = fmt_mi(by_type["Combined"])
+    tot = fmt_mi(total_len)
+    long_len = fmt_mi(by_type[longest_type])
+
+    p1 = (
+        f"Vermont's mapped linear infrastructure dataset spans <strong>{tot}</strong>"
+        f" across <strong>{feat_count:,} individual segments</strong> collected from"
+        f" all 11 Regional Planning Commissions. {longest_type} features account for"
+        f" the largest share at <strong>{long_len}</strong>"
+        f" ({longest_pct:.0f}%). Stormwater figures here reflect enclosed storm sewer"
+        " pipe (Type 2) only, excluding open channels, culverts, swales, and ditches."
+    )
+    p2 = (
+        f"Wastewater (sanitary sewer) lines total <strong>{ww}</strong>,"
+        f" water supply lines <strong>{wa}</strong>, and combined sewer lines"
+        " &mdash; where stormwater and wastewater share a single pipe &mdash;"
+        f" account for <strong>{co}</strong>. The small combined sewer total"
+        " reflects Vermont's largely separate sewer systems, with legacy combined"
+        " infrastructure concentrated in a few older urban centers."
     )
-    bar_rows.append(
-        f'        <div class="chart-bar-row">\n'
-        f'          <span class="chart-bar-label">{label}</span>\n'
-        f'          <div class="chart-bar-track">{fill}</div>\n'
-        f'          <span class="chart-bar-value">{fmt_mi(length)}</span>\n'
-        f"        </div>"
+    summary_html = (
+        '      <div class="wwtf-summary-text">\n'
+        f"        <p>{p1}</p>\n"
+        f"        <p>{p2}</p>\n"
+        "      </div>"
     )
-linear_chart_html = "\n".join(bar_rows)
-
-# Summary paragraphs
-longest_type = max(SW_ORDER, key=lambda t: by_type[t])
-longest_pct = by_type[longest_type] / total_len * 100
-ww = fmt_mi(by_type["Wastewater"])
-wa = fmt_mi(by_type["Water"])
-co = fmt_mi(by_type["Combined"])
-tot = fmt_mi(total_len)
-long_len = fmt_mi(by_type[longest_type])
-
-p1 = (
-    f"Vermont's mapped linear infrastructure dataset spans <strong>{tot}</strong>"
-    f" across <strong>{feat_count:,} individual segments</strong> collected from"
-    f" all 11 Regional Planning Commissions. {longest_type} features account for"
-    f" the largest share at <strong>{long_len}</strong>"
-    f" ({longest_pct:.0f}%). Stormwater figures here reflect enclosed storm sewer"
-    " pipe (Type 2) only, excluding open channels, culverts, swales, and ditches."
-)
-p2 = (
-    f"Wastewater (sanitary sewer) lines total <strong>{ww}</strong>,"
-    f" water supply lines <strong>{wa}</strong>, and combined sewer lines"
-    " &mdash; where stormwater and wastewater share a single pipe &mdash;"
-    f" account for <strong>{co}</strong>. The small combined sewer total"
-    " reflects Vermont's largely separate sewer systems, with legacy combined"
-    " infrastructure concentrated in a few older urban centers."
-)
-summary_html = (
-    '      <div class="wwtf-summary-text">\n'
-    f"        <p>{p1}</p>\n"
-    f"        <p>{p2}</p>\n"
-    "      </div>"
-)
+    return {
+        "town-coverage-chart": town_chart_html,
+        "statewide-chart": linear_chart_html,
+        "statewide-summary-text": summary_html,
+    }
 
 
 # ── Step 4: patch index.html ───────────────────────────────────────────
 
-BLOCKS = {
-    "town-coverage-chart": town_chart_html,
-    "statewide-chart": linear_chart_html,
-    "statewide-summary-text": summary_html,
-}
-
-html = INDEX_HTML.read_text(encoding="utf-8")
-updated = html
-missing = []
 
-for key, content in BLOCKS.items():
-    pattern = (
-        r"<!-- \[AUTO\] " + re.escape(key) + r" START -->.*?"
-        r"<!-- \[AUTO\] " + re.escape(key) + r" END -->"
-    )
-    start_tag = f"<!-- [AUTO] {key} START -->"
-    end_tag = f"<!-- [AUTO] {key} END -->"
-    replacement = f"{start_tag}\n{content}\n      {end_tag}"
-    new_html, count = re.subn(pattern, replacement, updated, flags=re.DOTALL)
-    if count:
-        updated = new_html
-        print(f"\nPatched: {key}")
+def patch_blocks(html, blocks):
+    """Replace each sentinel block; returns (updated html, missing keys)."""
+    updated = html
+    missing = []
+    for key, content in blocks.items():
+        pattern = (
+            r"<!-- \[AUTO\] " + re.escape(key) + r" START -->.*?"
+            r"<!-- \[AUTO\] " + re.escape(key) + r" END -->"
+        )
+        start_tag = f"<!-- [AUTO] {key} START -->"
+        end_tag = f"<!-- [AUTO] {key} END -->"
+        replacement = f"{start_tag}\n{content}\n      {end_tag}"
+        new_html, count = re.subn(pattern, replacement, updated, flags=re.DOTALL)
+        if count:
+            updated = new_html
+        else:
+            missing.append(key)
+    return updated, missing
+
+
+def main():
+    stats = load_stats()
+    print_stats(stats)
+    blocks = render_blocks(stats)
+
+    html = INDEX_HTML.read_text(encoding="utf-8")
+    updated, missing = patch_blocks(html, blocks)
+    for key in blocks:
+        if key not in missing:
+            print(f"\nPatched: {key}")
+
+    if missing:
+        keys = ", ".join(missing)
+        print(f"\nWARNING: sentinel comment(s) not found — {keys}")
+        print("Add the sentinel comments to index.html, then re-run.")
+        print("Generated HTML:\n")
+        for key, content in blocks.items():
+            print(f"=== {key} ===" if key == "town-coverage-chart" else f"\n=== {key} ===")
+            print(content)
     else:
-        missing.append(key)
-
-if missing:
-    keys = ", ".join(missing)
-    print(f"\nWARNING: sentinel comment(s) not found — {keys}")
-    print("Add the sentinel comments to index.html, then re-run.")
-    print("Generated HTML:\n")
-    print("=== town-coverage-chart ===")
-    print(town_chart_html)
-    print("\n=== statewide-chart ===")
-    print(linear_chart_html)
-    print("\n=== statewide-summary-text ===")
-    print(summary_html)
-else:
-    INDEX_HTML.write_text(updated, encoding="utf-8")
-    print("\nindex.html updated successfully.")
-
-print("\nDone.")
+        INDEX_HTML.write_text(updated, encoding="utf-8")
+        print("\nindex.html updated successfully.")
+
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    main()
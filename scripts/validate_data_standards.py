@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+validate_data_standards.py
+--------------------------
+Enforce analysis/data_standards.md on the linear, point, and zoning files.
+
+The field tables in the data standards (type, nullability, domains, GlobalID
+UUID format, GEOIDTXT format) are declared below as SCHEMAS and compiled
+into one check function per field, so validating a feature is a single pass
+over a short list of closures. GEOIDTXT values are also checked against the
+town reference file, and the RPC of each feature against the RPC of its
+town.
+
+Files are validated in parallel, one worker process per file, and only the
+violation counts and a few sample IDs are sent back to the parent.
+
+Run from repo root:
+    python scripts/validate_data_standards.py
+    python scripts/validate_data_standards.py --strict   # exit 1 on violations
+
+Inputs:
+  - data/linear_by_rpc/Vermont_Linear_<RPC>.geojson
+  - data/Vermont_Point_Features.geojson (if present)
+  - data/Zoning Data/<RPC>.geojson
+  - data/Vermont_Town_GEOID_RPC_County.geojson (GEOIDTXT / RPC reference)
+
+Output:  validation_report.txt (violations grouped by RPC and field)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO / "data"
+LINEAR_DIR = DATA_DIR / "linear_by_rpc"
+POINT_FILE = DATA_DIR / "Vermont_Point_Features.geojson"
+ZONING_DIR = DATA_DIR / "Zoning Data"
+TOWNS_FILE = DATA_DIR / "Vermont_Town_GEOID_RPC_County.geojson"
+REPORT_FILE = REPO / "validation_report.txt"
+
+SAMPLES_PER_GROUP = 5
+
+RPC_VALUES = {
+    "ACRPC", "BCRC", "CCRPC", "CVRPC", "LCPC",
+    "MARC", "NRPC", "NVDA", "RRPC", "TRORC", "WRC",
+}
+COUNTY_VALUES = {
+    "Addison", "Bennington", "Caledonia", "Chittenden", "Essex", "Franklin",
+    "Grand Isle", "Lamoille", "Orange", "Orleans", "Rutland", "Washington",
+    "Windham", "Windsor",
+}
+SYSTEM_TYPES = {"Stormwater", "Wastewater", "Water", "Combined"}
+SOURCE_CODES = {1, 2, 3, 4, 5, 6, 7, 8, 10, 11, 12, 13, 14, 15}
+LINEAR_TYPE_CODES = {2, 3, 4, 5, 6, 7, 8, 10, 12, 13, 14, 15, 16, 17, 18, 19}
+POINT_TYPE_CODES = {
+    2, 3, 4, 5, 6, 7, 8, 9, 11, 12, 14, 15, 16, 17, 19, 22, 23, 24, 25, 27, 28,
+}
+LINEAR_STATUS = {"Existing", "Proposed", "Abandoned", "Absent"}
+POINT_STATUS = LINEAR_STATUS | {"Potential"}
+ALLOWANCE_VALUES = {"Permitted", "Prohibited", "Public Hearing", "Allowed/Conditional"}
+
+# "{XXXXXXXX-XXXX-XXXX-XXXX-XXXXXXXXXXXX}" per the standards; the braces are
+# optional because the ANR export writes GlobalIDs without them.
+GLOBALID_RE = r"\{?[0-9A-Fa-f]{8}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{4}-[0-9A-Fa-f]{12}\}?"
+GEOID_RE = r"50\d{8}"
+
+
+def infrastructure_schema(type_codes: set[int], status_values: set[str]) -> dict:
+    """Shared infrastructure schema (data_standards.md) for linear and point files."""
+    return {
+        "GlobalID": {"type": "string", "nullable": False, "pattern": GLOBALID_RE},
+        "GEOIDTXT": {"type": "string", "nullable": True, "pattern": GEOID_RE, "town": True},
+        "SystemType": {"type": "string", "nullable": True, "domain": SYSTEM_TYPES},
+        "Type": {"type": "integer", "nullable": True, "domain": type_codes},
+        "Status": {"type": "string", "nullable": True, "domain": status_values},
+        "Owner": {"type": "string", "nullable": True},
+        "PermitNo": {"type": "string", "nullable": True},
+        "Audience": {"type": "string", "nullable": False, "domain": {"Public"}},
+        "Source": {"type": "integer", "nullable": True, "domain": SOURCE_CODES},
+        "SourceDate": {"type": "string_or_number", "nullable": True},
+        "SourceNotes": {"type": "string", "nullable": True},
+        "Notes": {"type": "string", "nullable": True},
+        "Creator": {"type": "string", "nullable": True},
+        "CreateDate": {"type": "string", "nullable": True},
+        "Editor": {"type": "string", "nullable": True},
+        "EditDate": {"type": "string", "nullable": True},
+        "Municipal_Name": {"type": "string", "nullable": False},
+        "County": {"type": "string", "nullable": False, "domain": COUNTY_VALUES},
+        "RPC": {"type": "string", "nullable": False, "domain": RPC_VALUES, "town_rpc": "GEOIDTXT"},
+    }
+
+
+SCHEMAS = {
+    "linear": {
+        "id_field": "GlobalID",
+        "geometry": {"LineString", "MultiLineString"},
+        "fields": infrastructure_schema(LINEAR_TYPE_CODES, LINEAR_STATUS),
+    },
+    "point": {
+        "id_field": "GlobalID",
+        "geometry": {"Point"},
+        "fields": infrastructure_schema(POINT_TYPE_CODES, POINT_STATUS),
+    },
+    # Zoning files come from the Vermont Zoning Atlas and are not covered by
+    # the data standards; only the join and allowance fields are checked.
+    "zoning": {
+        "id_field": "OBJECT_ID",
+        "geometry": {"Polygon", "MultiPolygon"},
+        "fields": {
+            "OBJECT_ID": {"type": "integer", "nullable": False},
+            "GEO_ID": {"type": "string", "nullable": True, "pattern": GEOID_RE, "town": True},
+            "Municipal_Name": {"type": "string", "nullable": False},
+            "County": {"type": "string", "nullable": False, "domain": COUNTY_VALUES},
+            "RPC": {"type": "string", "nullable": False, "domain": RPC_VALUES, "town_rpc": "GEO_ID"},
+            "F1F_Allowance": {"type": "string", "nullable": True, "domain": ALLOWANCE_VALUES},
+            "F2F_Allowance": {"type": "string", "nullable": True, "domain": ALLOWANCE_VALUES},
+            "F3F_Allowance": {"type": "string", "nullable": True, "domain": ALLOWANCE_VALUES},
+            "F4F_Allowance": {"type": "string", "nullable": True, "domain": ALLOWANCE_VALUES},
+        },
+    },
+}
+
+_MISSING = object()
+
+TYPE_CHECKS = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "string_or_number": lambda v: isinstance(v, (str, int, float)) and not isinstance(v, bool),
+}
+
+
+def compile_field(spec: dict, town_rpc: dict[str, str]):
+    """Compile one field spec into check(value, props) -> violation code | None."""
+    nullable = spec["nullable"]
+    type_ok = TYPE_CHECKS[spec["type"]]
+    domain = spec.get("domain")
+    pattern = re.compile(spec["pattern"]).fullmatch if "pattern" in spec else None
+    check_town = spec.get("town", False)
+    rpc_source = spec.get("town_rpc")
+
+    def check(value, props):
+        if value is _MISSING:
+            return None if nullable else "missing"
+        if value is None:
+            return None if nullable else "null"
+        if not type_ok(value):
+            return "type"
+        if domain is not None and value not in domain:
+            return "domain"
+        if pattern is not None and not pattern(value):
+            return "format"
+        if check_town and value not in town_rpc:
+            return "unknown_town"
+        if rpc_source is not None:
+            geoid = props.get(rpc_source)
+            if geoid in town_rpc and town_rpc[geoid] != value:
+                return "town_mismatch"
+        return None
+
+    return check
+
+
+def compile_schema(kind: str, town_rpc: dict[str, str]) -> list:
+    return [(name, compile_field(spec, town_rpc)) for name, spec in SCHEMAS[kind]["fields"].items()]
+
+
+def validate_file(kind: str, path: str, default_rpc: str, town_rpc: dict[str, str]) -> dict:
+    """Validate one GeoJSON file; return counts and samples keyed by (rpc, field, code)."""
+    schema = SCHEMAS[kind]
+    checks = compile_schema(kind, town_rpc)
+    id_field = schema["id_field"]
+    geometry_types = schema["geometry"]
+
+    with open(path) as f:
+        features = json.load(f).get("features", [])
+
+    counts: Counter = Counter()
+    samples: dict[tuple, list] = defaultdict(list)
+
+    def record(rpc, field, code, fid):
+        key = (rpc, field, code)
+        counts[key] += 1
+        if len(samples[key]) < SAMPLES_PER_GROUP:
+            samples[key].append(fid)
+
+    for feat in features:
+        props = feat.get("properties") or {}
+        rpc = props.get("RPC") if props.get("RPC") in RPC_VALUES else default_rpc
+        fid = props.get(id_field)
+        geom = feat.get("geometry")
+        if not geom or geom.get("type") not in geometry_types:
+            record(rpc, "geometry", "type", fid)
+        for name, check in checks:
+            code = check(props.get(name, _MISSING), props)
+            if code:
+                record(rpc, name, code, fid)
+
+    return {
+        "kind": kind,
+        "file": os.path.relpath(path, REPO),
+        "features": len(features),
+        "counts": dict(counts),
+        "samples": dict(samples),
+    }
+
+
+def collect_tasks() -> list[tuple[str, str, str]]:
+    """(kind, path, fallback RPC) for every file to validate."""
+    tasks = []
+    for path in sorted(LINEAR_DIR.glob("Vermont_Linear_*.geojson")):
+        tasks.append(("linear", str(path), path.stem.replace("Vermont_Linear_", "")))
+    if POINT_FILE.exists():
+        tasks.append(("point", str(POINT_FILE), "UNKNOWN"))
+    for path in sorted(ZONING_DIR.glob("*.geojson")):
+        tasks.append(("zoning", str(path), path.stem))
+    return tasks
+
+
+def load_town_rpc() -> dict[str, str]:
+    with TOWNS_FILE.open() as f:
+        towns = json.load(f)
+    return {
+        str(feat["properties"]["TOWNGEOID"]): feat["properties"].get("RPC")
+        for feat in towns["features"]
+        if (feat.get("properties") or {}).get("TOWNGEOID")
+    }
+
+
+def write_report(results: list[dict], elapsed: float) -> int:
+    """Write the grouped violation report; return the total violation count."""
+    merged: Counter = Counter()
+    merged_samples: dict[tuple, list] = defaultdict(list)
+    for res in results:
+        for (rpc, field, code), n in res["counts"].items():
+            key = (res["kind"], rpc, field, code)
+            merged[key] += n
+            room = SAMPLES_PER_GROUP - len(merged_samples[key])
+            merged_samples[key].extend(res["samples"][(rpc, field, code)][:room])
+
+    total = sum(merged.values())
+    lines = [
+        "DATA STANDARDS VALIDATION REPORT",
+        "=" * 80,
+        "Schema: analysis/data_standards.md",
+        "",
+        "FILES",
+        "-" * 80,
+    ]
+    for res in results:
+        n_bad = sum(res["counts"].values())
+        lines.append(f"{res['file']}: {res['features']:,} features, {n_bad:,} violations")
+    lines += [
+        "",
+        f"Total violations: {total:,}",
+        f"Validated in {elapsed:.2f}s",
+    ]
+
+    for kind in SCHEMAS:
+        keys = sorted(k for k in merged if k[0] == kind)
+        if not keys:
+            continue
+        lines += ["", f"{kind.upper()} VIOLATIONS BY RPC AND FIELD", "-" * 80]
+        current_rpc = None
+        for key in keys:
+            _, rpc, field, code = key
+            if rpc != current_rpc:
+                lines.append(f"{rpc}")
+                current_rpc = rpc
+            sample = ", ".join(str(s) for s in merged_samples[key])
+            lines.append(f"  {field:<16} {code:<14} {merged[key]:>8,}   e.g. {sample}")
+
+    REPORT_FILE.write_text("\n".join(lines) + "\n")
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Validate data files against analysis/data_standards.md.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--strict", action="store_true",
+                        help="exit with status 1 when any violation is found")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    town_rpc = load_town_rpc()
+    tasks = collect_tasks()
+    if not tasks:
+        print("No data files found", file=sys.stderr)
+        sys.exit(1)
+
+    # Largest files first so one big file does not start last.
+    tasks.sort(key=lambda t: -os.path.getsize(t[1]))
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(validate_file, kind, path, rpc, town_rpc) for kind, path, rpc in tasks]
+        results = sorted((f.result() for f in futures), key=lambda r: (list(SCHEMAS).index(r["kind"]), r["file"]))
+    elapsed = time.perf_counter() - t0
+
+    total = write_report(results, elapsed)
+    n_features = sum(r["features"] for r in results)
+    print(f"Validated {n_features:,} features in {len(results)} files ({elapsed:.2f}s)")
+    print(f"Violations: {total:,}")
+    print(f"Report written: {REPORT_FILE.name}")
+
+    if args.strict and total:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,64 +8,227 @@ This script:
 1. Loads all wastewater and combined sewer features
 2. Projects to UTM Zone 18 for accurate calculations
 3. Buffers them by 300 feet (91.4 meters) on both sides
-4. Unions (dissolves) overlapping buffers
-5. Clips to Vermont town boundaries
+4. Unions (dissolves) overlapping buffers, per tile through the corridor
+   cache (see corridor_cache.py) so only tiles near changed lines are redone
+5. Clips to the dissolved Vermont boundary (cached, see boundary_cache.py)
 6. Calculates total area in square miles
+7. Optionally (--by-town) breaks the corridor down per town and per RPC
 
 Expected: ~111.34 square miles
 
 Run from repo root:
     python scripts/verify_sewer_corridor.py
+    python scripts/verify_sewer_corridor.py --by-town
+    python scripts/verify_sewer_corridor.py --no-cache
+    python scripts/verify_sewer_corridor.py --sweep 100,200,300,500,1000
+    python scripts/verify_sewer_corridor.py --mode raster --cell-size 10 [--compare]
+    python scripts/verify_sewer_corridor.py --mode raster --check
+
+With --by-town the corridor pieces are intersected with the projected town
+polygons through an STRtree, the towns are spread across a worker pool, and
+the results are written to:
+    data/sewer_corridor_by_town.csv
+    data/sewer_corridor_by_rpc.csv
+    data/sewer_corridor_by_town.json   (towns + RPCs, for the site)
+
+With --sweep the lines are loaded, projected, and merged once: the network
+is unioned (noded) and line_merge joins segments meeting end to end, so
+each buffer distance (in feet) buffers fewer, longer lines with no
+overlapping caps at the joints. Towns and the Vermont boundary are also
+projected once, then each distance is unioned, clipped, and broken down per
+town. The area-vs-distance curves are written to:
+    data/sewer_corridor_sweep.csv      (one row per scope and distance)
+    data/sewer_corridor_sweep.json     (statewide + per-town curves)
+
+--mode raster replaces the exact buffer-plus-union with a gridded
+Euclidean distance transform (see corridor_raster.py). It prints the
+approximate area with an error bound estimate; --compare also runs the
+exact vector calculation and reports the difference. --check is a
+regression check of the raster code: the first CHECK_LINES lines are
+rasterized at each of CHECK_CELL_SIZES and compared with their exact
+corridor, and the script exits non-zero if any difference exceeds the
+error bound.
+
+Projection goes through projection.py (a cached pyproj Transformer applied
+to all coordinates at once); geopandas is not needed.
 """
 
+import argparse
+import csv
 import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from shapely.geometry import shape
+import shapely
 from shapely.ops import unary_union
-import geopandas as gpd
-from geopandas import GeoSeries, GeoDataFrame
+from corridor_cache import tiled_corridor
+from corridor_raster import raster_corridor_area
+from projection import to_utm
+from data_loader import load_json, load_json_files
+from bulk_geometry import feature_geometries
+from boundary_cache import state_boundary
 
 REPO = Path(__file__).resolve().parent.parent
 LINEAR_DIR = REPO / "data" / "linear_by_rpc"
 TOWNS_FILE = REPO / "data" / "Vermont_Town_GEOID_RPC_County.geojson"
+TOWN_CSV = REPO / "data" / "sewer_corridor_by_town.csv"
+RPC_CSV = REPO / "data" / "sewer_corridor_by_rpc.csv"
+BREAKDOWN_JSON = REPO / "data" / "sewer_corridor_by_town.json"
+SWEEP_CSV = REPO / "data" / "sewer_corridor_sweep.csv"
+SWEEP_JSON = REPO / "data" / "sewer_corridor_sweep.json"
+
+# 300 feet = 91.4432 meters
+BUFFER_DISTANCE_M = 91.4432
+
+# Convert to square miles: 1 mile = 1609.34 meters
+SQ_MILES_PER_SQ_METER = 1 / (1609.34 ** 2)
+FEET_TO_METERS = 0.3048
+
+# Raster cells smaller than this make the statewide grid impractically large.
+MIN_CELL_SIZE_M = 0.5
+CHECK_LINES = 1500
+CHECK_CELL_SIZES = (10.0, 2.0, 1.0)
+
+# Segments per quarter circle; 16 matches the GeoSeries.buffer default the
+# corridor was originally computed with.
+QUAD_SEGS = 16
 
 
 def load_linear_features():
     """Load all linear features from RPC split files."""
     paths = sorted(LINEAR_DIR.glob("Vermont_Linear_*.geojson"))
     features = []
-    for path in paths:
-        with path.open() as f:
-            gj = json.load(f)
+    for gj in load_json_files(paths):
         features.extend(gj.get("features", []))
     return features
 
 
-def load_vermont_boundary():
-    """Load Vermont town boundaries and union them into one polygon."""
-    with TOWNS_FILE.open() as f:
-        towns_gj = json.load(f)
-    
-    polygons = []
-    for feature in towns_gj.get("features", []):
-        geom = feature.get("geometry")
-        if geom:
-            polygons.append(shape(geom))
-    
-    if not polygons:
-        raise ValueError("No Vermont town polygons loaded")
-    
-    vermont_boundary = unary_union(polygons)
-    return vermont_boundary
+def load_towns():
+    """Load Vermont town features (properties + geometry)."""
+    towns_gj = load_json(TOWNS_FILE)
+    return [feat for feat in towns_gj.get("features", []) if feat.get("geometry")]
 
 
-def verify_corridor():
-    """Calculate the sewer service corridor area."""
+def load_vermont_boundary(crs="wgs84"):
+    """Dissolved Vermont boundary from the boundary cache (see boundary_cache.py)."""
+    return state_boundary(crs)
+
+
+# ── Per-town breakdown (worker side) ──────────────────────────────────
+
+_pieces = None
+_pieces_tree = None
+
+
+def _init_breakdown_worker(pieces_wkb):
+    """Rebuild the corridor pieces and their STRtree once per worker."""
+    global _pieces, _pieces_tree
+    _pieces = shapely.from_wkb(pieces_wkb)
+    _pieces_tree = shapely.STRtree(_pieces)
+
+
+def _corridor_area_in_towns(towns_wkb):
+    """Corridor area (m²) and town area (m²) for a chunk of towns."""
+    towns = shapely.from_wkb(towns_wkb)
+    results = []
+    for town in towns:
+        shapely.prepare(town)
+        # Pieces entirely inside the town need no intersection.
+        inside = _pieces_tree.query(town, predicate="contains_properly")
+        hit = _pieces_tree.query(town, predicate="intersects")
+        partial = _pieces[sorted(set(hit.tolist()) - set(inside.tolist()))]
+        area = shapely.area(_pieces[inside]).sum()
+        if len(partial):
+            area += shapely.area(shapely.intersection(partial, town)).sum()
+        results.append((float(area), float(town.area)))
+    return results
+
+
+def town_corridor_areas(corridor_utm, towns_utm, workers):
+    """Return (corridor m², town m²) for every town polygon."""
+    pieces = shapely.get_parts(corridor_utm)
+    pieces_wkb = shapely.to_wkb(pieces)
+    towns_wkb = shapely.to_wkb(towns_utm)
+
+    workers = max(1, workers)
+    chunk = max(1, -(-len(towns_wkb) // (workers * 4)))
+    chunks = [towns_wkb[i:i + chunk] for i in range(0, len(towns_wkb), chunk)]
+    print(f"Intersecting {len(pieces):,} corridor pieces with {len(towns_wkb):,} towns "
+          f"({workers} workers)...")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_breakdown_worker,
+        initargs=(pieces_wkb,),
+    ) as pool:
+        return [a for part in pool.map(_corridor_area_in_towns, chunks) for a in part]
+
+
+def corridor_by_town(corridor_utm, towns, towns_utm, statewide_sq_mi, workers):
+    """Break the corridor down per town and per RPC; write CSV/JSON outputs."""
+    areas = town_corridor_areas(corridor_utm, towns_utm, workers)
+
+    town_rows = []
+    rpc_totals = {}
+    for feat, (corridor_m2, town_m2) in zip(towns, areas):
+        p = feat["properties"]
+        corridor_sq_mi = corridor_m2 * SQ_MILES_PER_SQ_METER
+        town_sq_mi = town_m2 * SQ_MILES_PER_SQ_METER
+        town_rows.append({
+            "GEOIDTXT": p.get("TOWNGEOID"),
+            "Municipal_Name": p.get("Municipal_Name"),
+            "County": p.get("County"),
+            "RPC": p.get("RPC"),
+            "corridor_sq_mi": round(corridor_sq_mi, 4),
+            "town_sq_mi": round(town_sq_mi, 4),
+            "pct_of_town": round(corridor_sq_mi / town_sq_mi * 100, 3) if town_sq_mi else 0.0,
+            "pct_of_statewide": round(corridor_sq_mi / statewide_sq_mi * 100, 3) if statewide_sq_mi else 0.0,
+        })
+        totals = rpc_totals.setdefault(p.get("RPC"), [0.0, 0.0, 0])
+        totals[0] += corridor_sq_mi
+        totals[1] += town_sq_mi
+        totals[2] += 1
+
+    rpc_rows = [
+        {
+            "RPC": rpc,
+            "towns": n,
+            "corridor_sq_mi": round(corridor, 4),
+            "rpc_sq_mi": round(area, 4),
+            "pct_of_rpc": round(corridor / area * 100, 3) if area else 0.0,
+            "pct_of_statewide": round(corridor / statewide_sq_mi * 100, 3) if statewide_sq_mi else 0.0,
+        }
+        for rpc, (corridor, area, n) in sorted(rpc_totals.items(), key=lambda kv: str(kv[0]))
+    ]
+    town_rows.sort(key=lambda r: -r["corridor_sq_mi"])
+
+    for path, rows in ((TOWN_CSV, town_rows), (RPC_CSV, rpc_rows)):
+        with path.open("w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+    with BREAKDOWN_JSON.open("w") as f:
+        json.dump({
+            "buffer_m": BUFFER_DISTANCE_M,
+            "statewide_sq_mi": round(statewide_sq_mi, 4),
+            "rpcs": rpc_rows,
+            "towns": town_rows,
+        }, f, indent=1)
+
+    town_sum = sum(r["corridor_sq_mi"] for r in town_rows)
+    print(f"\nSum over towns: {town_sum:.2f} square miles")
+    print(f"{'RPC':<8}{'sq mi':>10}{'% of RPC':>10}{'% of state':>12}")
+    for r in rpc_rows:
+        print(f"{r['RPC']:<8}{r['corridor_sq_mi']:>10.2f}{r['pct_of_rpc']:>10.2f}{r['pct_of_statewide']:>12.2f}")
+    for path in (TOWN_CSV, RPC_CSV, BREAKDOWN_JSON):
+        print(f"Wrote {path.relative_to(REPO)}")
+
+
+def load_wastewater_lines():
+    """Wastewater and combined features, plus the total linear feature count."""
     features = load_linear_features()
-    vermont_boundary_wgs84 = load_vermont_boundary()
-    
-    # Filter to wastewater and combined only
     ww_features = [
         f for f in features 
         if (f.get("properties") or {}).get("SystemType") in ("Wastewater", "Combined")
@@ -73,45 +236,64 @@ def verify_corridor():
     
     print(f"Total linear features: {len(features):,}")
     print(f"Wastewater + Combined features: {len(ww_features):,}")
+    return ww_features
+
+
+def project_to_utm(geometries, backend="pyproj"):
+    """Project WGS84 shapely geometries to UTM Zone 18N (EPSG:32618).
+
+    backend="geopandas" uses GeoDataFrame.to_crs instead (see projection.py).
+    """
+    return to_utm(geometries, backend=backend)
+
+
+def verify_corridor(by_town=False, workers=1, mode="vector", cell_size=10.0, compare=False,
+                    use_cache=True, check=False):
+    """Calculate the sewer service corridor area."""
+    ww_features = load_wastewater_lines()
+    towns = load_towns()
     
     if not ww_features:
         print("No wastewater/combined features found")
         return
     
-    # Create GeoDataFrame with wastewater/combined features
-    geos = [{"geometry": shape(f.get("geometry"))} for f in ww_features]
-    gdf = GeoDataFrame(geos, crs="EPSG:4326")
-    
     # Project to UTM Zone 18 for accurate buffering and area calculation
     print("Projecting to UTM Zone 18...")
-    gdf_utm = gdf.to_crs("EPSG:32618")  # UTM Zone 18N (covers Vermont)
-    
-    # 300 feet = 91.4432 meters
-    BUFFER_DISTANCE_M = 91.4432
-    print(f"Buffering by {BUFFER_DISTANCE_M} meters ({BUFFER_DISTANCE_M / 0.3048:.1f} feet)...")
-    gdf_buffered = gdf_utm.copy()
-    gdf_buffered["geometry"] = gdf_utm.geometry.buffer(BUFFER_DISTANCE_M)
+    lines_utm = project_to_utm(feature_geometries(ww_features))
     
-    # Dissolve (union) all buffers using shapely for efficiency
-    print("Unioning overlapping buffers (this may take a minute)...")
-    buffered_geoms = [geom for geom in gdf_buffered.geometry]
-    corridor_utm = unary_union(buffered_geoms)
-    
-    # Load and project Vermont boundary
-    print("Projecting Vermont boundary to UTM...")
-    vt_boundary_gdf = GeoDataFrame({"geometry": [vermont_boundary_wgs84]}, crs="EPSG:4326")
-    vt_boundary_utm = vt_boundary_gdf.to_crs("EPSG:32618").iloc[0].geometry
-    
-    # Clip corridor to Vermont boundary
-    print("Clipping corridor to Vermont boundary...")
-    clipped_corridor_utm = corridor_utm.intersection(vt_boundary_utm)
+    if mode == "raster":
+        vt_boundary_utm = load_vermont_boundary("utm18n")
+        if check:
+            return raster_check(lines_utm[:CHECK_LINES], vt_boundary_utm)
+        raster_corridor(lines_utm, vt_boundary_utm, cell_size, compare)
+        return
     
+    # Dissolved Vermont boundary, already in UTM
+    print("Loading Vermont boundary...")
+    vt_boundary_utm = load_vermont_boundary("utm18n")
+
+    print(f"Buffering by {BUFFER_DISTANCE_M} meters ({BUFFER_DISTANCE_M / 0.3048:.1f} feet)...")
+    if use_cache:
+        t0 = time.perf_counter()
+        tiled = tiled_corridor(lines_utm, BUFFER_DISTANCE_M, boundary=vt_boundary_utm,
+                               quad_segs=QUAD_SEGS)
+        print(f"  {tiled['tiles']:,} tiles, {tiled['recomputed']:,} recomputed "
+              f"({time.perf_counter() - t0:.2f}s)")
+        clipped_corridor_utm = shapely.geometrycollections(tiled["pieces"])
+    else:
+        buffered_geoms = shapely.buffer(lines_utm, BUFFER_DISTANCE_M, quad_segs=QUAD_SEGS)
+
+        # Dissolve (union) all buffers using shapely for efficiency
+        print("Unioning overlapping buffers (this may take a minute)...")
+        corridor_utm = unary_union(buffered_geoms)
+
+        # Clip corridor to Vermont boundary
+        print("Clipping corridor to Vermont boundary...")
+        clipped_corridor_utm = corridor_utm.intersection(vt_boundary_utm)
+
     # Calculate area in square meters
     area_sq_meters = clipped_corridor_utm.area
-    
-    # Convert to square miles: 1 mile = 1609.34 meters
-    sq_miles_per_sq_meter = 1 / (1609.34 ** 2)
-    area_sq_miles = area_sq_meters * sq_miles_per_sq_meter
+    area_sq_miles = area_sq_meters * SQ_MILES_PER_SQ_METER
     
     print(f"\n{'='*60}")
     print(f"Sewer Service Corridor Area: {area_sq_miles:.2f} square miles")
@@ -119,6 +301,158 @@ def verify_corridor():
     print(f"\nExpected (from index.html): 111.34 square miles")
     print(f"Difference: {abs(area_sq_miles - 111.34):.2f} square miles ({abs(area_sq_miles - 111.34)/111.34*100:.1f}%)")
 
+    if by_town:
+        towns_utm = project_to_utm(feature_geometries(towns))
+        print()
+        corridor_by_town(clipped_corridor_utm, towns, towns_utm, area_sq_miles, workers)
+
+
+def raster_corridor(lines_utm, vt_boundary_utm, cell_size, compare):
+    """Approximate the corridor on a grid; optionally compare with the exact area."""
+    print(f"Rasterizing at {cell_size:g} m and running the distance transform...")
+    t0 = time.perf_counter()
+    result = raster_corridor_area(lines_utm, vt_boundary_utm, BUFFER_DISTANCE_M, cell=cell_size)
+    elapsed = time.perf_counter() - t0
+
+    area_sq_miles = result["area_m2"] * SQ_MILES_PER_SQ_METER
+    bound_sq_miles = result["error_bound_m2"] * SQ_MILES_PER_SQ_METER
+    print(f"  {result['tiles']} tiles, {result['cells']:,} corridor cells, "
+          f"{result['edge_cells']:,} edge cells ({elapsed:.2f}s)")
+    print(f"\n{'='*60}")
+    print(f"Sewer Service Corridor Area (raster): {area_sq_miles:.2f} "
+          f"± {bound_sq_miles:.2f} square miles")
+    print(f"{'='*60}")
+
+    if compare:
+        print("\nComputing exact vector corridor for comparison...")
+        t0 = time.perf_counter()
+        corridor_utm = unary_union(shapely.buffer(lines_utm, BUFFER_DISTANCE_M, quad_segs=QUAD_SEGS))
+        exact = corridor_utm.intersection(vt_boundary_utm).area * SQ_MILES_PER_SQ_METER
+        exact_elapsed = time.perf_counter() - t0
+        diff = area_sq_miles - exact
+        print(f"  Exact: {exact:.2f} square miles ({exact_elapsed:.2f}s)")
+        print(f"  Raster - exact: {diff:+.3f} square miles ({diff / exact * 100:+.2f}%), "
+              f"within bound: {'yes' if abs(diff) <= bound_sq_miles else 'no'}")
+
+
+def raster_check(lines_utm, vt_boundary_utm):
+    """Compare the raster area with the exact area at each check cell size; True if all are within bound."""
+    print(f"Checking the raster corridor of {len(lines_utm):,} lines against the exact area...")
+    exact = unary_union(shapely.buffer(lines_utm, BUFFER_DISTANCE_M, quad_segs=QUAD_SEGS))
+    exact = exact.intersection(vt_boundary_utm).area
+    ok = True
+    for cell in CHECK_CELL_SIZES:
+        result = raster_corridor_area(lines_utm, vt_boundary_utm, BUFFER_DISTANCE_M, cell=cell)
+        diff = result["area_m2"] - exact
+        within = abs(diff) <= result["error_bound_m2"]
+        ok &= within
+        print(f"  {cell:>5g} m: {diff / exact * 100:+.2f}% "
+              f"(bound ±{result['error_bound_m2'] / exact * 100:.2f}%) {'ok' if within else 'FAIL'}")
+    return ok
+
+
+def sweep_corridor(distances_ft, workers=1):
+    """Corridor area for several buffer distances, statewide and per town."""
+    ww_features = load_wastewater_lines()
+    if not ww_features:
+        print("No wastewater/combined features found")
+        return
+    towns = load_towns()
+
+    # Everything distance-independent happens once.
+    print("Projecting lines and towns to UTM Zone 18...")
+    lines_utm = project_to_utm(feature_geometries(ww_features))
+    towns_utm = project_to_utm(feature_geometries(towns))
+    vt_boundary_utm = load_vermont_boundary("utm18n")
+
+    # Merge the network once; every distance then buffers the merged lines.
+    print("Merging lines...")
+    merged_lines = shapely.get_parts(shapely.line_merge(shapely.union_all(lines_utm)))
+    print(f"  {len(lines_utm):,} segments -> {len(merged_lines):,} merged lines")
+
+    statewide = []
+    per_town = []
+    for feet in distances_ft:
+        meters = feet * FEET_TO_METERS
+        print(f"\nBuffering merged lines by {feet:g} ft ({meters:.1f} m)...")
+        corridor_utm = shapely.union_all(shapely.buffer(merged_lines, meters, quad_segs=QUAD_SEGS))
+        corridor_utm = shapely.intersection(corridor_utm, vt_boundary_utm)
+        sq_mi = corridor_utm.area * SQ_MILES_PER_SQ_METER
+        statewide.append(sq_mi)
+        print(f"  Statewide corridor: {sq_mi:.2f} square miles")
+        per_town.append([a * SQ_MILES_PER_SQ_METER
+                         for a, _ in town_corridor_areas(corridor_utm, towns_utm, workers)])
+
+    with SWEEP_CSV.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["scope", "GEOIDTXT", "Municipal_Name", "RPC", "distance_ft", "corridor_sq_mi"])
+        for feet, sq_mi in zip(distances_ft, statewide):
+            writer.writerow(["state", "", "Vermont", "", feet, round(sq_mi, 4)])
+        for i, town in enumerate(towns):
+            p = town["properties"]
+            for j, feet in enumerate(distances_ft):
+                writer.writerow(["town", p.get("TOWNGEOID"), p.get("Municipal_Name"),
+                                 p.get("RPC"), feet, round(per_town[j][i], 4)])
+
+    with SWEEP_JSON.open("w") as f:
+        json.dump({
+            "distances_ft": distances_ft,
+            "statewide_sq_mi": [round(a, 4) for a in statewide],
+            "towns": [
+                {
+                    "GEOIDTXT": t["properties"].get("TOWNGEOID"),
+                    "Municipal_Name": t["properties"].get("Municipal_Name"),
+                    "RPC": t["properties"].get("RPC"),
+                    "corridor_sq_mi": [round(per_town[j][i], 4) for j in range(len(distances_ft))],
+                }
+                for i, t in enumerate(towns)
+            ],
+        }, f, indent=1)
+
+    print(f"\n{'Distance (ft)':>14}{'sq mi':>10}")
+    for feet, sq_mi in zip(distances_ft, statewide):
+        print(f"{feet:>14g}{sq_mi:>10.2f}")
+    print(f"Wrote {SWEEP_CSV.relative_to(REPO)}")
+    print(f"Wrote {SWEEP_JSON.relative_to(REPO)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the sewer service corridor area.")
+    parser.add_argument("--by-town", action="store_true",
+                        help="also report corridor area per town and per RPC")
+    parser.add_argument("--sweep", metavar="FEET",
+                        help="comma-separated buffer distances in feet, e.g. 100,200,300,500,1000")
+    parser.add_argument("--mode", choices=("vector", "raster"), default="vector",
+                        help="exact vector buffer (default) or raster approximation")
+    parser.add_argument("--cell-size", type=float, default=10.0,
+                        help="raster cell size in metres for --mode raster (default 10)")
+    parser.add_argument("--compare", action="store_true",
+                        help="with --mode raster, also compute the exact area and report the difference")
+    parser.add_argument("--check", action="store_true",
+                        help=f"with --mode raster, check the raster area of the first {CHECK_LINES} "
+                             f"lines against the exact area at {', '.join(f'{c:g}' for c in CHECK_CELL_SIZES)} m")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="buffer and union the whole network in one pass instead of "
+                             "using the tiled corridor cache")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="worker processes for per-town breakdowns (default: CPU count)")
+    args = parser.parse_args()
+    if args.mode == "raster" and (args.sweep or args.by_town):
+        parser.error("--mode raster only computes the statewide area")
+    if args.cell_size < MIN_CELL_SIZE_M:
+        parser.error(f"--cell-size must be at least {MIN_CELL_SIZE_M:g} m")
+    if args.check and args.mode != "raster":
+        parser.error("--check needs --mode raster")
+    if args.sweep:
+        distances = sorted({float(d) for d in args.sweep.split(",") if d.strip()})
+        sweep_corridor([int(d) if d.is_integer() else d for d in distances], workers=args.workers)
+    else:
+        ok = verify_corridor(by_town=args.by_town, workers=args.workers, mode=args.mode,
+                             cell_size=args.cell_size, compare=args.compare,
+                             use_cache=not args.no_cache, check=args.check)
+        if ok is False:
+            sys.exit(1)
+
 
 if __name__ == "__main__":
-    verify_corridor()
+    main()
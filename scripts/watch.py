@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+watch.py
+--------
+Watch data/ and the HTML pages and keep the derived site values current
+while editing.
+
+The watcher polls file sizes and modification times (stdlib only, no
+inotify dependency) and waits for a burst of changes to settle before
+rebuilding (--debounce). It keeps the per-file aggregates of the towns
+file and RPC linear files (not the parsed GeoJSON), so a change to one
+RPC file only re-parses and re-aggregates that file:
+
+  linear or towns files  -> update_static_charts blocks in index.html and
+                            the counts from update_linear_html_values in
+                            index.html / data.html
+  index.html / data.html -> the same values re-applied (cheap, from cache)
+
+Files are only rewritten when their content changes, and the watcher's own
+writes are not treated as edits. With --steps, the named pipeline.py steps
+(e.g. corridor,validate, without their upstream steps) also run after each
+rebuild; pipeline.py skips them when their inputs did not change. With --serve the site is served
+from the repo root as serve.py does, so pages pick up rebuilt files on
+reload without restarting anything.
+
+Run from repo root:
+    python scripts/watch.py
+    python scripts/watch.py --serve --port 8000
+    python scripts/watch.py --steps corridor,validate
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.server
+import os
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+import update_linear_html_values as html_values
+import update_static_charts as charts
+from data_loader import load_json_files
+from pipeline import STEP_BY_NAME, run_pipeline
+
+REPO = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO / "data"
+LINEAR_DIR = REPO / "data" / "linear_by_rpc"
+TOWNS_FILE = REPO / "data" / "Vermont_Town_GEOID_RPC_County.geojson"
+HTML_FILES = [REPO / "index.html", REPO / "data.html"]
+
+
+def snapshot() -> dict[Path, tuple[int, int]]:
+    """(mtime_ns, size) of every watched file."""
+    state = {}
+    stack = [DATA_DIR]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir():
+                    stack.append(Path(entry.path))
+                elif entry.name.endswith((".geojson", ".json")):
+                    st = entry.stat()
+                    state[Path(entry.path)] = (st.st_mtime_ns, st.st_size)
+    for path in HTML_FILES:
+        if path.exists():
+            st = path.stat()
+            state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def changed_files(old: dict, new: dict) -> set[Path]:
+    return {p for p in old.keys() | new.keys() if old.get(p) != new.get(p)}
+
+
+class SiteCache:
+    """Per-file aggregates of the towns / RPC files, refreshed per file."""
+
+    def __init__(self):
+        self.total_towns = 0
+        self.rpc = {}  # path -> {"metrics", "chart"}
+
+    def refresh(self, paths) -> int:
+        """Re-parse the given linear/towns files; returns how many were loaded."""
+        paths = sorted(paths)
+        for path, gj in zip(paths, load_json_files(paths)):
+            if path == TOWNS_FILE:
+                if gj is not None:
+                    self.total_towns = len(gj["features"])
+            elif gj is None:
+                self.rpc.pop(path, None)
+            else:
+                features = gj.get("features", [])
+                self.rpc[path] = {
+                    "metrics": html_values.compute_metrics(features),
+                    "chart": charts.aggregate_rpc(gj) if path.stem.split("_")[-1] in charts.RPC_LIST else None,
+                }
+        return len(paths)
+
+    def load_all(self) -> int:
+        return self.refresh([TOWNS_FILE, *LINEAR_DIR.glob("Vermont_Linear_*.geojson")])
+
+    def apply(self) -> None:
+        """Write the derived values into index.html and data.html."""
+        parts = [self.rpc[p] for p in sorted(self.rpc)]
+        metrics = html_values.merge_metrics([p["metrics"] for p in parts])
+        stats = charts.combine_stats(self.total_towns, [p["chart"] for p in parts if p["chart"]])
+
+        html = charts.INDEX_HTML.read_text(encoding="utf-8")
+        updated, missing = charts.patch_blocks(html, charts.render_blocks(stats))
+        if missing:
+            # Like update_static_charts.py: leave index.html untouched.
+            print(f"  WARNING: sentinel comment(s) not found — {', '.join(missing)}; "
+                  f"chart blocks in {charts.INDEX_HTML.name} not updated")
+        elif updated != html:
+            charts.INDEX_HTML.write_text(updated, encoding="utf-8")
+        html_values.update_index_html(metrics)
+        html_values.update_data_html(metrics)
+
+
+def serve(port: int) -> None:
+    """Serve the repo root in a background thread (same handler setup as serve.py)."""
+    handler = partial(http.server.SimpleHTTPRequestHandler, directory=str(REPO))
+    http.server.SimpleHTTPRequestHandler.extensions_map.update({".geojson": "application/json"})
+    httpd = http.server.ThreadingHTTPServer(("", port), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    print(f"Serving at http://localhost:{port}")
+
+
+def rebuild(cache: SiteCache, changed: set[Path], steps: list[str]) -> set[Path]:
+    """Re-apply the site values (and run `steps`); returns the HTML files it rewrote."""
+    t0 = time.perf_counter()
+    data_changed = {p for p in changed if p == TOWNS_FILE or p.parent == LINEAR_DIR}
+    loaded = cache.refresh(data_changed) if data_changed else 0
+    before = {p: p.read_bytes() for p in HTML_FILES if p.exists()}
+    try:
+        cache.apply()
+    except RuntimeError as e:  # a replace pattern no longer matches the HTML
+        print(f"  ERROR: {e}")
+    written = {p for p, content in before.items() if p.read_bytes() != content}
+    print(f"  rebuilt HTML values ({loaded} file(s) re-parsed) in {time.perf_counter() - t0:.2f}s")
+    if steps:
+        # Only the named steps: the watcher never reruns cleanup/transform
+        # on files that are being edited.
+        for r in run_pipeline(steps, include_deps=False):
+            if r["status"] != "skipped":
+                print(f"  [{r['name']}] {r['status']} {r['reason']}")
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild derived site values when data or HTML changes.")
+    parser.add_argument("--interval", type=float, default=0.5, help="polling interval in seconds (default 0.5)")
+    parser.add_argument("--debounce", type=float, default=0.3,
+                        help="quiet time in seconds before rebuilding after a change (default 0.3)")
+    parser.add_argument("--steps", default="", help="comma-separated pipeline.py steps to run after each rebuild")
+    parser.add_argument("--serve", action="store_true", help="also serve the site (like serve.py)")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    steps = [s for s in args.steps.split(",") if s]
+    unknown = [s for s in steps if s not in STEP_BY_NAME]
+    if unknown:
+        parser.error(f"unknown pipeline step(s): {', '.join(unknown)}")
+
+    cache = SiteCache()
+    t0 = time.perf_counter()
+    n = cache.load_all()
+    print(f"Warm cache: {n} files loaded in {time.perf_counter() - t0:.2f}s")
+    if args.serve:
+        serve(args.port)
+
+    state = snapshot()
+    print(f"Watching {len(state)} files (Ctrl+C to stop)...")
+    try:
+        while True:
+            time.sleep(args.interval)
+            current = snapshot()
+            changed = changed_files(state, current)
+            if not changed:
+                continue
+            # Debounce: wait until the files stop changing.
+            while True:
+                time.sleep(args.debounce)
+                later = snapshot()
+                more = changed_files(current, later)
+                if not more:
+                    break
+                changed |= more
+                current = later
+            names = sorted(p.relative_to(REPO).as_posix() for p in changed)
+            print(f"\n{len(names)} changed: {', '.join(names[:5])}{' ...' if len(names) > 5 else ''}")
+            written = rebuild(cache, changed, steps)
+            # The baseline is the snapshot taken before rebuilding, so edits
+            # saved while it ran are picked up next time. Our own HTML writes
+            # are not edits.
+            state = current
+            for path in written:
+                st = path.stat()
+                state[path] = (st.st_mtime_ns, st.st_size)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()
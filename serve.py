@@ -1,17 +1,76 @@
+import argparse
+import email.utils
+import gzip
 import http.server
+import io
+import os
 import socketserver
 import webbrowser
-import os
 
 PORT = 8000
+COMPRESSIBLE = {'.geojson', '.json', '.html', '.css', '.js', '.svg', '.txt', '.csv'}
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
-handler = http.server.SimpleHTTPRequestHandler
-handler.extensions_map.update({'.geojson': 'application/json'})
 
-with socketserver.TCPServer(('', PORT), handler) as httpd:
-    url = f'http://localhost:{PORT}'
-    print(f'Serving at {url}')
-    print('Press Ctrl+C to stop.')
-    webbrowser.open(url)
-    httpd.serve_forever()
+class Handler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler; with gzip on, text files are sent compressed to
+    clients that accept it (compressed once per file version, kept in memory)."""
+
+    gzip = False
+    _gzip_cache = {}  # path -> (mtime_ns, size, compressed bytes)
+
+    def send_head(self):
+        if not self.gzip or 'gzip' not in self.headers.get('Accept-Encoding', ''):
+            return super().send_head()
+        path = self.translate_path(self.path)
+        if os.path.splitext(path)[1].lower() not in COMPRESSIBLE or not os.path.isfile(path):
+            return super().send_head()
+        st = os.stat(path)
+        cached = self._gzip_cache.get(path)
+        if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+            with open(path, 'rb') as f:
+                cached = (st.st_mtime_ns, st.st_size, gzip.compress(f.read(), compresslevel=6))
+            self._gzip_cache[path] = cached
+        body = cached[2]
+        self.send_response(200)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Last-Modified', email.utils.formatdate(st.st_mtime, usegmt=True))
+        self.end_headers()
+        return io.BytesIO(body)
+
+
+Handler.extensions_map.update({'.geojson': 'application/json'})
+
+
+class Server(socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+class ThreadingServer(socketserver.ThreadingMixIn, Server):
+    daemon_threads = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the site locally.')
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--gzip', action='store_true', help='gzip text and GeoJSON responses')
+    parser.add_argument('--threaded', action='store_true', help='handle requests in parallel threads')
+    parser.add_argument('--no-browser', action='store_true', help="don't open a browser window")
+    args = parser.parse_args()
+
+    Handler.gzip = args.gzip
+    server_class = ThreadingServer if args.threaded else Server
+    with server_class(('', args.port), Handler) as httpd:
+        url = f'http://localhost:{args.port}'
+        print(f'Serving at {url}')
+        print('Press Ctrl+C to stop.')
+        if not args.no_browser:
+            webbrowser.open(url)
+        httpd.serve_forever()
+
+
+if __name__ == '__main__':
+    main()